@@ -1,17 +1,42 @@
-from http.client import HTTPException
+import asyncio
+import json
 import sys
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, List, Optional, Union
 import tempfile
 import os
 import pathlib
 import uuid
 
 # from brdgen.brd_rag_agent import BRDRAG
+from brdgen.brd_batch import (
+    BATCH_MAX_BYTES,
+    BATCH_MAX_FILES,
+    BRDBatchRunner,
+    BatchItem,
+    batch_counts,
+    batch_zip_path,
+    sweep_batch_zips,
+    write_batch_zip,
+)
+from brdgen.brd_checkpoint import prune_checkpoints
+from brdgen.brd_job_queue import BRDJobQueue, QueueFullError
+from brdgen.brd_metrics import bind_job_queue, track_task
+from brdgen.brd_recovery import LeaseKeeper, TaskRecovery
+from brdgen.brd_task_store import create_task_store, is_finished
 from brdgen.brd_utility import Utility
-from brdgen.brd_workflow import initiate_workflow
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks  # type: ignore
-from brdgen.brd_tool_executor import BRDExternalTool
+from brdgen.brd_workflow import (
+    CheckpointNotFoundError,
+    ainitiate_workflow,
+    arefine_with_feedback,
+    aresume_workflow,
+    astream_workflow,
+    workflow_registry,
+)
+from fastapi import APIRouter, Body, HTTPException, UploadFile, File  # type: ignore
+from fastapi.responses import FileResponse, Response, StreamingResponse  # type: ignore
+from brdgen.brd_tool_executor import get_external_tool
 
 file = Path(__file__).resolve()
 parent, root = file.parent, file.parents[1]
@@ -23,77 +48,590 @@ sys.path.append(str(root))
 
 api_router = APIRouter()
 
-# This dictionary stores the status and result of tasks
-task_status = {}
+# Stores the status and result of tasks; shared across replicas when backed by Redis
+task_store = create_task_store()
 
+# Bounds how many workflows run at once and how many may wait behind them
+job_queue = BRDJobQueue()
+bind_job_queue(job_queue)
 
-# Helper function to initiate the workflow (long-running task)
-def initiate_workflow_background(
-    assessment_text: str, temp_file_path: str, task_id: str
+# Uploads are streamed to disk in chunks and rejected beyond this size
+MAX_UPLOAD_BYTES = int(os.getenv("BRD_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Assessment documents merged into a single BRD
+MAX_DOCUMENTS_PER_BRD = int(os.getenv("BRD_MAX_DOCUMENTS", "10"))
+
+QUEUED_STATUS = "BRD generation queued"
+IN_PROGRESS_STATUS = "BRD generation In-progress"
+BATCH_IN_PROGRESS_STATUS = "BRD batch In-progress"
+REFINE_QUEUED_STATUS = "BRD refinement queued"
+REFINE_IN_PROGRESS_STATUS = "BRD refinement In-progress"
+# Runs that checkpoint per node and can be resumed on another worker; queued jobs
+# and batches depend on uploads local to the worker that died
+RESUMABLE_STATUSES = (IN_PROGRESS_STATUS, REFINE_IN_PROGRESS_STATUS)
+INTERRUPTED_ERROR = (
+    "The worker processing this task stopped before any progress was saved; "
+    "please resubmit."
+)
+
+
+# Helper function to initiate the workflow (long-running task). It runs on the event
+# loop, so many BRD jobs can be in flight without holding a thread per LLM call.
+async def initiate_workflow_background(
+    temp_file_path: Union[str, List[str]],
+    task_id: str,
+    queued_at: float,
+    document_names: Optional[List[str]] = None,
 ):
+    started_at = time.time()
+    timings = {"wait_seconds": round(started_at - queued_at, 3)}
+    task_store.set(task_id, {"status": IN_PROGRESS_STATUS, **timings})
+    paths = [temp_file_path] if isinstance(temp_file_path, str) else temp_file_path
+    # Node, LLM, extraction and dedup measurements made while this job runs
+    with track_task() as metrics:
+        try:
+            # Extract text from the uploaded assessment files concurrently, off the
+            # event loop
+            texts = await Utility.aextract_texts(paths)
+
+            # Long-running task; several documents are merged and deduplicated first.
+            # The final state is checkpointed under the task ID for /refineBRD.
+            if len(texts) == 1:
+                brd_content, brd_file_path = await ainitiate_workflow(
+                    texts[0], thread_id=task_id
+                )
+            else:
+                brd_content, brd_file_path = await ainitiate_workflow(
+                    texts, document_names=document_names, thread_id=task_id
+                )
+
+            # Once the task is done, update the task status
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    "status": "completed",
+                    "brd_content": brd_content,
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+
+        except Exception as e:
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    "status": "failed",
+                    "error": str(e),
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+        finally:
+            for path in paths:
+                os.remove(path)  # Clean up the temporary files when done
+
+
+# A feedback round resumes the task's checkpoint at the refinement node
+async def refine_workflow_background(task_id: str, feedback: str, queued_at: float):
+    started_at = time.time()
+    previous = task_store.get(task_id) or {}
+    # The error of an earlier failed round must not outlive this one
+    previous.pop("error", None)
+    rounds = previous.get("feedback_rounds", 0)
+    timings = {"wait_seconds": round(started_at - queued_at, 3)}
+    task_store.set(task_id, {**previous, "status": REFINE_IN_PROGRESS_STATUS})
+    with track_task() as metrics:
+        try:
+            brd_content, _ = await arefine_with_feedback(task_id, feedback)
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    **previous,
+                    "status": "completed",
+                    "brd_content": brd_content,
+                    "feedback_rounds": rounds + 1,
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+        except Exception as e:
+            # The previous BRD stays available, and can be refined again
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    **previous,
+                    "status": "failed",
+                    "error": str(e),
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+
+
+# Continues a task whose worker died, from the last node checkpointed under its ID
+async def resume_workflow_background(task_id: str, queued_at: float):
+    started_at = time.time()
+    previous = task_store.get(task_id) or {}
+    previous.pop("error", None)
+    resumed = previous.get("resumed", 0) + 1
+    timings = {"wait_seconds": round(started_at - queued_at, 3)}
+    with track_task() as metrics:
+        try:
+            brd_content, _ = await aresume_workflow(task_id)
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    **previous,
+                    "status": "completed",
+                    "brd_content": brd_content,
+                    "resumed": resumed,
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+        except Exception as e:
+            # Without a checkpoint nothing survived of the original run
+            error = (
+                INTERRUPTED_ERROR if isinstance(e, CheckpointNotFoundError) else str(e)
+            )
+            timings["run_seconds"] = round(time.time() - started_at, 3)
+            task_store.set(
+                task_id,
+                {
+                    **previous,
+                    "status": "failed",
+                    "error": error,
+                    "resumed": resumed,
+                    **timings,
+                    "metrics": metrics.as_dict(),
+                },
+            )
+
+
+def submit_job(job_id: str, record: dict, job, *args: Any) -> int:
+    """
+    Record and queue a job under this worker's lease on its ID. The lease is taken
+    before the record is written, so recovery never mistakes a new job for an orphan,
+    and is released when the job ends.
+    """
+    if not lease_keeper.acquire(job_id):
+        raise HTTPException(status_code=409, detail="Task is held by another worker.")
+    task_store.set(job_id, record)
+
+    async def leased_job():
+        try:
+            await job(*args)
+        finally:
+            lease_keeper.release(job_id)
+
     try:
-        # Long-running task
-        brd_content, brd_file_path = initiate_workflow(assessment_text)
+        return job_queue.submit(job_id, leased_job)
+    except QueueFullError:
+        lease_keeper.release(job_id)
+        raise
 
-        # Once the task is done, update the task status
-        task_status[task_id] = {"status": "completed", "brd_content": brd_content}
 
-    except Exception as e:
-        task_status[task_id] = {"status": "failed", "error": str(e)}
-    finally:
-        os.remove(temp_file_path)  # Clean up the temporary file when done
+async def recover_task(task_id: str) -> None:
+    """Take over an unfinished task whose worker stopped heartbeating."""
+    task = task_store.get(task_id) or {}
+    if task.get("status") in RESUMABLE_STATUSES:
+        submit_job(task_id, task, resume_workflow_background, task_id, time.time())
+    else:
+        task_store.set(
+            task_id, {**task, "status": "failed", "error": INTERRUPTED_ERROR}
+        )
+        lease_keeper.release(task_id)
 
 
-@api_router.post("/generateBRD", status_code=200)
-async def generate_BRD(
-    background_tasks: BackgroundTasks, assessment_file: UploadFile = File(...)
-) -> Any:
-    # Generate a unique task ID
-    task_id = str(uuid.uuid4())
+# Heartbeats for this worker's jobs, and recovery of jobs whose worker died
+lease_keeper = LeaseKeeper(task_store)
+task_recovery = TaskRecovery(task_store, lease_keeper, recover_task)
 
+
+async def save_upload(
+    assessment_file: UploadFile, max_bytes: Optional[int] = None
+) -> str:
+    """Stream the upload to a temporary file in chunks, enforcing MAX_UPLOAD_BYTES."""
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
     # Get the file extension from the original filename
     original_extension = pathlib.Path(assessment_file.filename).suffix
 
+    size = 0
     with tempfile.NamedTemporaryFile(
         suffix=original_extension, delete=False
     ) as temp_file:
         # Write the uploaded file content to a temporary file
-        content = await assessment_file.read()
-        temp_file.write(content)
-        temp_file.flush()
+        while chunk := await assessment_file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            temp_file.write(chunk)
+
+    if size > max_bytes:
+        os.remove(temp_file.name)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit.",
+        )
+
+    return temp_file.name
 
-    # Extract text from the uploaded assessment file
-    assessment_text_fastapi = Utility.extract_text(temp_file.name)
 
-    # Add the long-running task to the background tasks
-    background_tasks.add_task(
-        initiate_workflow_background, assessment_text_fastapi, temp_file.name, task_id
+def queue_full_error(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many BRD jobs queued, please retry later.",
+        headers={"Retry-After": str(retry_after)},
     )
 
-    task_status[task_id] = {"status": "BRD generation In-progress"}
+
+async def save_uploads(
+    uploads: List[UploadFile], max_total_bytes: Optional[int] = None
+) -> List[str]:
+    """
+    save_upload for several files, optionally capping their combined size; nothing
+    is left on disk if one is rejected.
+    """
+    paths = []
+    remaining = max_total_bytes
+    try:
+        for upload in uploads:
+            limit = MAX_UPLOAD_BYTES if remaining is None else remaining
+            try:
+                paths.append(await save_upload(upload, min(MAX_UPLOAD_BYTES, limit)))
+            except HTTPException:
+                if limit < MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail="Files exceed the "
+                        f"{max_total_bytes // (1024 * 1024)} MB limit per request.",
+                    )
+                raise
+            if remaining is not None:
+                remaining -= os.path.getsize(paths[-1])
+    except HTTPException:
+        for path in paths:
+            os.remove(path)
+        raise
+    return paths
+
+
+@api_router.post("/generateBRD", status_code=200)
+async def generate_BRD(
+    assessment_file: Optional[UploadFile] = File(None),
+    assessment_files: Optional[List[UploadFile]] = File(None),
+) -> Any:
+    """
+    Generate one BRD from an assessment. Several documents for the same BRD can be
+    sent as assessment_files; they are merged and deduplicated across documents.
+    """
+    uploads = ([assessment_file] if assessment_file else []) + (assessment_files or [])
+    if not uploads:
+        raise HTTPException(status_code=422, detail="No assessment file provided.")
+    if len(uploads) > MAX_DOCUMENTS_PER_BRD:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_DOCUMENTS_PER_BRD} documents per BRD.",
+        )
+
+    # Reject early, before reading the upload, when there is no room
+    if job_queue.is_full():
+        raise queue_full_error(job_queue.retry_after())
+
+    # Generate a unique task ID
+    task_id = str(uuid.uuid4())
+
+    temp_file_paths = await save_uploads(uploads)
+
+    # Queue the long-running task, text extraction included, so the endpoint returns
+    # without parsing the document; workers pick it up in FIFO order
+    queued_at = time.time()
+    try:
+        position = submit_job(
+            task_id,
+            {"status": QUEUED_STATUS},
+            initiate_workflow_background,
+            temp_file_paths,
+            task_id,
+            queued_at,
+            [upload.filename for upload in uploads],
+        )
+    except QueueFullError as e:
+        task_store.delete(task_id)
+        for path in temp_file_paths:
+            os.remove(path)
+        raise queue_full_error(e.retry_after)
+    task_store.evict_expired()
+    # Checkpoints are kept for /refineBRD until their task record has expired
+    await asyncio.to_thread(prune_checkpoints)
 
     # Return the task ID to the client
     return {
         "message": "BRD generation started, please check back later.",
         "task_id": task_id,
+        "queue_position": position,
+    }
+
+
+def batch_record(status: str, items: List[BatchItem], **fields: Any) -> dict:
+    return {
+        "status": status,
+        "counts": batch_counts(items),
+        "items": [item.as_dict() for item in items],
+        **fields,
     }
 
 
+# A whole batch takes one queue slot and runs its workflows under its own cap
+async def run_batch_background(batch_id: str, items: List[BatchItem], queued_at: float):
+    started_at = time.time()
+    timings = {"wait_seconds": round(started_at - queued_at, 3)}
+
+    def on_update(items: List[BatchItem]) -> None:
+        task_store.set(
+            batch_id, batch_record(BATCH_IN_PROGRESS_STATUS, items, **timings)
+        )
+
+    try:
+        await BRDBatchRunner(on_update=on_update).run(items)
+        await asyncio.to_thread(write_batch_zip, batch_zip_path(batch_id), items)
+        timings["run_seconds"] = round(time.time() - started_at, 3)
+        task_store.set(
+            batch_id,
+            batch_record(
+                "completed",
+                items,
+                result_url=f"/api/v1/batchResult/{batch_id}",
+                **timings,
+            ),
+        )
+    except Exception as e:
+        timings["run_seconds"] = round(time.time() - started_at, 3)
+        task_store.set(batch_id, batch_record("failed", items, error=str(e), **timings))
+    finally:
+        for item in items:
+            os.remove(item.path)
+
+
+@api_router.post("/generateBRD/batch", status_code=200)
+async def generate_BRD_batch(assessment_files: List[UploadFile] = File(...)) -> Any:
+    """
+    Generate one BRD per uploaded assessment. Returns a batch ID; per-item status is
+    at /checkBatchStatus/{batch_id} and the zipped BRDs at /batchResult/{batch_id}.
+    """
+    if len(assessment_files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_FILES} files can be submitted in one batch.",
+        )
+    if job_queue.is_full():
+        raise queue_full_error(job_queue.retry_after())
+
+    batch_id = str(uuid.uuid4())
+    items = [
+        BatchItem(upload.filename, path)
+        for upload, path in zip(
+            assessment_files, await save_uploads(assessment_files, BATCH_MAX_BYTES)
+        )
+    ]
+
+    queued_at = time.time()
+    try:
+        position = submit_job(
+            batch_id,
+            batch_record(QUEUED_STATUS, items),
+            run_batch_background,
+            batch_id,
+            items,
+            queued_at,
+        )
+    except QueueFullError as e:
+        task_store.delete(batch_id)
+        for item in items:
+            os.remove(item.path)
+        raise queue_full_error(e.retry_after)
+    task_store.evict_expired()
+    # Batch zips and checkpoints are removed once their record has expired
+    await asyncio.to_thread(sweep_batch_zips)
+    await asyncio.to_thread(prune_checkpoints)
+
+    return {
+        "message": "BRD batch started, please check back later.",
+        "batch_id": batch_id,
+        "items": [item.as_dict() for item in items],
+        "queue_position": position,
+    }
+
+
+@api_router.get("/checkBatchStatus/{batch_id}", status_code=200)
+async def check_batch_status(batch_id: str) -> Any:
+    return await check_task_status(batch_id)
+
+
+@api_router.get("/batchResult/{batch_id}", status_code=200)
+async def batch_result(batch_id: str) -> Any:
+    """The zipped BRDs (plus manifest.json) of a completed batch."""
+    batch = task_store.get(batch_id)
+    zip_path = batch_zip_path(batch_id)
+    if not batch:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)  # The record expired before the sweep got to it
+        raise HTTPException(status_code=404, detail="Batch ID not found.")
+    if batch["status"] != "completed" or not os.path.exists(zip_path):
+        raise HTTPException(status_code=409, detail="Batch is not completed yet.")
+    return FileResponse(
+        zip_path, media_type="application/zip", filename=f"brd_batch_{batch_id}.zip"
+    )
+
+
+@api_router.post("/refineBRD/{task_id}", status_code=200)
+async def refine_BRD(task_id: str, feedback: str = Body(..., embed=True)) -> Any:
+    """
+    Apply reviewer feedback to a finished BRD. Resumes the task's stored workflow state
+    at the refinement step, so only one LLM call is made; poll /checkTaskStatus.
+    """
+    task = task_store.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task ID not found.")
+    if not is_finished(task) or not task.get("brd_content"):
+        raise HTTPException(
+            status_code=409, detail="Task has no finished BRD to refine."
+        )
+    if not feedback.strip():
+        raise HTTPException(status_code=422, detail="Feedback is empty.")
+    if job_queue.is_full():
+        raise queue_full_error(job_queue.retry_after())
+
+    queued_at = time.time()
+    queued = {**task, "status": REFINE_QUEUED_STATUS}
+    queued.pop("error", None)
+    try:
+        position = submit_job(
+            task_id,
+            queued,
+            refine_workflow_background,
+            task_id,
+            feedback,
+            queued_at,
+        )
+    except QueueFullError as e:
+        task_store.set(task_id, task)
+        raise queue_full_error(e.retry_after)
+
+    return {
+        "message": "BRD refinement started, please check back later.",
+        "task_id": task_id,
+        "queue_position": position,
+    }
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+@api_router.post("/generateBRD/stream", status_code=200)
+async def generate_BRD_stream(assessment_file: UploadFile = File(...)) -> Any:
+    """
+    Generate a BRD and stream progress as Server-Sent Events: node_started and
+    node_completed per graph node, token events as the LLM writes, then completed
+    (or error) with the final BRD. The workflow takes a slot in the job queue like
+    every other run, so a full queue answers 429.
+    """
+    if job_queue.is_full():
+        raise queue_full_error(job_queue.retry_after())
+
+    temp_file_path = await save_upload(assessment_file)
+    try:
+        assessment_text = await Utility.aextract_text(temp_file_path)
+    finally:
+        os.remove(temp_file_path)
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: dict) -> None:
+        # May be called from worker threads as well as the event loop
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    workflows: List[asyncio.Task] = []
+
+    async def run() -> None:
+        try:
+            await astream_workflow(assessment_text, emit)
+        except Exception as e:
+            emit({"event": "error", "error": str(e)})
+
+    async def stream_job() -> None:
+        # Its own task, so a disconnect cancels the workflow and not the queue worker
+        workflow = asyncio.create_task(run())
+        workflows.append(workflow)
+        await asyncio.wait([workflow])
+
+    # Not leased: a stream has no task record and cannot be resumed elsewhere
+    stream_id = f"stream-{uuid.uuid4()}"
+    try:
+        job_queue.submit(stream_id, stream_job)
+    except QueueFullError as e:
+        raise queue_full_error(e.retry_after)
+
+    async def event_source():
+        try:
+            while True:
+                event = await events.get()
+                yield format_sse(event)
+                if event["event"] in ("completed", "error"):
+                    break
+        finally:
+            # The client disconnected: stop the workflow instead of running it unread
+            job_queue.discard(stream_id)
+            for workflow in workflows:
+                workflow.cancel()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @api_router.get("/checkTaskStatus/{task_id}", status_code=200)
 async def check_task_status(task_id: str) -> Any:
     # Check the status of the task based on the task_id
-    task = task_status.get(task_id)
+    task = task_store.get(task_id)
 
     if not task:
         return {"message": "Task ID not found."}
 
+    # Queue positions are only known to the replica holding the job
+    position = job_queue.position(task_id)
+    if position is not None:
+        task["queue_position"] = position
+
     # Return task status and result if completed
     return task
 
 
+@api_router.get("/queueStats", status_code=200)
+async def queue_stats() -> Any:
+    return job_queue.stats()
+
+
+@api_router.get("/admin/workflowDiagram", status_code=200)
+def workflow_diagram() -> Any:
+    # Rendering goes through Mermaid and may need network access, so it is
+    # only done on explicit request and never as part of BRD generation.
+    image_bytes = workflow_registry.get().get_graph().draw_mermaid_png()
+    return Response(content=image_bytes, media_type="image/png")
+
+
 @api_router.get("/searchTool", status_code=200)
 def search_Tool() -> Any:
-    return BRDExternalTool().search()
+    return get_external_tool().search()
 
 
 """
@@ -1,6 +1,11 @@
 import gradio as gr  # type: ignore
-from brdgen.brd_workflow import initiate_workflow
+from brdgen.brd_workflow import (
+    initiate_workflow,
+    refine_with_feedback,
+    workflow_registry,
+)
 import threading
+import uuid
 from queue import Queue
 from brdgen.brd_utility import Utility
 
@@ -9,19 +14,26 @@ def generate_new_BRD(assessment_file):
     try:
         print("generate_new_BRD")
         assessment_text_gradio = Utility.extract_text(assessment_file.name)
+        # Checkpointed under a thread ID so feedback rounds resume from this run
+        thread_id = str(uuid.uuid4())
         brd_content, brd_file_path = initiate_workflow(
-            assessment_text=assessment_text_gradio
+            assessment_text=assessment_text_gradio, thread_id=thread_id
         )
-        return brd_content, brd_file_path
+        return brd_content, brd_file_path, thread_id
     except Exception as e:
         print(e)
-        return e, None
+        return e, None, None
 
 
-"""	
-def updated_existing_BRD():
-    pass
-"""
+def updated_existing_BRD(feedback, thread_id):
+    if not thread_id:
+        return "Generate a BRD before refining it.", None
+    try:
+        print("updated_existing_BRD")
+        return refine_with_feedback(thread_id, feedback)
+    except Exception as e:
+        print(e)
+        return e, None
 
 
 def create_brd_interface():
@@ -39,37 +51,37 @@ def create_brd_interface():
                 # BRD Download
                 brd_download = gr.File(label="Download BRD")
 
-                """
                 # Feedback Input
                 feedback_input = gr.Textbox(
                     label="Refine BRD (Provide Feedback)", lines=5, interactive=True
                 )
                 refine_btn = gr.Button("Refine BRD")
-                """
 
             with gr.Column():
                 # BRD Content Display
                 brd_output = gr.Textbox(label="BRD Content", lines=15, interactive=True)
 
+        # Workflow thread of the BRD shown, used to resume it with feedback
+        thread_state = gr.State()
+
         # Event Handlers
         generate_btn.click(
             generate_new_BRD,
             inputs=assessment_input,
-            outputs=[brd_output, brd_download],
+            outputs=[brd_output, brd_download, thread_state],
             api_name="gererateBRD",
         )
 
-        """
         refine_btn.click(
             updated_existing_BRD,
-            inputs=feedback_input,
+            inputs=[feedback_input, thread_state],
             outputs=[brd_output, brd_download],
         )
-        """
 
     return demo
 
 
 if __name__ == "__main__":
+    workflow_registry.warm(checkpointed=True)
     demo = create_brd_interface()
     demo.launch(share=True)
@@ -0,0 +1,76 @@
+"""
+Compare sequential and parallel PDF text extraction across page counts.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--pages 10 50 150 300] [--workers 4] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from benchmarks.fixtures import write_synthetic_pdf
+from brdgen.brd_utility import Utility, available_cpus
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(page_counts, workers: int, repeat: int):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in page_counts:
+            path = write_synthetic_pdf(os.path.join(tmp, f"{pages}.pdf"), pages)
+            sequential = min(
+                _time(lambda: list(Utility.iter_pdf_pages(path, workers=1)))
+                for _ in range(repeat)
+            )
+            parallel = min(
+                _time(
+                    lambda: list(
+                        Utility.iter_pdf_pages(
+                            path, workers=workers, min_pages_for_parallel=0
+                        )
+                    )
+                )
+                for _ in range(repeat)
+            )
+            results.append(
+                {
+                    "pages": pages,
+                    "workers": workers,
+                    "sequential_seconds": sequential,
+                    "parallel_seconds": parallel,
+                    "speedup": sequential / parallel,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 150, 300])
+    parser.add_argument("--workers", type=int, default=available_cpus())
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.workers, args.repeat)
+    print(f"{'pages':>6}{'sequential':>12}{'parallel':>10}{'speedup':>9}")
+    for r in results:
+        print(
+            f"{r['pages']:>6}{r['sequential_seconds']:>12.3f}"
+            f"{r['parallel_seconds']:>10.3f}{r['speedup']:>8.2f}x"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,72 @@
+"""
+Compare self-consistency similarity backends on BRD-sized texts.
+
+Usage:
+    python benchmarks/bench_similarity.py [--words 3000] [--samples 2 3 5 8] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import numpy as np
+
+from benchmarks.fixtures import synthetic_generations
+from brdgen.brd_similarity import SIMILARITY_BACKENDS
+
+
+def run(words: int, sample_counts, repeat: int):
+    results = []
+    for num_samples in sample_counts:
+        generations = synthetic_generations(num_samples, words=words)
+        n = len(generations)
+        group = []
+        for name, backend_cls in SIMILARITY_BACKENDS.items():
+            backend = backend_cls()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                matrix = backend.pairwise(generations)
+                timings.append(time.perf_counter() - start)
+
+            group.append(
+                {
+                    "backend": name,
+                    "num_samples": num_samples,
+                    "words": words,
+                    "seconds": min(timings),
+                    "mean_similarity": float(matrix[np.triu_indices(n, k=1)].mean()),
+                    "selected_index": int(((matrix.sum(axis=1) - 1) / (n - 1)).argmax()),
+                }
+            )
+
+        reference = next(r["selected_index"] for r in group if r["backend"] == "difflib")
+        for result in group:
+            result["agrees_with_difflib"] = result["selected_index"] == reference
+        results.extend(group)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--samples", type=int, nargs="+", default=[2, 3, 5, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH")
+    args = parser.parse_args()
+
+    results = run(args.words, args.samples, args.repeat)
+    print(f"{'backend':<10}{'samples':>8}{'seconds':>12}{'mean sim':>10}{'agrees':>8}")
+    for r in results:
+        print(
+            f"{r['backend']:<10}{r['num_samples']:>8}{r['seconds']:>12.4f}"
+            f"{r['mean_similarity']:>10.3f}{str(r['agrees_with_difflib']):>8}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,284 @@
+"""
+Offline microbenchmark suite for the CPU-bound pipeline stages.
+
+Runs synthetic, deterministic inputs through text extraction (PDF/DOCX), clean_text,
+chunking, embedding and consistency analysis, and writes results as JSON so runs on
+different commits can be compared.
+
+Usage:
+    python benchmarks/bench_suite.py [--only clean_text chunking] [--json out.json]
+    python benchmarks/bench_suite.py --compare baseline.json [--json current.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from benchmarks.fixtures import (
+    synthetic_assessment,
+    synthetic_generations,
+    write_synthetic_docx,
+    write_synthetic_pdf,
+)
+from brdgen.brd_utility import Utility
+
+# Bump when cases or their inputs change, so results are only compared like for like
+SUITE_VERSION = 1
+
+
+def measure(
+    fn: Callable[[], Any], rounds: int, warmup: int = 1, min_seconds: float = 0.0
+) -> Dict[str, Any]:
+    """Time fn: `warmup` untimed calls, then at least `rounds` timed calls."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < rounds or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "rounds": len(timings),
+        "min": min(timings),
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def case(
+    group: str,
+    params: Dict[str, Any],
+    stats: Dict[str, Any],
+    units: Optional[float] = None,
+    unit: Optional[str] = None,
+) -> Dict[str, Any]:
+    """One result row; throughput is units per second at the median time."""
+    name = group + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+    result = {"group": group, "name": name, "params": params, **stats}
+    if units is not None:
+        result["throughput"] = units / stats["median"]
+        result["throughput_unit"] = f"{unit}/s"
+    return result
+
+
+def bench_extract_text(tmp: str, rounds: int) -> List[Dict[str, Any]]:
+    results = []
+    for pages in (5, 25, 100):
+        path = write_synthetic_pdf(os.path.join(tmp, f"doc_{pages}.pdf"), pages)
+        stats = measure(lambda: Utility.extract_text(path, use_cache=False), rounds)
+        results.append(
+            case("extract_text", {"type": "pdf", "pages": pages}, stats, pages, "pages")
+        )
+    for paragraphs in (50, 500, 2000):
+        path = write_synthetic_docx(os.path.join(tmp, f"doc_{paragraphs}.docx"), paragraphs)
+        stats = measure(lambda: Utility.extract_text(path, use_cache=False), rounds)
+        results.append(
+            case(
+                "extract_text",
+                {"type": "docx", "paragraphs": paragraphs},
+                stats,
+                paragraphs,
+                "paragraphs",
+            )
+        )
+    return results
+
+
+def bench_clean_text(tmp: str, rounds: int) -> List[Dict[str, Any]]:
+    results = []
+    for words in (10_000, 100_000):
+        text = synthetic_assessment(words)
+        stats = measure(lambda: Utility.clean_text(text), rounds)
+        results.append(
+            case("clean_text", {"words": words}, stats, len(text) / 1e6, "MB")
+        )
+    return results
+
+
+def bench_chunking(tmp: str, rounds: int) -> List[Dict[str, Any]]:
+    from brdgen.brd_rag_agent_chroma import BRDRAG
+
+    rag = BRDRAG(persist_directory=os.path.join(tmp, "chroma"), cache_dir=tmp)
+    results = []
+    for words in (10_000, 100_000):
+        text = Utility.clean_text(synthetic_assessment(words))
+        stats = measure(lambda: rag.load_documents_content(text), rounds)
+        chunks = len(rag.load_documents_content(text))
+        results.append(
+            case(
+                "chunking",
+                {"method": "load_documents_content", "words": words},
+                {**stats, "chunks": chunks},
+                chunks,
+                "chunks",
+            )
+        )
+
+        documents = rag.load_documents_content(text)
+        stats = measure(lambda: rag.splitDoc(documents), rounds)
+        splits = len(rag.splitDoc(documents))
+        results.append(
+            case(
+                "chunking",
+                {"method": "splitDoc", "words": words},
+                {**stats, "chunks": splits},
+                splits,
+                "chunks",
+            )
+        )
+    return results
+
+
+def bench_embedding(tmp: str, rounds: int) -> List[Dict[str, Any]]:
+    # Needs the FastEmbed model files; reported as skipped when they can't be loaded
+    from brdgen.brd_embedding import embedding_provider
+
+    try:
+        model = embedding_provider.get()
+        model.embed_query("warmup")
+    except Exception as e:
+        reason = " ".join(str(e).split())
+        return [{"group": "embedding", "name": "embedding", "skipped": reason}]
+
+    text = Utility.clean_text(synthetic_assessment(20_000))
+    chunks = [text[i : i + 500] for i in range(0, len(text), 450)][:256]
+    stats = measure(lambda: model.embed_documents(chunks), max(rounds // 2, 1))
+    return [
+        case(
+            "embedding",
+            {"model": embedding_provider.model_id, "chunks": len(chunks)},
+            stats,
+            len(chunks),
+            "chunks",
+        )
+    ]
+
+
+def bench_analyze_consistency(tmp: str, rounds: int) -> List[Dict[str, Any]]:
+    from brdgen.brd_gen_agent import BRDGenerator
+
+    results = []
+    for backend in ("cosine", "minhash"):
+        generator = BRDGenerator(
+            api_key="benchmark", model="benchmark", similarity_backend=backend
+        )
+        for num_samples in (2, 3, 5, 8):
+            generations = synthetic_generations(num_samples, words=3000)
+            stats = measure(lambda: generator.analyze_consistency(generations), rounds)
+            results.append(
+                case(
+                    "analyze_consistency",
+                    {"backend": backend, "num_samples": num_samples, "words": 3000},
+                    stats,
+                )
+            )
+    return results
+
+
+BENCHMARKS = {
+    "extract_text": bench_extract_text,
+    "clean_text": bench_clean_text,
+    "chunking": bench_chunking,
+    "embedding": bench_embedding,
+    "analyze_consistency": bench_analyze_consistency,
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(only: Optional[List[str]], rounds: int) -> Dict[str, Any]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, bench in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            print(f"Running {name}...", file=sys.stderr)
+            results.extend(bench(tmp, rounds))
+    return {
+        "suite_version": SUITE_VERSION,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median ratio current/baseline per case present in both runs (>1 is slower)."""
+    if baseline.get("suite_version") != current.get("suite_version"):
+        print("Suite versions differ; cases may not be comparable", file=sys.stderr)
+    before = {r["name"]: r for r in baseline["results"] if "median" in r}
+    rows = []
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None or "median" not in result:
+            continue
+        rows.append(
+            {
+                "name": result["name"],
+                "baseline_median": old["median"],
+                "current_median": result["median"],
+                "ratio": result["median"] / old["median"],
+            }
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    args = parser.parse_args()
+
+    report = run(args.only, args.rounds)
+    print(f"{'case':<72}{'median s':>12}{'throughput':>22}")
+    for r in report["results"]:
+        if "skipped" in r:
+            print(f"{r['name']:<72}{'skipped':>12}  {r['skipped'][:80]}")
+            continue
+        throughput = (
+            f"{r['throughput']:.1f} {r['throughput_unit']}" if "throughput" in r else ""
+        )
+        print(f"{r['name']:<72}{r['median']:>12.5f}{throughput:>22}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            rows = compare(json.load(f), report)
+        print(f"\n{'case':<72}{'ratio':>8}")
+        for row in rows:
+            print(f"{row['name']:<72}{row['ratio']:>8.2f}")
+        report["comparison"] = {"baseline": args.compare, "cases": rows}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,91 @@
+"""
+Compare the sequential and fan-out/fan-in context-gathering topologies of the BRD graph.
+
+Graph nodes are replaced with sleeps of the given latencies so only the topology is
+measured; the numbers are wall-clock seconds per workflow run.
+
+Usage:
+    python benchmarks/bench_workflow_topology.py [--retrieval 0.4] [--tools 0.8] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+os.environ.setdefault("MISTRAL_API", "benchmark")
+
+from brdgen.brd_workflow import BRDGraphNode, create_brd_workflow, initial_state
+
+
+def patch_nodes(latencies):
+    def sleeper(seconds, update):
+        async def node(self, state, config=None):
+            await asyncio.sleep(seconds)
+            return update(state)
+
+        return node
+
+    BRDGraphNode.aretrieve_vector = sleeper(
+        latencies["retrieval"], lambda s: {"rag_result": "context"}
+    )
+    BRDGraphNode.aexec_tool_brd = sleeper(
+        latencies["tools"], lambda s: {"tool_result": "research"}
+    )
+    BRDGraphNode.acondense_assessment = sleeper(0, lambda s: {"assessment_digest": None})
+    BRDGraphNode.agenerate_brd = sleeper(
+        latencies["generate"], lambda s: {"brd_content": "BRD", "iteration_count": 0}
+    )
+    BRDGraphNode.arefine_brd = sleeper(
+        latencies["refine"], lambda s: {"iteration_count": s["iteration_count"] + 1}
+    )
+    BRDGraphNode.asave_brd = sleeper(0, lambda s: {"brd_file_path": "brd.docx"})
+
+
+async def time_topology(parallel_context: bool, repeat: int) -> float:
+    app = create_brd_workflow(use_async=True, parallel_context=parallel_context).compile()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await app.ainvoke(initial_state("assessment"))
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(latencies, repeat: int):
+    patch_nodes(latencies)
+    results = []
+    for name, parallel in (("sequential", False), ("parallel", True)):
+        seconds = asyncio.run(time_topology(parallel, repeat))
+        results.append({"topology": name, "seconds": seconds, **latencies})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--retrieval", type=float, default=0.4)
+    parser.add_argument("--tools", type=float, default=0.8)
+    parser.add_argument("--generate", type=float, default=0.5)
+    parser.add_argument("--refine", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH")
+    args = parser.parse_args()
+
+    latencies = {
+        "retrieval": args.retrieval,
+        "tools": args.tools,
+        "generate": args.generate,
+        "refine": args.refine,
+    }
+    results = run(latencies, args.repeat)
+    print(f"{'topology':<12}{'seconds':>10}")
+    for r in results:
+        print(f"{r['topology']:<12}{r['seconds']:>10.3f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
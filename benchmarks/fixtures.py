@@ -0,0 +1,136 @@
+"""Synthetic, deterministic inputs shared by the offline benchmarks."""
+
+import random
+from typing import List
+
+import brdgen.brd_prompts as prompts
+
+_VOCABULARY = (
+    "system user business process data integration report workflow approval "
+    "invoice order customer vendor material inventory finance module migration "
+    "requirement interface security role access performance availability audit "
+    "compliance SAP S/4HANA legacy cloud analytics dashboard notification batch "
+    "real-time validation master record stakeholder scope timeline risk budget"
+).split()
+
+# Compound terms give a realistically large vocabulary; Zipf-like weights keep a few
+# terms frequent and most of them rare, as in real documents.
+_TERMS = _VOCABULARY + [f"{a}-{b}" for a in _VOCABULARY for b in _VOCABULARY if a != b]
+_WEIGHTS = [1 / (rank + 1) for rank in range(len(_TERMS))]
+
+
+def synthetic_words(rng: random.Random, count: int) -> List[str]:
+    return rng.choices(_TERMS, weights=_WEIGHTS, k=count)
+
+
+def synthetic_paragraph(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(8, 20))
+        sentence = " ".join(synthetic_words(rng, length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+
+def synthetic_brd(words: int = 3000, seed: int = 0) -> str:
+    """A BRD-shaped document with the standard sections and roughly `words` words."""
+    rng = random.Random(seed)
+    per_section = max(words // len(prompts.STANDARD_SECTIONS), 1)
+    parts = []
+    for section in prompts.STANDARD_SECTIONS:
+        parts.append(section)
+        parts.append(synthetic_paragraph(rng, per_section))
+    return "\n\n".join(parts)
+
+
+def synthetic_generations(
+    num_samples: int, words: int = 3000, edit_rate: float = 0.15, seed: int = 0
+) -> List[str]:
+    """Variants of one BRD, each with a fraction of its words replaced, like LLM samples."""
+    base = synthetic_brd(words, seed).split(" ")
+    generations = []
+    for sample in range(num_samples):
+        rng = random.Random(seed * 1000 + sample + 1)
+        tokens = [
+            synthetic_words(rng, 1)[0] if rng.random() < edit_rate else token
+            for token in base
+        ]
+        generations.append(" ".join(tokens))
+    return generations
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_synthetic_pdf(
+    path: str, pages: int, words_per_page: int = 400, seed: int = 0
+) -> str:
+    """Write a text-only PDF with the given number of pages, without extra dependencies."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for _ in range(pages):
+        words = synthetic_words(rng, words_per_page)
+        lines = [" ".join(words[i : i + 12]) for i in range(0, len(words), 12)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL\n" + "\n".join(
+            f"({_pdf_escape(line)}) '" for line in lines
+        ) + "\nET"
+        data = stream.encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+        )
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def write_synthetic_docx(
+    path: str, paragraphs: int, words_per_paragraph: int = 80, seed: int = 0
+) -> str:
+    """Write a DOCX with the given number of synthetic paragraphs."""
+    import docx  # type: ignore
+
+    rng = random.Random(seed)
+    document = docx.Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(synthetic_paragraph(rng, words_per_paragraph))
+    document.save(path)
+    return path
+
+
+def synthetic_assessment(words: int, seed: int = 0) -> str:
+    """Unstructured assessment-like text with stray whitespace and control characters."""
+    rng = random.Random(seed)
+    paragraphs = []
+    while words > 0:
+        length = min(words, rng.randint(60, 200))
+        paragraphs.append(synthetic_paragraph(rng, length))
+        words -= length
+    return "\n\n\n\t".join(paragraphs) + "\x0c"
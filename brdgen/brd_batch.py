@@ -0,0 +1,236 @@
+"""
+Batch BRD generation: many assessments, one shared set of models and clients.
+
+Usage:
+    python -m brdgen.brd_batch a.pdf b.docx c.pdf --out brds.zip [--concurrency 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from brdgen.brd_metrics import track_task
+from brdgen.brd_rag_agent_chroma import BRDRAG
+from brdgen.brd_task_store import TASK_TTL_SECONDS
+from brdgen.brd_utility import Utility
+from brdgen.brd_workflow import ainitiate_workflow
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+# Workflows of one batch running at once; all of them share the compiled graph
+BATCH_CONCURRENCY = int(os.getenv("BRD_BATCH_CONCURRENCY", "3"))
+BATCH_MAX_FILES = int(os.getenv("BRD_BATCH_MAX_FILES", "50"))
+# Total upload size of one batch, on top of the per-file limit
+BATCH_MAX_BYTES = int(os.getenv("BRD_BATCH_MAX_MB", "200")) * 1024 * 1024
+BATCH_OUTPUT_DIR = os.getenv("BRD_BATCH_OUTPUT_DIR", "generated_brds/batches")
+
+QUEUED = "queued"
+EXTRACTING = "extracting"
+GENERATING = "generating"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@dataclass
+class BatchItem:
+    filename: str
+    path: str
+    status: str = QUEUED
+    error: Optional[str] = None
+    assessment_text: Optional[str] = field(default=None, repr=False)
+    brd_content: Optional[str] = field(default=None, repr=False)
+    metrics: Optional[Dict[str, Any]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        item = {"filename": self.filename, "status": self.status}
+        if self.error:
+            item["error"] = self.error
+        if self.metrics:
+            item["metrics"] = self.metrics
+        return item
+
+
+def batch_counts(items: List[BatchItem]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    return counts
+
+
+def _docx_names(items: List[BatchItem]) -> List[str]:
+    """One unique .docx name per item, derived from the uploaded filename."""
+    names, seen = [], {}
+    for item in items:
+        stem = os.path.splitext(os.path.basename(item.filename))[0] or "assessment"
+        seen[stem] = seen.get(stem, 0) + 1
+        suffix = f"_{seen[stem]}" if seen[stem] > 1 else ""
+        names.append(f"{stem}{suffix}_brd.docx")
+    return names
+
+
+def write_batch_zip(zip_path: str, items: List[BatchItem]) -> str:
+    """One BRD .docx per completed item plus manifest.json with every item's status."""
+    os.makedirs(os.path.dirname(zip_path) or ".", exist_ok=True)
+    manifest = []
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for item, name in zip(items, _docx_names(items)):
+            entry = item.as_dict()
+            if item.status == COMPLETED and item.brd_content:
+                archive.writestr(name, Utility.brd_docx_bytes(item.brd_content))
+                entry["brd_file"] = name
+            manifest.append(entry)
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return zip_path
+
+
+def prewarm_embeddings(texts: List[str]) -> int:
+    """
+    Embed the chunks of every assessment in one batched call.
+
+    Chunk vectors are cached by content hash, so each workflow's own indexing step then
+    finds them in the cache instead of embedding its document separately.
+    """
+    rag = BRDRAG()
+    chunks = [
+        split.page_content
+        for text in texts
+        for split in rag.splitDoc(rag.load_documents_content(text))
+    ]
+    if chunks:
+        rag.embeddings.embed_documents(chunks)
+    return len(chunks)
+
+
+class BRDBatchRunner:
+    """
+    Runs a batch of assessments: extraction in parallel, one shared embedding pass,
+    then the BRD workflows with at most `concurrency` in flight. on_update is called
+    with the items whenever an item changes status.
+    """
+
+    def __init__(
+        self,
+        workflow: Optional[Callable[[str], Awaitable[Tuple[str, str]]]] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+        on_update: Optional[Callable[[List[BatchItem]], None]] = None,
+        prewarm: Callable[[List[str]], int] = prewarm_embeddings,
+    ) -> None:
+        self.workflow = workflow or ainitiate_workflow
+        self.concurrency = max(1, concurrency)
+        self.on_update = on_update
+        self.prewarm = prewarm
+
+    def _set(self, items: List[BatchItem], item: BatchItem, status: str, error=None):
+        item.status = status
+        item.error = error
+        if self.on_update is not None:
+            self.on_update(items)
+
+    async def _extract(self, items: List[BatchItem], item: BatchItem) -> None:
+        self._set(items, item, EXTRACTING)
+        try:
+            item.assessment_text = await Utility.aextract_text(item.path)
+        except Exception as e:
+            self._set(items, item, FAILED, str(e))
+
+    async def _generate(
+        self, items: List[BatchItem], item: BatchItem, semaphore: asyncio.Semaphore
+    ) -> None:
+        async with semaphore:
+            self._set(items, item, GENERATING)
+            # Each item gets its own node/LLM accounting
+            with track_task() as metrics:
+                try:
+                    item.brd_content, _ = await self.workflow(item.assessment_text)
+                    if not item.brd_content:
+                        raise ValueError("BRD content is empty")
+                    item.metrics = metrics.as_dict()
+                    self._set(items, item, COMPLETED)
+                except Exception as e:
+                    item.metrics = metrics.as_dict()
+                    self._set(items, item, FAILED, str(e))
+
+    async def run(self, items: List[BatchItem]) -> List[BatchItem]:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._extract(items, item) for item in items))
+        extracted = [item for item in items if item.status != FAILED]
+        print(f"Extracted {len(extracted)}/{len(items)} assessments")
+
+        try:
+            chunks = await asyncio.to_thread(
+                self.prewarm, [item.assessment_text for item in extracted]
+            )
+            print(f"Embedded {chunks} chunks for the batch")
+        except Exception as e:
+            # Not fatal: each workflow embeds its own chunks as usual
+            print(f"Batch embedding failed: {e}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(self._generate(items, item, semaphore) for item in extracted)
+        )
+        print(
+            f"Batch of {len(items)} finished in {time.perf_counter() - started:.1f}s: "
+            f"{batch_counts(items)}"
+        )
+        return items
+
+
+def batch_zip_path(batch_id: str, output_dir: str = BATCH_OUTPUT_DIR) -> str:
+    return os.path.join(output_dir, f"{batch_id}.zip")
+
+
+def sweep_batch_zips(
+    output_dir: str = BATCH_OUTPUT_DIR, max_age_seconds: float = TASK_TTL_SECONDS
+) -> int:
+    """
+    Delete batch zips older than max_age_seconds. The batch record is written with the
+    zip, so by then the record has expired and the zip can no longer be served.
+    """
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    try:
+        entries = list(os.scandir(output_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith(".zip") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # Swept by another worker
+    return removed
+
+
+async def arun_batch(
+    paths: List[str],
+    zip_path: Optional[str] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+) -> Tuple[List[BatchItem], str]:
+    """Run a batch over local files and write the zipped result."""
+    items = [BatchItem(os.path.basename(path), path) for path in paths]
+    await BRDBatchRunner(concurrency=concurrency).run(items)
+    zip_path = zip_path or batch_zip_path(str(uuid.uuid4()))
+    return items, write_batch_zip(zip_path, items)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="+", help="assessment PDF/DOCX files")
+    parser.add_argument("--out", metavar="PATH", help="zip file to write")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    items, path = asyncio.run(arun_batch(args.files, args.out, args.concurrency))
+    for item in items:
+        error = f" ({item.error})" if item.error else ""
+        print(f"{item.filename}: {item.status}{error}")
+    print(f"Batch result saved at: {path}")
@@ -0,0 +1,566 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import aiosqlite  # type: ignore
+from brdgen.brd_task_store import TASK_STORE_URL, TASK_TTL_SECONDS
+from dotenv import load_dotenv  # type: ignore
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (  # type: ignore
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver  # type: ignore
+from langgraph.checkpoint.sqlite import SqliteSaver  # type: ignore
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # type: ignore
+
+load_dotenv()
+
+
+def _default_checkpoint_url(task_store_url: str) -> str:
+    """Checkpoints live next to the task records, so every replica that can see a
+    task can also resume it."""
+    if task_store_url.startswith(("redis://", "rediss://", "unix://", "memory://")):
+        return task_store_url
+    if task_store_url.startswith("sqlite:///"):
+        directory = os.path.dirname(task_store_url[len("sqlite:///") :])
+        return f"sqlite:///{os.path.join(directory, 'checkpoints.sqlite')}"
+    return "sqlite:///data/checkpoints.sqlite"
+
+
+# Graph state per task, so feedback rounds and crashed runs resume instead of
+# re-running the pipeline: sqlite:///path, redis://host:6379/0 or memory://
+CHECKPOINT_URL = os.getenv("BRD_CHECKPOINT_URL") or _default_checkpoint_url(
+    TASK_STORE_URL
+)
+# A thread's checkpoints are dropped this long after its last write; the finished task
+# record is written right after the last checkpoint and expires TASK_TTL_SECONDS later
+CHECKPOINT_TTL_SECONDS = int(
+    os.getenv("BRD_CHECKPOINT_TTL_SECONDS", str(TASK_TTL_SECONDS + 60 * 60))
+)
+# "sync" persists every node's output before the next node starts, so a run cut
+# short by a crash resumes from its last finished node. "async" overlaps the write
+# with the next node; "exit" stores one checkpoint per run and cannot resume.
+CHECKPOINT_DURABILITY = os.getenv("BRD_CHECKPOINT_DURABILITY", "sync")
+
+# 100 ns intervals between the UUID epoch (1582-10-15) and the Unix epoch
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+# memory:// is process-local; one saver so sync and async graphs share threads
+_memory_saver: Optional[InMemorySaver] = None
+
+
+def _pack(typed: Tuple[str, bytes]) -> bytes:
+    return typed[0].encode("utf-8") + b"\x00" + typed[1]
+
+
+def _unpack(data: bytes) -> Tuple[str, bytes]:
+    type_, _, value = data.partition(b"\x00")
+    return type_.decode("utf-8"), value
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpoint saver on plain Redis commands (no RedisJSON/RediSearch), so
+    it works with the same server as RedisTaskStore. Every key of a thread expires
+    ttl_seconds after the thread's last write.
+
+    Per thread and namespace: a sorted set of checkpoint IDs (equal scores, so they
+    sort lexicographically, i.e. by time), a hash per checkpoint, a hash per
+    checkpoint's pending writes, and one hash of channel values by version, so a
+    checkpoint only stores the channels that changed.
+    """
+
+    KEY_PREFIX = "brd:checkpoint:"
+
+    def __init__(
+        self,
+        url: str = "",
+        ttl_seconds: Optional[int] = CHECKPOINT_TTL_SECONDS,
+        client=None,
+    ) -> None:
+        super().__init__()
+        if client is None:
+            import redis  # type: ignore
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, thread_id: str, *parts: str) -> str:
+        return ":".join((f"{self.KEY_PREFIX}{thread_id}",) + parts)
+
+    def _ns_key(self, thread_id: str, checkpoint_ns: str, *parts: str) -> str:
+        return self._key(thread_id, f"ns={checkpoint_ns}", *parts)
+
+    def _touch(self, pipe, thread_id: str, checkpoint_ns: str, keys: List[str]) -> None:
+        """Register keys with their thread and push the thread's expiry out."""
+        index = self._key(thread_id, "keys")
+        namespaces = self._key(thread_id, "namespaces")
+        pipe.sadd(index, *keys)
+        pipe.sadd(namespaces, checkpoint_ns)
+        if self.ttl_seconds:
+            for key in keys + [index, namespaces]:
+                pipe.expire(key, self.ttl_seconds)
+
+    def _config(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def _checkpoint_ids(self, thread_id: str, checkpoint_ns: str) -> List[str]:
+        """Newest first."""
+        key = self._ns_key(thread_id, checkpoint_ns, "checkpoints")
+        return [_decode(c) for c in self.client.zrevrange(key, 0, -1)]
+
+    def _load(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> Optional[CheckpointTuple]:
+        saved = self.client.hgetall(
+            self._ns_key(thread_id, checkpoint_ns, "checkpoint", checkpoint_id)
+        )
+        if not saved:
+            return None
+        checkpoint = self.serde.loads_typed(_unpack(saved[b"checkpoint"]))
+
+        versions = list(checkpoint["channel_versions"].items())
+        blobs = self.client.hmget(
+            self._ns_key(thread_id, checkpoint_ns, "blobs"),
+            [f"{channel}\x00{version}" for channel, version in versions],
+        )
+        channel_values = {}
+        for (channel, _), blob in zip(versions, blobs):
+            if blob is not None:
+                typed = _unpack(blob)
+                if typed[0] != "empty":
+                    channel_values[channel] = self.serde.loads_typed(typed)
+
+        writes = []
+        stored_writes = self.client.hgetall(
+            self._ns_key(thread_id, checkpoint_ns, "writes", checkpoint_id)
+        )
+        for value in stored_writes.values():
+            header, _, data = value.partition(b"\x00")
+            task_id, channel, idx, type_ = json.loads(header)
+            value = self.serde.loads_typed((type_, data))
+            writes.append((task_id, idx, channel, value))
+        writes.sort(key=lambda write: (write[0], write[1]))
+
+        parent = _decode(saved.get(b"parent") or b"")
+        return CheckpointTuple(
+            config=self._config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(_unpack(saved[b"metadata"])),
+            parent_config=(
+                self._config(thread_id, checkpoint_ns, parent) if parent else None
+            ),
+            pending_writes=[
+                (task_id, channel, value) for task_id, _, channel, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = self.client.zrevrange(
+                self._ns_key(thread_id, checkpoint_ns, "checkpoints"), 0, 0
+            )
+            if not latest:
+                return None
+            checkpoint_id = _decode(latest[0])
+        return self._load(thread_id, checkpoint_ns, checkpoint_id)
+
+    def _thread_ids(self) -> List[str]:
+        pattern = f"{self.KEY_PREFIX}*:namespaces"
+        return [
+            _decode(key)[len(self.KEY_PREFIX) : -len(":namespaces")]
+            for key in self.client.scan_iter(match=pattern, count=500)
+        ]
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        configurable = (config or {}).get("configurable", {})
+        thread_ids = (
+            [str(configurable["thread_id"])] if config else self._thread_ids()
+        )
+        before_id = get_checkpoint_id(before) if before else None
+        for thread_id in thread_ids:
+            if "checkpoint_ns" in configurable:
+                namespaces = [configurable["checkpoint_ns"]]
+            else:
+                namespaces = [
+                    _decode(ns)
+                    for ns in self.client.smembers(self._key(thread_id, "namespaces"))
+                ]
+            for checkpoint_ns in namespaces:
+                for checkpoint_id in self._checkpoint_ids(thread_id, checkpoint_ns):
+                    if config and get_checkpoint_id(config) not in (
+                        None,
+                        checkpoint_id,
+                    ):
+                        continue
+                    if before_id and checkpoint_id >= before_id:
+                        continue
+                    saved = self._load(thread_id, checkpoint_ns, checkpoint_id)
+                    if saved is None:
+                        continue
+                    metadata = saved.metadata
+                    if filter and any(metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                    if limit is not None:
+                        if limit <= 0:
+                            return
+                        limit -= 1
+                    yield saved
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = checkpoint["id"]
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+
+        blobs_key = self._ns_key(thread_id, checkpoint_ns, "blobs")
+        checkpoint_key = self._ns_key(
+            thread_id, checkpoint_ns, "checkpoint", checkpoint_id
+        )
+        ids_key = self._ns_key(thread_id, checkpoint_ns, "checkpoints")
+        # Older keys of the thread (earlier checkpoints' writes) expire with it
+        keys = [_decode(k) for k in self.client.smembers(self._key(thread_id, "keys"))]
+
+        pipe = self.client.pipeline()
+        blobs = {
+            f"{channel}\x00{version}": _pack(
+                self.serde.dumps_typed(values[channel])
+                if channel in values
+                else ("empty", b"")
+            )
+            for channel, version in new_versions.items()
+        }
+        if blobs:
+            pipe.hset(blobs_key, mapping=blobs)
+        pipe.hset(
+            checkpoint_key,
+            mapping={
+                "checkpoint": _pack(self.serde.dumps_typed(stored)),
+                "metadata": _pack(
+                    self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+                ),
+                "parent": config["configurable"].get("checkpoint_id") or "",
+            },
+        )
+        pipe.zadd(ids_key, {checkpoint_id: 0})
+        self._touch(
+            pipe,
+            thread_id,
+            checkpoint_ns,
+            sorted(set(keys) | {blobs_key, checkpoint_key, ids_key}),
+        )
+        pipe.execute()
+        return self._config(thread_id, checkpoint_ns, checkpoint_id)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        key = self._ns_key(thread_id, checkpoint_ns, "writes", checkpoint_id)
+
+        pipe = self.client.pipeline()
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, data = self.serde.dumps_typed(value)
+            header = json.dumps([task_id, channel, write_idx, type_]).encode("utf-8")
+            field = f"{task_id}\x00{write_idx}"
+            # Regular writes are kept from the first attempt; special ones replace
+            if write_idx >= 0:
+                pipe.hsetnx(key, field, header + b"\x00" + data)
+            else:
+                pipe.hset(key, field, header + b"\x00" + data)
+        self._touch(pipe, thread_id, checkpoint_ns, [key])
+        pipe.execute()
+
+    def compact_thread(self, thread_id: str) -> None:
+        """Keep the newest checkpoint of each namespace and the values it refers to."""
+        index = self._key(thread_id, "keys")
+        for ns in self.client.smembers(self._key(thread_id, "namespaces")):
+            checkpoint_ns = _decode(ns)
+            checkpoint_ids = self._checkpoint_ids(thread_id, checkpoint_ns)
+            if len(checkpoint_ids) < 2:
+                continue
+            latest = self.client.hget(
+                self._ns_key(thread_id, checkpoint_ns, "checkpoint", checkpoint_ids[0]),
+                "checkpoint",
+            )
+            if latest is None:
+                continue
+            versions = self.serde.loads_typed(_unpack(latest))["channel_versions"]
+            used = {f"{channel}\x00{version}" for channel, version in versions.items()}
+            blobs_key = self._ns_key(thread_id, checkpoint_ns, "blobs")
+            unused = [
+                field
+                for field in self.client.hkeys(blobs_key)
+                if _decode(field) not in used
+            ]
+            stale = [
+                self._ns_key(thread_id, checkpoint_ns, kind, checkpoint_id)
+                for checkpoint_id in checkpoint_ids[1:]
+                for kind in ("checkpoint", "writes")
+            ]
+
+            pipe = self.client.pipeline()
+            pipe.delete(*stale)
+            pipe.srem(index, *stale)
+            pipe.zrem(
+                self._ns_key(thread_id, checkpoint_ns, "checkpoints"),
+                *checkpoint_ids[1:],
+            )
+            if unused:
+                pipe.hdel(blobs_key, *unused)
+            pipe.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        index = self._key(thread_id, "keys")
+        keys = [_decode(k) for k in self.client.smembers(index)]
+        self.client.delete(*keys, index, self._key(thread_id, "namespaces"))
+
+    # The Redis client is thread-safe, so the async API runs the calls off the loop
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def _sqlite_path(url: str) -> str:
+    return url[len("sqlite:///") :]
+
+
+def create_checkpointer(use_async: bool, url: str = CHECKPOINT_URL):
+    """
+    LangGraph saver for CHECKPOINT_URL. The async SQLite saver is bound to the running
+    event loop, so it has to be created on the loop that will use it.
+    """
+    global _memory_saver
+    if url.startswith("memory://"):
+        if _memory_saver is None:
+            _memory_saver = InMemorySaver()
+        return _memory_saver
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCheckpointSaver(url)
+    if not url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported checkpoint URL: {url}")
+
+    path = _sqlite_path(url)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if use_async:
+        return AsyncSqliteSaver(aiosqlite.connect(path))
+    # The saver serialises access with its own lock
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+
+def close_checkpointer(saver) -> None:
+    """Release a sync saver's connection; async SQLite savers need aclose_checkpointer."""
+    if isinstance(saver, AsyncSqliteSaver):
+        raise TypeError("Close async SQLite savers with aclose_checkpointer")
+    if isinstance(saver, SqliteSaver):
+        saver.conn.close()
+    elif isinstance(saver, RedisCheckpointSaver):
+        saver.client.close()
+
+
+async def aclose_checkpointer(saver) -> None:
+    """
+    Release the saver's connection. aiosqlite's worker thread reports back to the loop
+    that awaits the close, so this has to run on a loop that stays open until it is
+    done; a bare stop() leaves the thread posting to a closed loop.
+    """
+    if isinstance(saver, AsyncSqliteSaver):
+        await saver.conn.close()
+    else:
+        close_checkpointer(saver)
+
+
+# Deletes a thread's checkpoints and writes older than the newest checkpoint of
+# their namespace
+_COMPACT_SQL = [
+    f"""DELETE FROM {table} WHERE thread_id = ? AND checkpoint_id < (
+        SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest
+        WHERE latest.thread_id = {table}.thread_id
+        AND latest.checkpoint_ns = {table}.checkpoint_ns
+    )"""
+    for table in ("writes", "checkpoints")
+]
+
+
+def _compact_memory(saver: InMemorySaver, thread_id: str) -> None:
+    used = set()
+    for checkpoint_ns, checkpoints in saver.storage.get(thread_id, {}).items():
+        if not checkpoints:
+            continue
+        latest_id = max(checkpoints)
+        latest = saver.serde.loads_typed(checkpoints[latest_id][0])
+        used.update(
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in latest["channel_versions"].items()
+        )
+        for checkpoint_id in [c for c in checkpoints if c != latest_id]:
+            del checkpoints[checkpoint_id]
+            saver.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+    for key in [k for k in saver.blobs if k[0] == thread_id and k not in used]:
+        del saver.blobs[key]
+
+
+def compact_thread(saver, thread_id: str) -> None:
+    """
+    Drop all but the newest checkpoint of a thread. Resuming and feedback rounds only
+    read the newest one, so the per-node checkpoints of a finished run are dead weight.
+    """
+    if isinstance(saver, RedisCheckpointSaver):
+        saver.compact_thread(thread_id)
+    elif isinstance(saver, SqliteSaver):
+        with saver.cursor() as cursor:
+            for statement in _COMPACT_SQL:
+                cursor.execute(statement, (thread_id,))
+    elif isinstance(saver, InMemorySaver):
+        _compact_memory(saver, thread_id)
+
+
+async def acompact_thread(saver, thread_id: str) -> None:
+    """Async variant of compact_thread."""
+    if isinstance(saver, AsyncSqliteSaver):
+        await saver.setup()
+        async with saver.lock, saver.conn.cursor() as cursor:
+            for statement in _COMPACT_SQL:
+                await cursor.execute(statement, (thread_id,))
+            await saver.conn.commit()
+    else:
+        await asyncio.to_thread(compact_thread, saver, thread_id)
+
+
+def checkpoint_id_at(timestamp: float) -> str:
+    """
+    Lowest LangGraph checkpoint ID (a UUIDv6) that can be created at `timestamp`.
+    The IDs sort by creation time, so comparing against this finds older checkpoints.
+    """
+    ticks = int(timestamp * 10**7) + _UUID_EPOCH_OFFSET
+    value = ((ticks >> 12) << 80) | (6 << 76) | ((ticks & 0xFFF) << 64)
+    return str(uuid.UUID(int=value))
+
+
+def prune_checkpoints(
+    url: str = CHECKPOINT_URL, ttl_seconds: int = CHECKPOINT_TTL_SECONDS
+) -> int:
+    """
+    Delete the threads whose newest checkpoint is older than ttl_seconds; returns the
+    number of threads removed. Redis threads expire natively, so nothing to do there.
+    """
+    cutoff = checkpoint_id_at(time.time() - ttl_seconds)
+    if url.startswith("memory://"):
+        if _memory_saver is None:
+            return 0
+        expired = [
+            thread_id
+            for thread_id, namespaces in list(_memory_saver.storage.items())
+            if max((max(c, default="") for c in namespaces.values()), default="")
+            < cutoff
+        ]
+        for thread_id in expired:
+            _memory_saver.delete_thread(thread_id)
+        return len(expired)
+    if not url.startswith("sqlite:///") or not os.path.exists(_sqlite_path(url)):
+        return 0
+
+    conn = sqlite3.connect(_sqlite_path(url), timeout=30)
+    try:
+        with conn:
+            expired = conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                "HAVING MAX(checkpoint_id) < ?",
+                (cutoff,),
+            ).fetchall()
+            for table in ("writes", "checkpoints"):
+                conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+        return len(expired)
+    except sqlite3.OperationalError:
+        return 0  # No checkpoint was written yet, so the tables do not exist
+    finally:
+        conn.close()
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
@@ -0,0 +1,149 @@
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import brdgen.brd_prompts as prompts
+from dotenv import load_dotenv  # type: ignore
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+load_dotenv()
+
+# Rough token estimate for Mistral tokenizers on English prose
+CHARS_PER_TOKEN = 4
+# Input-token budget per prompt; the rest of the context window is left for the output
+PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+    "mistral-large-latest": 96_000,
+    "mistral-medium-latest": 96_000,
+    "mistral-small-latest": 24_000,
+    "open-mistral-nemo": 96_000,
+    "open-mistral-7b": 24_000,
+}
+DEFAULT_PROMPT_TOKEN_BUDGET = 24_000
+# e.g. "mistral-large-latest=60000,open-mistral-7b=16000"
+_BUDGET_OVERRIDES = os.getenv("BRD_PROMPT_TOKEN_BUDGETS", "")
+CONDENSE_CHUNK_TOKENS = int(os.getenv("BRD_CONDENSE_CHUNK_TOKENS", "6000"))
+CONDENSE_WORKERS = int(os.getenv("BRD_CONDENSE_WORKERS", "4"))
+CONDENSE_MAX_ROUNDS = 3
+WORDS_PER_TOKEN = 0.75
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def parse_budget_overrides(spec: str) -> Dict[str, int]:
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, tokens = item.partition("=")
+        budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+def prompt_token_budget(model: str) -> int:
+    """Input-token budget for a model, honouring BRD_PROMPT_TOKEN_BUDGETS overrides."""
+    budgets = {**PROMPT_TOKEN_BUDGETS, **parse_budget_overrides(_BUDGET_OVERRIDES)}
+    return budgets.get(model, DEFAULT_PROMPT_TOKEN_BUDGET)
+
+
+class AssessmentCondenser:
+    """
+    Map-reduce condensation of assessments that do not fit the prompt budget.
+
+    The text is split into chunks of about chunk_tokens, each chunk is condensed by the
+    LLM with at most `workers` calls in flight, and the notes are joined in order. If the
+    joined digest is still over target the digest itself is condensed again, up to
+    CONDENSE_MAX_ROUNDS rounds.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        budget: Optional[int] = None,
+        chunk_tokens: int = CONDENSE_CHUNK_TOKENS,
+        workers: int = CONDENSE_WORKERS,
+        temperature: float = 0.0,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self.budget = budget if budget is not None else prompt_token_budget(model)
+        self.chunk_tokens = chunk_tokens
+        self.workers = max(workers, 1)
+        self.temperature = temperature
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_tokens * CHARS_PER_TOKEN,
+            chunk_overlap=min(200, chunk_tokens * CHARS_PER_TOKEN // 10),
+        )
+
+    def target_tokens(self, overhead_tokens: int) -> int:
+        """Tokens left for the assessment once the rest of the prompt is accounted for."""
+        return max(self.budget - overhead_tokens, self.budget // 10)
+
+    def _messages(self, chunk: str, part: int, parts: int, max_words: int) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": prompts.CONDENSE_ASSESSMENT_PROMPT_SYSTEM},
+            {
+                "role": "user",
+                "content": prompts.CONDENSE_ASSESSMENT_CHUNK_TEMPLATE.format(
+                    part=part, parts=parts, max_words=max_words, chunk=chunk
+                ),
+            },
+        ]
+
+    def _plan(self, text: str, target_tokens: int):
+        chunks = self.splitter.split_text(text)
+        max_words = max(int(target_tokens / len(chunks) * WORDS_PER_TOKEN), 50)
+        return [
+            self._messages(chunk, i, len(chunks), max_words)
+            for i, chunk in enumerate(chunks, start=1)
+        ]
+
+    def _complete(self, messages: List[Dict[str, str]]) -> str:
+        response = self.client.chat.complete(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            cache=True,
+            call_site="condense",
+        )
+        return response.choices[0].message.content
+
+    async def _acomplete(
+        self, messages: List[Dict[str, str]], semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            response = await self.client.chat.complete_async(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                cache=True,
+                call_site="condense",
+            )
+        return response.choices[0].message.content
+
+    def condense(self, text: str, target_tokens: int) -> str:
+        """Reduce text to roughly target_tokens; returned unchanged if it already fits."""
+        rounds = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while estimate_tokens(text) > target_tokens and rounds < CONDENSE_MAX_ROUNDS:
+                rounds += 1
+                plan = self._plan(text, target_tokens)
+                print(f"Condensing assessment: round {rounds}, {len(plan)} chunks")
+                text = "\n\n".join(executor.map(self._complete, plan))
+        return text
+
+    async def acondense(self, text: str, target_tokens: int) -> str:
+        """Async variant of condense; a semaphore bounds the concurrent LLM calls."""
+        semaphore = asyncio.Semaphore(self.workers)
+        rounds = 0
+        while estimate_tokens(text) > target_tokens and rounds < CONDENSE_MAX_ROUNDS:
+            rounds += 1
+            plan = self._plan(text, target_tokens)
+            print(f"Condensing assessment (async): round {rounds}, {len(plan)} chunks")
+            notes = await asyncio.gather(
+                *(self._acomplete(messages, semaphore) for messages in plan)
+            )
+            text = "\n\n".join(notes)
+        return text
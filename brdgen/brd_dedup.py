@@ -0,0 +1,120 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from brdgen.brd_condenser import estimate_tokens
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+# A passage is dropped when this share of its shingles already appeared in an
+# earlier document
+DEDUP_THRESHOLD = float(os.getenv("BRD_DEDUP_THRESHOLD", "0.8"))
+# Extracted text is whitespace-collapsed, so sentences are packed into passages
+DEDUP_PASSAGE_WORDS = int(os.getenv("BRD_DEDUP_PASSAGE_WORDS", "80"))
+SHINGLE_WORDS = 5
+# Shorter passages (headings, labels) are always kept
+MIN_PASSAGE_WORDS = 8
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class DedupStats:
+    documents: int
+    passages: int
+    passages_removed: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**vars(self), "tokens_saved": self.tokens_saved}
+
+
+def split_passages(text: str, max_words: int = DEDUP_PASSAGE_WORDS) -> List[str]:
+    """Paragraphs where the text still has them, with sentences packed to ~max_words."""
+    passages = []
+    for block in _PARAGRAPH_RE.split(text or ""):
+        current, words = [], 0
+        for sentence in _SENTENCE_RE.split(block.strip()):
+            if not sentence:
+                continue
+            current.append(sentence)
+            words += len(sentence.split())
+            if words >= max_words:
+                passages.append(" ".join(current))
+                current, words = [], 0
+        if current:
+            passages.append(" ".join(current))
+    return passages
+
+
+def shingles(passage: str, size: int = SHINGLE_WORDS) -> Set[int]:
+    """Hashed word n-grams of the case-folded passage."""
+    words = _WORD_RE.findall(passage.lower())
+    if len(words) < size:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i : i + size])) for i in range(len(words) - size + 1)}
+
+
+def _document_header(index: int, name: Optional[str]) -> str:
+    return f"Document {index}: {name}" if name else f"Document {index}"
+
+
+def merge_documents(
+    texts: Sequence[str],
+    names: Optional[Sequence[str]] = None,
+    threshold: float = DEDUP_THRESHOLD,
+    passage_words: int = DEDUP_PASSAGE_WORDS,
+) -> Tuple[str, DedupStats]:
+    """
+    Merge several assessment documents into one text, dropping passages that are
+    near-identical to content of an earlier document. Repetition within a document
+    is left alone, as it is for single-document input.
+    """
+    names = list(names or [None] * len(texts))
+    seen: Set[int] = set()
+    merged, undeduped = [], []
+    passages = removed = 0
+
+    for index, (text, name) in enumerate(zip(texts, names), start=1):
+        header = _document_header(index, name)
+        document_passages = split_passages(text, passage_words)
+        kept, document_shingles = [], set()
+        for passage in document_passages:
+            passages += 1
+            passage_shingles = shingles(passage)
+            document_shingles |= passage_shingles
+            if (
+                len(passage.split()) >= MIN_PASSAGE_WORDS
+                and len(passage_shingles & seen) >= threshold * len(passage_shingles)
+            ):
+                removed += 1
+                continue
+            kept.append(passage)
+        seen |= document_shingles
+
+        undeduped.append(header + "\n" + "\n\n".join(document_passages))
+        if kept:
+            merged.append(header + "\n" + "\n\n".join(kept))
+
+    text = "\n\n".join(merged)
+    stats = DedupStats(
+        documents=len(texts),
+        passages=passages,
+        passages_removed=removed,
+        tokens_before=estimate_tokens("\n\n".join(undeduped)),
+        tokens_after=estimate_tokens(text),
+    )
+    print(
+        f"Merged {stats.documents} documents: dropped {removed}/{passages} duplicate "
+        f"passages, saving ~{stats.tokens_saved} tokens"
+    )
+    return text, stats
@@ -0,0 +1,126 @@
+import os
+import threading
+from typing import List, Optional
+
+import numpy as np
+from brdgen.brd_cache import CACHE_DIR, DiskLRUCache, content_hash
+from dotenv import load_dotenv  # type: ignore
+from langchain_community.embeddings import FastEmbedEmbeddings  # type: ignore
+from langchain_core.embeddings import Embeddings  # type: ignore
+
+load_dotenv()
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0")) or None  # None = ONNX default
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+
+class EmbeddingProvider:
+    """
+    Process-wide, lazily initialised FastEmbed model.
+
+    Loading the ONNX model is expensive, so it happens once per process, either on first
+    use or ahead of time through preload(). is_ready() only reports True once the model
+    has produced an embedding, which is what the readiness probe checks.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        threads: Optional[int] = EMBEDDING_THREADS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ) -> None:
+        self.model_name = model_name
+        self.threads = threads
+        self.batch_size = batch_size
+        self._embeddings: Optional[FastEmbedEmbeddings] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name
+
+    def get(self) -> FastEmbedEmbeddings:
+        """Return the shared embedding model, loading it on first use."""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    print(f"Loading embedding model {self.model_name}")
+                    self._embeddings = FastEmbedEmbeddings(
+                        model_name=self.model_name,
+                        threads=self.threads,
+                        batch_size=self.batch_size,
+                    )
+        return self._embeddings
+
+    def preload(self) -> None:
+        """Load the model and run one embedding so the first request pays nothing."""
+        self.get().embed_query("warmup")
+        self._ready.set()
+        print("Embedding model ready")
+
+    def preload_in_background(self) -> threading.Thread:
+        def _run():
+            try:
+                self.preload()
+            except Exception as e:
+                print(f"Failed to preload embedding model: {e}")
+
+        thread = threading.Thread(target=_run, name="embedding-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+
+embedding_provider = EmbeddingProvider()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that stores chunk vectors by content hash.
+
+    Vectors are keyed on (model id, chunk text), so re-indexing an edited assessment only
+    embeds the chunks that actually changed; everything else comes from the disk cache.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider = embedding_provider,
+        cache: Optional[DiskLRUCache] = None,
+    ) -> None:
+        self.provider = provider
+        self.cache = cache if cache is not None else DiskLRUCache(
+            os.path.join(CACHE_DIR, "chunk_embeddings.sqlite"),
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+
+    def _key(self, text: str) -> str:
+        return content_hash(self.provider.model_id, text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        print(f"Embedding {len(missing)} new chunks ({len(texts) - len(missing)} cached)")
+
+        if missing:
+            vectors = self.provider.get().embed_documents(list(missing.values()))
+            computed = {
+                key: np.asarray(vector, dtype=np.float32).tobytes()
+                for key, vector in zip(missing, vectors)
+            }
+            self.cache.set_many(computed.items())
+            cached.update(computed)
+
+        return [np.frombuffer(cached[key], dtype=np.float32).tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.provider.get().embed_query(text)
@@ -1,19 +1,72 @@
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, List, Optional, Dict, Tuple
 from mistralai import Mistral
 from langchain_core.prompts import FewShotPromptTemplate, PromptTemplate
 from brdgen.brd_utility import Utility
 from datetime import datetime
+import asyncio
 import os
-from difflib import SequenceMatcher
-import statistics
 from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from brdgen.brd_similarity import AGREEMENT_THRESHOLDS, get_similarity_backend
+from brdgen.brd_llm_client import CachedMistralClient, LLMCacheMiss
+from brdgen.brd_condenser import AssessmentCondenser, estimate_tokens
+from brdgen.brd_sections import assemble_sections, missing_sections, split_sections
 from dotenv import load_dotenv
 import brdgen.brd_prompts as prompts
 from dataclasses import dataclass
-from tenacity import retry, wait_exponential, stop_after_attempt
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 load_dotenv()
 
+# Point the Mistral client at another endpoint, e.g. the local mock in loadtest/
+MISTRAL_SERVER_URL = os.getenv("MISTRAL_SERVER_URL") or None
+
+
+class StreamInterruptedError(RuntimeError):
+    """
+    A streamed completion failed after some tokens were passed on. It is not retried:
+    a retry would replay the stream and clients would see both attempts' tokens.
+    """
+
+
+def stream_completion(client: Mistral, on_token: Callable[[str], None], **kwargs) -> str:
+    """Run a streaming chat completion, passing each text delta to on_token."""
+    chunks = []
+    try:
+        for event in client.chat.stream(**kwargs):
+            delta = event.data.choices[0].delta.content
+            if isinstance(delta, str) and delta:
+                chunks.append(delta)
+                on_token(delta)
+    except Exception as e:
+        if chunks:
+            raise StreamInterruptedError(f"Stream failed after tokens: {e}") from e
+        raise
+    return "".join(chunks)
+
+
+async def astream_completion(
+    client: Mistral, on_token: Callable[[str], None], **kwargs
+) -> str:
+    """Async variant of stream_completion using client.chat.stream_async."""
+    chunks = []
+    try:
+        async for event in await client.chat.stream_async(**kwargs):
+            delta = event.data.choices[0].delta.content
+            if isinstance(delta, str) and delta:
+                chunks.append(delta)
+                on_token(delta)
+    except Exception as e:
+        if chunks:
+            raise StreamInterruptedError(f"Stream failed after tokens: {e}") from e
+        raise
+    return "".join(chunks)
+
 
 @dataclass
 class ConsistencyMetrics:
@@ -23,6 +76,9 @@ class ConsistencyMetrics:
     average_similarity: float
     similarity_std: float
     all_generations: List[str]
+    samples_used: int = 0
+    converged: bool = False  # True when adaptive sampling stopped early on agreement
+    section_requests: int = 0  # Requests behind the one section-parallel sample
 
 
 class BRDGenerator:
@@ -39,9 +95,17 @@ class BRDGenerator:
         model: str,
         temperature: float = 0.3,
         num_samples: int = 2,  # Number of samples for self-consistency
-        similarity_threshold: float = 0.8,
+        similarity_threshold: Optional[float] = None,
         example_assessment_paths: Optional[List[str]] = None,
         example_brd_paths: Optional[List[str]] = None,
+        similarity_backend: str = "difflib",
+        agreement_backend: str = "minhash",
+        adaptive_sampling: bool = False,
+        max_samples: int = 4,
+        section_parallel: bool = False,
+        section_groups: Optional[List[List[str]]] = None,
+        section_workers: int = 5,
+        section_consistency: bool = True,
     ) -> None:
         """
         Initialize the BRD generator.
@@ -51,19 +115,54 @@ class BRDGenerator:
             model: Name of the Mistral model to use
             temperature: Generation temperature (default: 0.3)
             num_samples: Number of samples for self-consistency (default: 2)
-            similarity_threshold: Threshold for consistency checking (default: 0.8)
+            similarity_threshold: Agreement score at which adaptive sampling stops
+                (default: calibrated per agreement backend)
             example_assessment_paths: Paths to example assessment files
             example_brd_paths: Paths to example BRD files
+            similarity_backend: Backend for consistency scoring: "difflib", "cosine"
+                or "minhash" (default: "difflib"; the faster backends do not always
+                select the same sample)
+            agreement_backend: Backend for the adaptive early-exit check; its scores
+                must separate agreeing from disagreeing samples (default: "minhash")
+            adaptive_sampling: Start with two samples and only request more while they
+                disagree, instead of always generating num_samples (default: False)
+            max_samples: Cap on samples spent in adaptive mode (default: 4)
+            section_parallel: Generate section groups as concurrent requests and
+                assemble them, instead of sampling whole BRDs (default: False)
+            section_groups: Sections written per request in section-parallel mode
+                (default: one request per standard section)
+            section_workers: Concurrent section requests (default: 5)
+            section_consistency: After assembling the sections, make one more request
+                that reconciles terminology, requirement IDs and contradictions across
+                them (default: True)
         """
         if not api_key:
             raise ValueError("API key is required")
 
-        self.client = Mistral(api_key=api_key)
+        # Generation samples opt into the response cache / record-replay layer
+        self.client = CachedMistralClient(
+            Mistral(api_key=api_key, server_url=MISTRAL_SERVER_URL)
+        )
         self.model = model
         self.temperature = temperature
         self.few_shot_examples = []
         self.num_samples = num_samples
-        self.similarity_threshold = similarity_threshold
+        self.similarity_threshold = (
+            AGREEMENT_THRESHOLDS[agreement_backend]
+            if similarity_threshold is None
+            else similarity_threshold
+        )
+        self.adaptive_sampling = adaptive_sampling
+        self.max_samples = max(max_samples, 2)
+        self.section_parallel = section_parallel
+        self.section_groups = section_groups or [
+            [section] for section in prompts.STANDARD_SECTIONS
+        ]
+        self.section_workers = max(section_workers, 1)
+        self.section_consistency = section_consistency
+        self.similarity = get_similarity_backend(similarity_backend)
+        self.agreement = get_similarity_backend(agreement_backend)
+        self.condenser = AssessmentCondenser(self.client, model)
         self.prompts_dir = os.path.join(os.getcwd(), "prompts")
         os.makedirs(self.prompts_dir, exist_ok=True)
 
@@ -122,7 +221,36 @@ class BRDGenerator:
             Formatted prompt string
         """
         print("Creating final prompt...")
-        example_prompt, main_prompt = self._create_prompt_templates()
+        return self._few_shot_prompt(
+            prompts.MAIN_PROMPT_TEMPLATE,
+            assessment_text,
+            rag_results,
+            sections="\n".join(prompts.STANDARD_SECTIONS),
+        )
+
+    def get_section_prompt(
+        self,
+        assessment_text: str,
+        sections: List[str],
+        rag_results: Optional[str] = None,
+    ) -> str:
+        """Prompt asking for only the given sections, with the full outline as context."""
+        return self._few_shot_prompt(
+            prompts.SECTION_PROMPT_TEMPLATE,
+            assessment_text,
+            rag_results,
+            outline="\n".join(prompts.STANDARD_SECTIONS),
+            sections="\n".join(sections),
+        )
+
+    def _few_shot_prompt(
+        self,
+        template: str,
+        assessment_text: str,
+        rag_results: Optional[str],
+        **fields: str,
+    ) -> str:
+        example_prompt, _ = self._create_prompt_templates()
         rag_context = rag_results or "No additional context available."
 
         few_shot_prompt = FewShotPromptTemplate(
@@ -130,10 +258,10 @@ class BRDGenerator:
             examples=self.few_shot_examples,
             input_variables=["assessment_report", "rag_context"],
             prefix="Reference examples:",
-            suffix=main_prompt.template.format(
-                sections="\n".join(prompts.STANDARD_SECTIONS),
+            suffix=template.format(
                 assessment_report="{assessment_report}",
                 rag_context="{rag_context}",
+                **fields,
             ),
         )
 
@@ -141,6 +269,41 @@ class BRDGenerator:
             assessment_report=assessment_text, rag_context=rag_context
         )
 
+    def _assessment_target(
+        self, assessment_text: str, rag_results: Optional[str]
+    ) -> Optional[int]:
+        """Token target for the assessment, or None if the full prompt fits the budget."""
+        prompt_tokens = estimate_tokens(self.get_final_prompt(assessment_text, rag_results))
+        if prompt_tokens <= self.condenser.budget:
+            return None
+        overhead = prompt_tokens - estimate_tokens(assessment_text)
+        print(
+            f"Prompt is ~{prompt_tokens} tokens, over the {self.condenser.budget} "
+            f"token budget for {self.model}"
+        )
+        return self.condenser.target_tokens(overhead)
+
+    def fit_assessment(
+        self, assessment_text: str, rag_results: Optional[str] = None
+    ) -> str:
+        """
+        Return the assessment as-is if the generation prompt fits the model's token
+        budget, otherwise a condensed digest that does.
+        """
+        target = self._assessment_target(assessment_text, rag_results)
+        if target is None:
+            return assessment_text
+        return self.condenser.condense(assessment_text, target)
+
+    async def afit_assessment(
+        self, assessment_text: str, rag_results: Optional[str] = None
+    ) -> str:
+        """Async variant of fit_assessment."""
+        target = self._assessment_target(assessment_text, rag_results)
+        if target is None:
+            return assessment_text
+        return await self.condenser.acondense(assessment_text, target)
+
     def save_prompt_to_file(self, prompt: str) -> str:
         """Save the prompt to a timestamped file."""
         print("Saving prompt to file...")
@@ -155,71 +318,360 @@ class BRDGenerator:
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity ratio between two texts."""
-        return SequenceMatcher(None, text1, text2).ratio()
+        return self.similarity.similarity(text1, text2)
 
-    def analyze_consistency(self, generations: List[str]) -> ConsistencyMetrics:
+    def analyze_consistency(
+        self, generations: List[str], matrix: Optional[np.ndarray] = None
+    ) -> ConsistencyMetrics:
         """
         Analyze consistency among generated BRDs and select the most representative one.
 
+        Args:
+            generations: Generated BRDs
+            matrix: Precomputed pairwise similarity matrix, if already available
+
         Returns:
             Dict containing the most consistent BRD and consistency metrics
         """
         print("Analyzing consistency...")
-        # Calculate pairwise similarities
-        similarities = []
-        for i in range(len(generations)):
-            for j in range(i + 1, len(generations)):
-                similarity = self.calculate_similarity(generations[i], generations[j])
-                similarities.append(similarity)
+        if len(generations) < 2:
+            return ConsistencyMetrics(
+                selected_brd=generations[0],
+                average_similarity=1.0,
+                similarity_std=0.0,
+                all_generations=generations,
+                samples_used=len(generations),
+            )
+
+        # Pairwise similarity matrix, each pair computed once
+        if matrix is None:
+            matrix = self.similarity.pairwise(generations)
+        n = len(generations)
+        similarities = matrix[np.triu_indices(n, k=1)]
 
         # Calculate consistency metrics
-        avg_similarity = statistics.mean(similarities)
-        std_similarity = statistics.stdev(similarities) if len(similarities) > 1 else 0
+        avg_similarity = float(similarities.mean())
+        std_similarity = float(similarities.std(ddof=1)) if similarities.size > 1 else 0
 
         # Find the most representative BRD (highest average similarity to others)
-        avg_similarities = []
-        for i, gen in enumerate(generations):
-            other_gens = generations[:i] + generations[i + 1 :]
-            avg_sim = statistics.mean(
-                [self.calculate_similarity(gen, other) for other in other_gens]
-            )
-            avg_similarities.append(avg_sim)
-        print("avg_similarities", avg_similarities)
-        most_consistent_idx = avg_similarities.index(max(avg_similarities))
+        avg_similarities = (matrix.sum(axis=1) - matrix.diagonal()) / (n - 1)
+        print("avg_similarities", avg_similarities.tolist())
+        most_consistent_idx = int(avg_similarities.argmax())
 
         return ConsistencyMetrics(
             selected_brd=generations[most_consistent_idx],
             average_similarity=avg_similarity,
             similarity_std=std_similarity,
             all_generations=generations,
+            samples_used=len(generations),
         )
 
     @retry(
         wait=wait_exponential(multiplier=1, min=4, max=10),
         stop=stop_after_attempt(5),
+        retry=retry_if_not_exception_type((StreamInterruptedError, LLMCacheMiss)),
         # if needed use retry_if_exception_message
     )
-    def generate_single_brd(self, prompt: str, temperature: float) -> str:
-        """Generate a single BRD with given temperature."""
+    def generate_single_brd(
+        self,
+        prompt: str,
+        temperature: float,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Generate a single BRD with given temperature, streaming tokens to on_token."""
         print(f"Generating single BRD with temperature {temperature}...")
+        messages = self._build_messages(prompt)
         try:
+            if on_token is not None:
+                return stream_completion(
+                    self.client,
+                    on_token,
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    cache=True,
+                    call_site="generate",
+                )
             response = self.client.chat.complete(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": prompts.SYSTEM_MESSAGE},
-                    {"role": "user", "content": prompt},
-                ],
+                messages=messages,
+                temperature=temperature,
+                cache=True,
+                call_site="generate",
+            )
+            return response.choices[0].message.content
+        except (StreamInterruptedError, LLMCacheMiss):
+            # A replay miss never succeeds on retry; report it as it is
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate BRD: {str(e)}")
+
+    @retry(
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        stop=stop_after_attempt(5),
+        retry=retry_if_not_exception_type((StreamInterruptedError, LLMCacheMiss)),
+    )
+    async def agenerate_single_brd(
+        self,
+        prompt: str,
+        temperature: float,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Async variant of generate_single_brd using the non-blocking Mistral calls."""
+        print(f"Generating single BRD (async) with temperature {temperature}...")
+        messages = self._build_messages(prompt)
+        try:
+            if on_token is not None:
+                return await astream_completion(
+                    self.client,
+                    on_token,
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    cache=True,
+                    call_site="generate",
+                )
+            response = await self.client.chat.complete_async(
+                model=self.model,
+                messages=messages,
                 temperature=temperature,
+                cache=True,
+                call_site="generate",
             )
             return response.choices[0].message.content
+        except (StreamInterruptedError, LLMCacheMiss):
+            # A replay miss never succeeds on retry; report it as it is
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to generate BRD: {str(e)}")
 
+    @staticmethod
+    def _build_messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": prompts.SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _check_agreement(self, generations: List[str]) -> bool:
+        """Whether any pair of samples clears the threshold on the agreement backend."""
+        matrix = self.agreement.pairwise(generations)
+        best_agreement = float(matrix[np.triu_indices(len(generations), k=1)].max())
+        print(f"Best agreement after {len(generations)} samples: {best_agreement:.3f}")
+        return best_agreement >= self.similarity_threshold
+
+    @staticmethod
+    def _sample_callback(
+        on_token: Optional[Callable[[int, str], None]], sample: int
+    ) -> Optional[Callable[[str], None]]:
+        """Bind a sample index to a (sample, token) callback."""
+        if on_token is None:
+            return None
+        return lambda token: on_token(sample, token)
+
+    def generate_adaptive(
+        self, prompt: str, on_token: Optional[Callable[[int, str], None]] = None
+    ) -> ConsistencyMetrics:
+        """
+        Sample until two generations agree or max_samples is reached.
+
+        Starts with two parallel samples; as long as no pair of samples clears
+        similarity_threshold, one more sample is requested at the next temperature.
+        """
+        print("Generating BRD with adaptive sampling...")
+        temperatures = [self.temperature + (i * 0.1) for i in range(self.max_samples)]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            generations = list(
+                executor.map(
+                    lambda i: self.generate_single_brd(
+                        prompt, temperatures[i], self._sample_callback(on_token, i)
+                    ),
+                    range(2),
+                )
+            )
+
+        while True:
+            converged = self._check_agreement(generations)
+            n = len(generations)
+            if converged or n >= self.max_samples:
+                break
+            generations.append(
+                self.generate_single_brd(
+                    prompt, temperatures[n], self._sample_callback(on_token, n)
+                )
+            )
+
+        metrics = self.analyze_consistency(generations)
+        metrics.converged = converged
+        return metrics
+
+    async def agenerate_adaptive(
+        self, prompt: str, on_token: Optional[Callable[[int, str], None]] = None
+    ) -> ConsistencyMetrics:
+        """Async variant of generate_adaptive."""
+        print("Generating BRD with adaptive sampling (async)...")
+        temperatures = [self.temperature + (i * 0.1) for i in range(self.max_samples)]
+
+        generations = list(
+            await asyncio.gather(
+                *(
+                    self.agenerate_single_brd(
+                        prompt, temperatures[i], self._sample_callback(on_token, i)
+                    )
+                    for i in range(2)
+                )
+            )
+        )
+
+        while True:
+            converged = self._check_agreement(generations)
+            n = len(generations)
+            if converged or n >= self.max_samples:
+                break
+            generations.append(
+                await self.agenerate_single_brd(
+                    prompt, temperatures[n], self._sample_callback(on_token, n)
+                )
+            )
+
+        metrics = self.analyze_consistency(generations)
+        metrics.converged = converged
+        return metrics
+
+    def _section_result(self, generated: List[str], brd: str) -> ConsistencyMetrics:
+        return ConsistencyMetrics(
+            selected_brd=brd,
+            average_similarity=1.0,
+            similarity_std=0.0,
+            all_generations=[brd],
+            samples_used=1,
+            section_requests=len(generated) + int(self.section_consistency),
+        )
+
+    @staticmethod
+    def _consistency_messages(brd: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": prompts.SECTION_CONSISTENCY_PROMPT_SYSTEM},
+            {
+                "role": "user",
+                "content": prompts.SECTION_CONSISTENCY_TEMPLATE.format(brd=brd),
+            },
+        ]
+
+    @staticmethod
+    def _reconciled(brd: str, reply: Optional[str]) -> str:
+        """The reconciled BRD, or the assembled one if the reply lost a section."""
+        sections = [section for section in split_sections(brd) if section]
+        missing = missing_sections(reply or "", sections)
+        if missing:
+            print(f"Consistency pass dropped {len(missing)} sections; keeping assembly")
+            return brd
+        return reply
+
+    def reconcile_sections(self, brd: str) -> str:
+        """Consistency pass over an assembled section-parallel BRD."""
+        print("Reconciling assembled BRD sections...")
+        try:
+            response = self.client.chat.complete(
+                model=self.model,
+                messages=self._consistency_messages(brd),
+                temperature=self.temperature,
+                cache=True,
+                call_site="section_consistency",
+            )
+        except LLMCacheMiss:
+            raise
+        except Exception as e:
+            # The assembled sections are a complete BRD on their own
+            print(f"Consistency pass failed, keeping the assembled BRD: {e}")
+            return brd
+        return self._reconciled(brd, response.choices[0].message.content)
+
+    async def areconcile_sections(self, brd: str) -> str:
+        """Async variant of reconcile_sections."""
+        print("Reconciling assembled BRD sections (async)...")
+        try:
+            response = await self.client.chat.complete_async(
+                model=self.model,
+                messages=self._consistency_messages(brd),
+                temperature=self.temperature,
+                cache=True,
+                call_site="section_consistency",
+            )
+        except LLMCacheMiss:
+            raise
+        except Exception as e:
+            print(f"Consistency pass failed, keeping the assembled BRD: {e}")
+            return brd
+        return self._reconciled(brd, response.choices[0].message.content)
+
+    def generate_sections(
+        self,
+        assessment_text: str,
+        rag_results: Optional[str] = None,
+        on_token: Optional[Callable[[int, str], None]] = None,
+    ) -> ConsistencyMetrics:
+        """
+        Section-parallel mode: one request per section group, sharing the same
+        assessment/RAG context, run concurrently and assembled in outline order, then
+        reconciled across sections by one consistency request.
+        Tokens are reported with the group index as the sample index.
+        """
+        print(f"Generating BRD in {len(self.section_groups)} parallel section groups...")
+        section_prompts = [
+            self.get_section_prompt(assessment_text, group, rag_results)
+            for group in self.section_groups
+        ]
+        with ThreadPoolExecutor(max_workers=self.section_workers) as executor:
+            generated = list(
+                executor.map(
+                    lambda i: self.generate_single_brd(
+                        section_prompts[i],
+                        self.temperature,
+                        self._sample_callback(on_token, i),
+                    ),
+                    range(len(section_prompts)),
+                )
+            )
+        brd = assemble_sections(generated, self.section_groups)
+        if self.section_consistency:
+            brd = self.reconcile_sections(brd)
+        return self._section_result(generated, brd)
+
+    async def agenerate_sections(
+        self,
+        assessment_text: str,
+        rag_results: Optional[str] = None,
+        on_token: Optional[Callable[[int, str], None]] = None,
+    ) -> ConsistencyMetrics:
+        """Async variant of generate_sections; a semaphore bounds concurrent requests."""
+        print(
+            f"Generating BRD in {len(self.section_groups)} parallel section groups (async)..."
+        )
+        semaphore = asyncio.Semaphore(self.section_workers)
+
+        async def generate(i: int, group: List[str]) -> str:
+            async with semaphore:
+                return await self.agenerate_single_brd(
+                    self.get_section_prompt(assessment_text, group, rag_results),
+                    self.temperature,
+                    self._sample_callback(on_token, i),
+                )
+
+        generated = await asyncio.gather(
+            *(generate(i, group) for i, group in enumerate(self.section_groups))
+        )
+        brd = assemble_sections(generated, self.section_groups)
+        if self.section_consistency:
+            brd = await self.areconcile_sections(brd)
+        return self._section_result(list(generated), brd)
+
     def generate_brd(
         self,
         assessment_text: str,
         rag_results: Optional[str] = None,
         save_prompt: bool = False,
+        on_token: Optional[Callable[[int, str], None]] = None,
     ) -> ConsistencyMetrics:
         """
         Generate multiple BRDs and select the most consistent one.
@@ -228,6 +680,8 @@ class BRDGenerator:
             assessment_text: Input assessment text
             rag_results: Optional RAG context
             save_prompt: Whether to save the prompt to file
+            on_token: Optional callback receiving (sample index, token) as the
+                generations stream in
 
         Returns:
             ConsistencyMetrics containing the selected BRD and metrics
@@ -236,11 +690,17 @@ class BRDGenerator:
         if not assessment_text:
             raise ValueError("Assessment text cannot be empty")
 
+        if self.section_parallel:
+            return self.generate_sections(assessment_text, rag_results, on_token)
+
         full_prompt = self.get_final_prompt(assessment_text, rag_results)
 
         if save_prompt:
             self.save_prompt_to_file(full_prompt)
 
+        if self.adaptive_sampling:
+            return self.generate_adaptive(full_prompt, on_token)
+
         temperatures = [self.temperature + (i * 0.1) for i in range(self.num_samples)]
         generations = []
 
@@ -254,13 +714,53 @@ class BRDGenerator:
         with ThreadPoolExecutor(max_workers=self.num_samples) as executor:
             generations = list(
                 executor.map(
-                    lambda temp: self.generate_single_brd(full_prompt, temp),
-                    temperatures,
+                    lambda i: self.generate_single_brd(
+                        full_prompt, temperatures[i], self._sample_callback(on_token, i)
+                    ),
+                    range(len(temperatures)),
                 )
             )
 
         return self.analyze_consistency(generations)
 
+    async def agenerate_brd(
+        self,
+        assessment_text: str,
+        rag_results: Optional[str] = None,
+        save_prompt: bool = False,
+        on_token: Optional[Callable[[int, str], None]] = None,
+    ) -> ConsistencyMetrics:
+        """
+        Async variant of generate_brd: samples are awaited concurrently on the event
+        loop instead of occupying one thread each.
+        """
+        print("Generating BRD (async)...")
+        if not assessment_text:
+            raise ValueError("Assessment text cannot be empty")
+
+        if self.section_parallel:
+            return await self.agenerate_sections(assessment_text, rag_results, on_token)
+
+        full_prompt = self.get_final_prompt(assessment_text, rag_results)
+
+        if save_prompt:
+            self.save_prompt_to_file(full_prompt)
+
+        if self.adaptive_sampling:
+            return await self.agenerate_adaptive(full_prompt, on_token)
+
+        temperatures = [self.temperature + (i * 0.1) for i in range(self.num_samples)]
+        generations = await asyncio.gather(
+            *(
+                self.agenerate_single_brd(
+                    full_prompt, temp, self._sample_callback(on_token, i)
+                )
+                for i, temp in enumerate(temperatures)
+            )
+        )
+
+        return self.analyze_consistency(list(generations))
+
 
 """	
 # Below is the main function to demonstrate BRD generation
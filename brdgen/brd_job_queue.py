@@ -0,0 +1,160 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+JOB_WORKERS = int(os.getenv("BRD_JOB_WORKERS", "4"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("BRD_JOB_QUEUE_MAX_DEPTH", "20"))
+DEFAULT_RETRY_AFTER_SECONDS = 30
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        "count": len(ordered),
+        "avg": sum(ordered) / len(ordered),
+        "p95": p95,
+        "max": ordered[-1],
+    }
+
+
+class BRDJobQueue:
+    """
+    Bounded in-process work queue for BRD jobs.
+
+    A fixed pool of asyncio worker tasks pulls jobs in FIFO order, so at most `workers`
+    workflows run at once and at most `max_depth` wait behind them; submit() raises
+    QueueFullError beyond that. Wait time (queued -> started) and run time are tracked
+    over the most recent jobs.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_depth: int = JOB_QUEUE_MAX_DEPTH,
+        history: int = 200,
+    ) -> None:
+        self.workers = workers
+        self.max_depth = max_depth
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active = 0
+        self._wait_times: Deque[float] = deque(maxlen=history)
+        self._run_times: Deque[float] = deque(maxlen=history)
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._worker_tasks and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        for job_id in self._pending:
+            self._queue.put_nowait(job_id)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"brd-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def is_full(self) -> bool:
+        return self.depth >= self.max_depth
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent run times."""
+        if not self._run_times:
+            return DEFAULT_RETRY_AFTER_SECONDS
+        avg_run = sum(self._run_times) / len(self._run_times)
+        return max(1, math.ceil(avg_run * (self.depth + 1) / self.workers))
+
+    def submit(
+        self, job_id: str, job: Callable[..., Awaitable[Any]], *args: Any
+    ) -> int:
+        """Queue an async job; returns its 1-based queue position."""
+        if self.is_full():
+            self._rejected += 1
+            raise QueueFullError(self.retry_after())
+        self.start()
+        self._pending[job_id] = (job, args, time.monotonic())
+        self._queue.put_nowait(job_id)
+        return self.depth
+
+    def discard(self, job_id: str) -> bool:
+        """Drop a job that has not started yet; False if it already left the queue."""
+        return self._pending.pop(job_id, None) is not None
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position among waiting jobs, or None if not waiting here."""
+        for position, pending_id in enumerate(self._pending, start=1):
+            if pending_id == job_id:
+                return position
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "depth": self.depth,
+            "active": self.active,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_seconds": _summary(self._wait_times),
+            "run_seconds": _summary(self._run_times),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            if job_id not in self._pending:
+                self._queue.task_done()  # discarded while waiting
+                continue
+            job, args, enqueued_at = self._pending.pop(job_id)
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - enqueued_at)
+            self._active += 1
+            try:
+                await job(*args)
+                self._completed += 1
+            except Exception as e:
+                self._failed += 1
+                print(f"BRD job {job_id} failed: {e}")
+            finally:
+                self._active -= 1
+                self._run_times.append(time.monotonic() - started_at)
+                self._queue.task_done()
@@ -0,0 +1,327 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from brdgen.brd_cache import CACHE_DIR, DiskLRUCache, content_hash
+from brdgen.brd_metrics import observe_llm_call
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+# off: no caching; cache: reuse responses for call sites that opt in;
+# record: always call the API and store every response; replay: serve every call from
+# the recordings and fail on a miss, so workflows run offline and deterministically
+LLM_CACHE_MODE = os.getenv("BRD_LLM_CACHE_MODE", "off").lower()
+LLM_CACHE_MODES = ("off", "cache", "record", "replay")
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("BRD_LLM_CACHE_MEMORY_ENTRIES", "128"))
+LLM_CACHE_MAX_MB = int(os.getenv("BRD_LLM_CACHE_MAX_MB", "512"))
+LLM_RECORDINGS_PATH = os.getenv(
+    "BRD_LLM_RECORDINGS_PATH", os.path.join(CACHE_DIR, "llm_recordings.sqlite")
+)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when no recorded response matches the request."""
+
+
+def request_key(model: str, messages: List[Dict[str, Any]], temperature: Any) -> str:
+    """Cache key over (model, messages, temperature)."""
+    return content_hash(
+        model, json.dumps(messages, sort_keys=True, default=str), repr(temperature)
+    )
+
+
+def _usage_dict(usage: Any) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+    }
+
+
+def _usage_namespace(usage: Optional[Dict[str, int]]) -> Optional[SimpleNamespace]:
+    return SimpleNamespace(**usage) if usage else None
+
+
+def _response(content: str, usage: Optional[Dict[str, int]]) -> SimpleNamespace:
+    """Minimal stand-in for a ChatCompletionResponse built from a cached entry."""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+        usage=_usage_namespace(usage),
+        cached=True,
+    )
+
+
+def _stream_event(content: str, usage: Optional[Dict[str, int]]) -> SimpleNamespace:
+    """Minimal stand-in for a CompletionEvent carrying the whole cached text."""
+    delta = SimpleNamespace(role="assistant", content=content)
+    choice = SimpleNamespace(index=0, delta=delta, finish_reason="stop")
+    return SimpleNamespace(
+        data=SimpleNamespace(choices=[choice], usage=_usage_namespace(usage))
+    )
+
+
+class LLMResponseCache:
+    """Two-tier response store: an in-memory LRU in front of a SQLite LRU on disk."""
+
+    def __init__(
+        self,
+        disk: Optional[DiskLRUCache] = None,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+    ) -> None:
+        self.disk = disk
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if self.disk is None:
+            return None
+        data = self.disk.get(key)
+        if data is None:
+            return None
+        entry = json.loads(data.decode("utf-8"))
+        self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        self._remember(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, json.dumps(entry).encode("utf-8"))
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+
+class CachedChat:
+    """
+    Drop-in for client.chat adding cache lookups around each completion call.
+
+    Every call also reports its latency and token usage to brd_metrics, labelled by
+    the optional `call_site` argument.
+    """
+
+    def __init__(self, owner: "CachedMistralClient") -> None:
+        self._owner = owner
+        self._chat = owner.client.chat
+
+    def _hit(self, store, key: str) -> Optional[Dict[str, Any]]:
+        if store is None:
+            return None
+        entry = store.get(key)
+        if entry is None:
+            self._owner.check_miss(key)
+        return entry
+
+    def complete(
+        self, *, cache: bool = False, call_site: str = "unknown", **kwargs: Any
+    ):
+        started = time.perf_counter()
+        store, key = self._owner.lookup_target(cache, kwargs)
+        entry = self._hit(store, key)
+        cached = entry is not None
+        if not cached:
+            response = self._chat.complete(**kwargs)
+            entry = self._owner.entry_from_response(response)
+            if store is not None:
+                store.set(key, entry)
+        else:
+            response = _response(entry["content"], entry.get("usage"))
+        observe_llm_call(
+            call_site,
+            kwargs.get("model"),
+            time.perf_counter() - started,
+            entry.get("usage"),
+            cached,
+        )
+        return response
+
+    async def complete_async(
+        self, *, cache: bool = False, call_site: str = "unknown", **kwargs: Any
+    ):
+        started = time.perf_counter()
+        store, key = self._owner.lookup_target(cache, kwargs)
+        entry = self._hit(store, key)
+        cached = entry is not None
+        if not cached:
+            response = await self._chat.complete_async(**kwargs)
+            entry = self._owner.entry_from_response(response)
+            if store is not None:
+                store.set(key, entry)
+        else:
+            response = _response(entry["content"], entry.get("usage"))
+        observe_llm_call(
+            call_site,
+            kwargs.get("model"),
+            time.perf_counter() - started,
+            entry.get("usage"),
+            cached,
+        )
+        return response
+
+    def stream(
+        self, *, cache: bool = False, call_site: str = "unknown", **kwargs: Any
+    ):
+        started = time.perf_counter()
+        store, key = self._owner.lookup_target(cache, kwargs)
+        entry = self._hit(store, key)
+        cached = entry is not None
+        if cached:
+            events = iter([_stream_event(entry["content"], entry.get("usage"))])
+            store = None
+        else:
+            events = self._chat.stream(**kwargs)
+        return self._observe_stream(
+            events, store, key, call_site, kwargs.get("model"), started, cached
+        )
+
+    async def stream_async(
+        self, *, cache: bool = False, call_site: str = "unknown", **kwargs: Any
+    ):
+        started = time.perf_counter()
+        store, key = self._owner.lookup_target(cache, kwargs)
+        entry = self._hit(store, key)
+        cached = entry is not None
+        if cached:
+            events = self._replay_async(entry)
+            store = None
+        else:
+            events = await self._chat.stream_async(**kwargs)
+        return self._observe_stream_async(
+            events, store, key, call_site, kwargs.get("model"), started, cached
+        )
+
+    @staticmethod
+    def _delta_text(event: Any) -> str:
+        delta = event.data.choices[0].delta.content
+        return delta if isinstance(delta, str) else ""
+
+    def _observe_stream(self, events, store, key, call_site, model, started, cached):
+        """Pass events through; store the text (if caching) and report once consumed."""
+        chunks, usage = [], None
+        for event in events:
+            chunks.append(self._delta_text(event))
+            usage = getattr(event.data, "usage", None) or usage
+            yield event
+        usage = _usage_dict(usage)
+        if store is not None:
+            store.set(key, {"content": "".join(chunks), "usage": usage})
+        observe_llm_call(call_site, model, time.perf_counter() - started, usage, cached)
+
+    async def _observe_stream_async(
+        self, events, store, key, call_site, model, started, cached
+    ):
+        chunks, usage = [], None
+        async for event in events:
+            chunks.append(self._delta_text(event))
+            usage = getattr(event.data, "usage", None) or usage
+            yield event
+        usage = _usage_dict(usage)
+        if store is not None:
+            store.set(key, {"content": "".join(chunks), "usage": usage})
+        observe_llm_call(call_site, model, time.perf_counter() - started, usage, cached)
+
+    @staticmethod
+    async def _replay_async(entry: Dict[str, Any]):
+        yield _stream_event(entry["content"], entry.get("usage"))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chat, name)
+
+
+class CachedMistralClient:
+    """
+    Wrapper around the Mistral client with response caching and record/replay.
+
+    Completion calls accept an extra `cache` flag: in "cache" mode only call sites that
+    pass cache=True are served from / stored in the cache. "record" and "replay" apply
+    to every call so a full workflow can be captured once and re-run offline.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        mode: str = LLM_CACHE_MODE,
+        cache: Optional[LLMResponseCache] = None,
+        recordings: Optional[LLMResponseCache] = None,
+    ) -> None:
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode}. Expected {LLM_CACHE_MODES}")
+        self.client = client
+        self.mode = mode
+        self._cache = cache
+        self._recordings = recordings
+        self.chat = CachedChat(self)
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        if self._cache is None:
+            self._cache = LLMResponseCache(
+                DiskLRUCache(
+                    os.path.join(CACHE_DIR, "llm_responses.sqlite"),
+                    max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+                )
+            )
+        return self._cache
+
+    @property
+    def recordings(self) -> LLMResponseCache:
+        if self._recordings is None:
+            self._recordings = LLMResponseCache(DiskLRUCache(LLM_RECORDINGS_PATH))
+        return self._recordings
+
+    def lookup_target(self, cache: bool, kwargs: Dict[str, Any]):
+        """Which store (if any) serves this call, and its key."""
+        if self.mode == "off" or (self.mode == "cache" and not cache):
+            return None, None
+        store = self.cache if self.mode == "cache" else self.recordings
+        key = request_key(
+            kwargs.get("model"), kwargs.get("messages"), kwargs.get("temperature")
+        )
+        if self.mode == "record":
+            # Always hit the API and overwrite any earlier recording
+            return _WriteOnly(store), key
+        return store, key
+
+    def check_miss(self, key: str) -> None:
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"No recorded LLM response for request {key[:12]}")
+
+    @staticmethod
+    def entry_from_response(response: Any) -> Dict[str, Any]:
+        return {
+            "content": response.choices[0].message.content,
+            "usage": _usage_dict(getattr(response, "usage", None)),
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class _WriteOnly:
+    """Store view used in record mode: lookups always miss, writes go through."""
+
+    def __init__(self, store: LLMResponseCache) -> None:
+        self._store = store
+
+    def get(self, key: str) -> None:
+        return None
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        self._store.set(key, entry)
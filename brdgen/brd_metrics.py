@@ -0,0 +1,232 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (  # type: ignore
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# LLM calls and graph nodes run from seconds to minutes
+_LATENCY_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+NODE_DURATION = Histogram(
+    "brd_node_duration_seconds",
+    "Duration of each BRD graph node",
+    ["node"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_CALL_DURATION = Histogram(
+    "brd_llm_call_duration_seconds",
+    "LLM call latency by call site and model",
+    ["call_site", "model", "cached"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "brd_llm_tokens_total",
+    "Tokens reported in the Mistral usage field",
+    ["call_site", "model", "kind"],
+)
+EXTRACTION_DURATION = Histogram(
+    "brd_extraction_duration_seconds",
+    "Document text extraction time by file type and page count",
+    ["file_type", "pages", "cached"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DEDUP_TOKENS_SAVED = Counter(
+    "brd_dedup_tokens_saved_total",
+    "Estimated prompt tokens removed by cross-document deduplication",
+)
+QUEUE_DEPTH = Gauge("brd_job_queue_depth", "BRD jobs waiting in the queue")
+ACTIVE_JOBS = Gauge("brd_jobs_active", "BRD jobs currently running")
+
+_PAGE_BUCKETS = ((10, "1-10"), (50, "11-50"), (200, "51-200"))
+
+
+def page_bucket(pages: Optional[int]) -> str:
+    """Page counts as a bounded label set."""
+    if pages is None:
+        return "n/a"
+    for upper, label in _PAGE_BUCKETS:
+        if pages <= upper:
+            return label
+    return "201+"
+
+
+class TaskMetrics:
+    """Per-task totals of the same measurements, stored on the task record."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.nodes: Dict[str, Dict[str, float]] = {}
+        self.llm: Dict[str, Dict[str, float]] = {}
+        self.extraction: Optional[Dict[str, Any]] = None
+        self.dedup: Optional[Dict[str, Any]] = None
+
+    def add_node(self, node: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.nodes.setdefault(node, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+
+    def add_llm_call(
+        self, call_site: str, seconds: float, usage: Optional[Dict[str, int]], cached: bool
+    ) -> None:
+        with self._lock:
+            entry = self.llm.setdefault(
+                call_site,
+                {
+                    "calls": 0,
+                    "cached_calls": 0,
+                    "seconds": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                },
+            )
+            entry["calls"] += 1
+            entry["cached_calls"] += int(cached)
+            entry["seconds"] += seconds
+            if usage:
+                entry["prompt_tokens"] += usage.get("prompt_tokens", 0)
+                entry["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    def add_extraction(
+        self, file_type: str, pages: Optional[int], seconds: float, cached: bool
+    ) -> None:
+        """Multi-document tasks report the totals over their documents."""
+        with self._lock:
+            previous = self.extraction
+            if previous is None:
+                self.extraction = {
+                    "file_type": file_type,
+                    "pages": pages,
+                    "seconds": round(seconds, 3),
+                    "cached": cached,
+                }
+                return
+            file_types = set(previous["file_type"].split(",")) | {file_type}
+            page_counts = [p for p in (previous["pages"], pages) if p is not None]
+            self.extraction = {
+                "file_type": ",".join(sorted(file_types)),
+                "pages": sum(page_counts) if page_counts else None,
+                "seconds": round(previous["seconds"] + seconds, 3),
+                "cached": previous["cached"] and cached,
+                "documents": previous.get("documents", 1) + 1,
+            }
+
+    def as_dict(self) -> Dict[str, Any]:
+        def rounded(entries):
+            return {
+                name: {k: round(v, 3) if isinstance(v, float) else v for k, v in e.items()}
+                for name, e in entries.items()
+            }
+
+        with self._lock:
+            return {
+                "nodes": rounded(self.nodes),
+                "llm": rounded(self.llm),
+                "extraction": dict(self.extraction) if self.extraction else None,
+                "dedup": dict(self.dedup) if self.dedup else None,
+            }
+
+
+# Set for the duration of a job; asyncio tasks and LangGraph nodes inherit it
+_current_task: ContextVar[Optional[TaskMetrics]] = ContextVar(
+    "brd_task_metrics", default=None
+)
+
+
+@contextmanager
+def track_task() -> Iterator[TaskMetrics]:
+    metrics = TaskMetrics()
+    token = _current_task.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_task.reset(token)
+
+
+def observe_node(node: str, seconds: float) -> None:
+    NODE_DURATION.labels(node).observe(seconds)
+    metrics = _current_task.get()
+    if metrics is not None:
+        metrics.add_node(node, seconds)
+
+
+def observe_llm_call(
+    call_site: str,
+    model: Optional[str],
+    seconds: float,
+    usage: Optional[Dict[str, int]] = None,
+    cached: bool = False,
+) -> None:
+    model = model or "unknown"
+    LLM_CALL_DURATION.labels(call_site, model, str(cached).lower()).observe(seconds)
+    if usage:
+        for kind in ("prompt_tokens", "completion_tokens"):
+            LLM_TOKENS.labels(call_site, model, kind.split("_")[0]).inc(
+                usage.get(kind, 0)
+            )
+    metrics = _current_task.get()
+    if metrics is not None:
+        metrics.add_llm_call(call_site, seconds, usage, cached)
+
+
+def observe_extraction(
+    file_type: str, pages: Optional[int], seconds: float, cached: bool = False
+) -> None:
+    EXTRACTION_DURATION.labels(
+        file_type, page_bucket(pages), str(cached).lower()
+    ).observe(seconds)
+    metrics = _current_task.get()
+    if metrics is not None:
+        metrics.add_extraction(file_type, pages, seconds, cached)
+
+
+def observe_dedup(stats: Dict[str, Any]) -> None:
+    DEDUP_TOKENS_SAVED.inc(max(stats.get("tokens_saved", 0), 0))
+    metrics = _current_task.get()
+    if metrics is not None:
+        metrics.dedup = dict(stats)
+
+
+def timed_node(node: str, fn: Callable) -> Callable:
+    """Wrap a graph node so its duration is observed; keeps the signature LangGraph inspects."""
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                observe_node(node, time.perf_counter() - started)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe_node(node, time.perf_counter() - started)
+
+    return wrapper
+
+
+def bind_job_queue(job_queue: Any) -> None:
+    """Report the queue's depth and active jobs at scrape time."""
+    QUEUE_DEPTH.set_function(lambda: job_queue.depth)
+    ACTIVE_JOBS.set_function(lambda: job_queue.active)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
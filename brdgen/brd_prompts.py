@@ -65,3 +65,117 @@ You are an experienced Business Requirements Document (BRD) reviewer with extens
     
     Provide the revised BRD maintaining the same section structure but with improved content.
 """
+
+USER_FEEDBACK_TEMPLATE = """
+Reviewer feedback on the current draft. Apply it, keeping everything else consistent with the assessment:
+{feedback}
+"""
+
+REFINE_SECTIONS_PROMPT_SYSTEM = (
+    "You are an experienced Business Requirements Document (BRD) reviewer with "
+    "extensive experience in SAP implementations. You review BRDs section by section "
+    "against the original assessment report and improve only what needs improving."
+)
+
+CRITIQUE_SECTIONS_TEMPLATE = """
+Review the BRD draft against the original assessment report and decide which sections need changes.
+Flag a section only if it is inaccurate, incomplete, vague, redundant or inconsistent with the assessment; do not flag sections that are already good.
+A required section that is missing from the draft may be flagged as well.
+For each flagged section, list the issues and quote the assessment facts needed to fix them, because the section will be rewritten without access to the assessment.
+
+Sections:
+{sections}
+
+Original Assessment Report:
+{assessment_report}
+
+Current BRD Draft:
+{brd}
+
+Answer with JSON only, in the form:
+{{"sections": [{{"section": "<section title exactly as listed>", "issues": "<issues and supporting assessment facts>"}}]}}
+Answer {{"sections": []}} if no section needs changes.
+"""
+
+REVISE_SECTION_TEMPLATE = """
+Rewrite one section of a BRD to resolve the reviewer's issues. The other sections are kept as they are, so write only this section's content, without its heading.
+
+Full BRD outline (for context):
+{outline}
+
+Section: {section}
+
+Reviewer issues:
+{issues}
+
+Current section:
+{current}
+
+Revised section content:
+"""
+
+CONDENSE_ASSESSMENT_PROMPT_SYSTEM = (
+    "You are a business analyst condensing one part of a long assessment report so "
+    "that a Business Requirements Document can later be written from the condensed "
+    "notes. Keep every requirement, constraint, system name, figure, date and "
+    "stakeholder; drop repetition, boilerplate and narrative."
+)
+
+CONDENSE_ASSESSMENT_CHUNK_TEMPLATE = """
+Condense part {part} of {parts} of the assessment report below into at most {max_words} words.
+Use short bullet points grouped under the headings that appear in the text.
+
+Assessment (part {part} of {parts}):
+{chunk}
+
+Condensed notes:
+"""
+
+SECTION_PROMPT_TEMPLATE = """
+Generate the following part of a detail BRD based on below details. Other sections are written separately, so write only the requested sections.
+
+Guidelines:
+- Clear, professional language
+- Reference assessment report
+- Thorough section coverage
+- Follow example structure
+- Specific, measurable requirements
+- Start each requested section with a markdown heading "## <section title>" exactly as listed
+- No introduction, conclusion or text outside the requested sections
+
+Full BRD outline (for context):
+{outline}
+
+Sections to write:
+{sections}
+
+Assessment:
+{assessment_report}
+
+Additional Context from Similar Projects:
+{rag_context}
+
+Use the additional context to enhance the BRD while maintaining focus on the current project requirements.
+
+Generate sections:
+"""
+
+SECTION_CONSISTENCY_PROMPT_SYSTEM = (
+    "You are an experienced Business Requirements Document (BRD) editor. The sections "
+    "of the BRD you receive were written independently, and you make them read as one "
+    "consistent document without changing what they require."
+)
+
+SECTION_CONSISTENCY_TEMPLATE = """
+The sections of the BRD below were written by separate requests. Edit it into one consistent document:
+- Use the same term for the same system, stakeholder, process or metric throughout
+- Number requirement IDs in one consistent scheme without duplicates, and update references to them
+- Resolve statements that contradict each other, preferring the more specific one
+- Remove requirements repeated in several sections, keeping them in the most fitting section
+- Do not add requirements, facts or sections, and do not drop sections
+
+Keep every "## <section title>" heading exactly as it is, in the same order. Return only the full revised BRD.
+
+BRD:
+{brd}
+"""
@@ -1,18 +1,59 @@
+import threading
 from typing import List, Dict
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import FastEmbedEmbeddings
-from langchain_huggingface import HuggingFaceEmbeddings
+from brdgen.brd_cache import CACHE_DIR, DiskLRUCache, content_hash
+from brdgen.brd_embedding import (
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    CachedEmbeddings,
+    embedding_provider,
+)
 from langchain_huggingface import HuggingFaceEndpoint
 from langchain_chroma import Chroma
 from langchain.schema import Document
-import torch
+import chromadb
 import re, unicodedata, os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+PERSIST_DIRECTORY = "docs/chroma/"
+MAX_COLLECTIONS = int(os.getenv("BRD_VECTOR_MAX_COLLECTIONS", "20"))
+
+_chroma_clients = {}
+_chroma_lock = threading.Lock()
+
+
+def get_chroma_client(persist_directory: str = PERSIST_DIRECTORY):
+    """One persistent Chroma client per directory, shared across requests."""
+    with _chroma_lock:
+        client = _chroma_clients.get(persist_directory)
+        if client is None:
+            client = chromadb.PersistentClient(path=persist_directory)
+            _chroma_clients[persist_directory] = client
+        return client
+
+
 class BRDRAG:
+    def __init__(
+        self,
+        persist_directory: str = PERSIST_DIRECTORY,
+        max_collections: int = MAX_COLLECTIONS,
+        cache_dir: str = CACHE_DIR,
+    ):
+        self.persist_directory = persist_directory
+        self.embeddings = CachedEmbeddings(
+            cache=DiskLRUCache(
+                os.path.join(cache_dir, "chunk_embeddings.sqlite"),
+                max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        )
+        # Tracks per-assessment collections in least-recently-used order
+        self.collection_index = DiskLRUCache(
+            os.path.join(cache_dir, "vector_collections.sqlite"),
+            max_entries=max_collections,
+        )
+
     def load_documents(self, document_paths: List[str]) -> List[Dict]:
         documents = []
 
@@ -52,49 +93,44 @@ class BRDRAG:
         splits = text_splitter.split_documents(documents)
         return splits
 
-    def getEmbedding(
-        self,
-    ):
-        """
-        modelPath = "mixedbread-ai/mxbai-embed-large-v1"
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        model_kwargs = {"device": device}  # cuda/cpu
-        encode_kwargs = {"normalize_embeddings": False}
-
-        embedding = HuggingFaceEmbeddings(
-            model_name=modelPath, model_kwargs=model_kwargs, encode_kwargs=encode_kwargs
+    def collection_name(self, assessment_document_content: str) -> str:
+        """Content-addressed collection name for an assessment and embedding model."""
+        digest = content_hash(embedding_provider.model_id, assessment_document_content)
+        return f"brd_{digest[:40]}"
+
+    def get_vector_store(self, assessment_document_content: str, splits) -> Chroma:
+        client = get_chroma_client(self.persist_directory)
+        name = self.collection_name(assessment_document_content)
+        vectordb = Chroma(
+            client=client, collection_name=name, embedding_function=self.embeddings
         )
-        """
-        
-        embeddings = FastEmbedEmbeddings()
-        return embeddings
 
+        if vectordb._collection.count() > 0:
+            print(f"Reusing vector collection '{name}'")
+        else:
+            # Chunk ids are content hashes, so identical chunks are stored once and
+            # unchanged chunks of an edited assessment come from the embedding cache
+            unique = {}
+            for split in splits:
+                unique.setdefault(content_hash(split.page_content), split)
+            print(f"Indexing {len(unique)} chunks into '{name}'")
+            vectordb.add_documents(list(unique.values()), ids=list(unique.keys()))
+
+        for evicted in self.collection_index.set(name, str(len(splits)).encode()):
+            if evicted == name:
+                continue
+            print(f"Evicting vector collection '{evicted}'")
+            try:
+                client.delete_collection(evicted)
+            except Exception as e:
+                print(e)
 
-    def is_chroma_db_present(self, directory: str):
-        # Check if the directory exists and contains any files.
-        return os.path.exists(directory) and len(os.listdir(directory)) > 0
+        return vectordb
 
     def getResponse(self, assessment_document_content: str, query: str) -> str:
         documents = self.load_documents_content(assessment_document_content)
         splits = self.splitDoc(documents)
-        embeddings = self.getEmbedding()
-        persist_directory = "docs/chroma/"
-
-        if self.is_chroma_db_present(persist_directory):
-            print(
-                f"Chroma vector DB found in '{persist_directory}' and will be loaded."
-            )
-            # Load vector store from the local directory
-            vectordb = Chroma(
-                persist_directory=persist_directory,
-                embedding_function=self.getEmbedding(),
-            )
-        else:
-            vectordb = Chroma.from_documents(
-                documents=splits,  # splits we created earlier
-                embedding=embeddings,
-                persist_directory=persist_directory,  # save the directory
-            )
+        vectordb = self.get_vector_store(assessment_document_content, splits)
 
         question = query
         docs = vectordb.search(question, search_type="mmr", k=5)
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, List, Optional, Set
+
+from brdgen.brd_task_store import TaskStore
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+# A task whose lease is not renewed for this long is treated as orphaned
+LEASE_SECONDS = float(os.getenv("BRD_LEASE_SECONDS", "60"))
+HEARTBEAT_SECONDS = float(os.getenv("BRD_HEARTBEAT_SECONDS", "15"))
+RECOVERY_INTERVAL_SECONDS = float(os.getenv("BRD_RECOVERY_INTERVAL_SECONDS", "30"))
+
+# Unique per process, so a restarted pod never mistakes a dead pod's lease for its own
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseKeeper:
+    """
+    The leases this worker holds on its queued and running tasks, all renewed by one
+    heartbeat task. When the process dies the leases lapse and other workers can
+    recover the tasks.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        owner: str = WORKER_ID,
+        lease_seconds: float = LEASE_SECONDS,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    ) -> None:
+        self.store = store
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._task_ids: Set[str] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def acquire(self, task_id: str) -> bool:
+        if not self.store.acquire_lease(task_id, self.owner, self.lease_seconds):
+            return False
+        self._task_ids.add(task_id)
+        return True
+
+    def release(self, task_id: str) -> None:
+        self._task_ids.discard(task_id)
+        self.store.release_lease(task_id, self.owner)
+
+    def owns(self, task_id: str) -> bool:
+        return task_id in self._task_ids
+
+    def renew_all(self) -> List[str]:
+        """Renew every held lease; returns the task IDs whose lease was lost."""
+        lost = [
+            task_id
+            for task_id in list(self._task_ids)
+            if not self.store.acquire_lease(task_id, self.owner, self.lease_seconds)
+        ]
+        for task_id in lost:
+            # Another worker took over after missed heartbeats; it now owns the task
+            print(f"Lost the lease on task {task_id}")
+            self._task_ids.discard(task_id)
+        return lost
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                self.renew_all()
+            except Exception as e:
+                print(f"Lease heartbeat failed: {e}")
+
+    def start(self) -> None:
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(
+                self._run(), name="brd-lease-heartbeat"
+            )
+
+    async def stop(self) -> None:
+        """Stop heartbeating and hand every lease back, so peers recover at once."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        for task_id in list(self._task_ids):
+            self.release(task_id)
+
+
+class TaskRecovery:
+    """
+    Periodically claims unfinished tasks whose lease has lapsed and hands them to
+    `recover`, which runs with the lease held. If it raises, the lease is released
+    and the task is retried on a later pass.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        leases: LeaseKeeper,
+        recover: Callable[[str], Awaitable[None]],
+        interval_seconds: float = RECOVERY_INTERVAL_SECONDS,
+    ) -> None:
+        self.store = store
+        self.leases = leases
+        self.recover = recover
+        self.interval_seconds = interval_seconds
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def recover_once(self) -> List[str]:
+        recovered = []
+        for task_id in self.store.unfinished_task_ids():
+            if self.leases.owns(task_id) or not self.leases.acquire(task_id):
+                continue
+            print(f"Recovering orphaned task {task_id}")
+            try:
+                await self.recover(task_id)
+                recovered.append(task_id)
+            except Exception as e:
+                print(f"Failed to recover task {task_id}: {e}")
+                self.leases.release(task_id)
+        return recovered
+
+    async def _run(self) -> None:
+        while True:
+            # Waiting first leaves the previous owner's heartbeats time to land
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.recover_once()
+            except Exception as e:
+                print(f"Task recovery failed: {e}")
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(
+                self._run(), name="brd-task-recovery"
+            )
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
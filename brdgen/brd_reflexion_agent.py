@@ -1,23 +1,67 @@
-from brdgen.brd_gen_agent import BRDGenerator
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from brdgen.brd_gen_agent import BRDGenerator, astream_completion, stream_completion
+from brdgen.brd_sections import match_section, render_sections, split_sections
 import brdgen.brd_prompts as prompts
 
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_critique(text: str, sections: Sequence[str]) -> Dict[str, str]:
+    """
+    {section: issues} from the critic's JSON answer, keeping only known sections.
+    Raises ValueError when the answer is not the expected JSON.
+    """
+    match = _JSON_OBJECT_RE.search(text or "")
+    if not match:
+        raise ValueError("Critique is not JSON")
+    try:
+        entries = json.loads(match.group(0)).get("sections") or []
+    except (json.JSONDecodeError, AttributeError) as e:
+        raise ValueError(f"Malformed critique: {e}")
+
+    flagged = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        section = match_section(str(entry.get("section", "")), sections)
+        if section is not None:
+            flagged[section] = str(entry.get("issues") or "")
+    return flagged
+
 
 class BRDRevisor:
+    """
+    Refines a BRD draft.
+
+    refine_brd rewrites the whole document in one call. refine_sections asks the critic
+    which sections need changes and rewrites only those, concurrently; when nothing is
+    flagged or nothing changes, `converged` is set so the refinement loop can stop.
+    """
+
     def __init__(
-        self, brd_generator: BRDGenerator, current_brd: str, current_assessment: str
+        self,
+        brd_generator: BRDGenerator,
+        current_brd: str,
+        current_assessment: str,
+        sections: Sequence[str] = prompts.STANDARD_SECTIONS,
     ):
         self.client = brd_generator.client
         self.model = brd_generator.model
         self.temperature = brd_generator.temperature
+        self.section_workers = brd_generator.section_workers
         self.current_assessment = current_assessment
         self.current_brd = current_brd
+        self.sections = list(sections)
+        # Outcome of the last refine_sections pass
+        self.changed_sections: List[str] = []
+        self.converged = False
 
-    def refine_brd(self) -> str:
-        """Refine BRD based on user feedback."""
-        print("Refining BRD...")
-        if not self.current_brd:
-            return "No existing BRD to refine."
-
+    def _build_messages(self, feedback: Optional[str] = None):
         # Prepare context with previous interactions
         messages = [
             {
@@ -37,14 +81,235 @@ class BRDRevisor:
                     """,
             },
         ]
+        if feedback:
+            messages[1]["content"] += prompts.USER_FEEDBACK_TEMPLATE.format(
+                feedback=feedback
+            )
+        return messages
+
+    def refine_brd(
+        self,
+        on_token: Optional[Callable[[str], None]] = None,
+        feedback: Optional[str] = None,
+    ) -> str:
+        """Refine BRD based on user feedback, streaming tokens to on_token if given."""
+        print("Refining BRD...")
+        if not self.current_brd:
+            return "No existing BRD to refine."
+
+        messages = self._build_messages(feedback)
 
         # Generate refined BRD
+        if on_token is not None:
+            self.current_brd = stream_completion(
+                self.client,
+                on_token,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                cache=True,
+                call_site="refine",
+            )
+            return self.current_brd
+
         response = self.client.chat.complete(
-            model=self.model, messages=messages, temperature=self.temperature
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            cache=True,
+            call_site="refine",
         )
 
         # Update context
         self.current_brd = response.choices[0].message.content
-        # self.chat_history.append({"user": user_feedback, "assistant": self.current_brd})
 
         return self.current_brd
+
+    async def arefine_brd(
+        self,
+        on_token: Optional[Callable[[str], None]] = None,
+        feedback: Optional[str] = None,
+    ) -> str:
+        """Async variant of refine_brd using the non-blocking Mistral calls."""
+        print("Refining BRD (async)...")
+        if not self.current_brd:
+            return "No existing BRD to refine."
+
+        messages = self._build_messages(feedback)
+        if on_token is not None:
+            self.current_brd = await astream_completion(
+                self.client,
+                on_token,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                cache=True,
+                call_site="refine",
+            )
+            return self.current_brd
+
+        response = await self.client.chat.complete_async(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            cache=True,
+            call_site="refine",
+        )
+        self.current_brd = response.choices[0].message.content
+        return self.current_brd
+
+    # Section-level refinement
+
+    def _critique_messages(self):
+        return [
+            {"role": "system", "content": prompts.REFINE_SECTIONS_PROMPT_SYSTEM},
+            {
+                "role": "user",
+                "content": prompts.CRITIQUE_SECTIONS_TEMPLATE.format(
+                    sections="\n".join(self.sections),
+                    assessment_report=self.current_assessment,
+                    brd=self.current_brd,
+                ),
+            },
+        ]
+
+    def _revision_messages(self, section: str, issues: str, current: str):
+        return [
+            {"role": "system", "content": prompts.REFINE_SECTIONS_PROMPT_SYSTEM},
+            {
+                "role": "user",
+                "content": prompts.REVISE_SECTION_TEMPLATE.format(
+                    outline="\n".join(self.sections),
+                    section=section,
+                    issues=issues,
+                    current=current or "(missing from the draft)",
+                ),
+            },
+        ]
+
+    @staticmethod
+    def _section_body(section: str, text: str) -> str:
+        # The model sometimes repeats the heading despite the instructions
+        parsed = split_sections(text, [section])
+        return (parsed.get(section) or parsed[""]).strip()
+
+    def _apply_revisions(self, parsed: Dict[str, str], revised: Dict[str, str]) -> str:
+        self.changed_sections = [
+            section
+            for section, body in revised.items()
+            if body and body != parsed.get(section, "").strip()
+        ]
+        self.converged = not self.changed_sections
+        if self.converged:
+            print("No sections changed; refinement converged")
+            return self.current_brd
+
+        print(f"Revised sections: {', '.join(self.changed_sections)}")
+        parsed = {**parsed, **{s: revised[s] for s in self.changed_sections}}
+        self.current_brd = render_sections(parsed, self.sections)
+        return self.current_brd
+
+    def _plan(self, critique: str, parsed: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Flagged sections, or None when the critique can't be used."""
+        try:
+            flagged = parse_critique(critique, self.sections)
+        except ValueError as e:
+            print(f"{e}; refining the whole BRD instead")
+            return None
+        if not flagged:
+            print("Critic flagged no sections; refinement converged")
+            self.changed_sections = []
+            self.converged = True
+        return flagged
+
+    def refine_sections(self, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Critique the draft, then rewrite only the flagged sections concurrently.
+        Falls back to refine_brd (streaming to on_token) when the draft has no
+        recognisable sections or the critique is unusable.
+        """
+        print("Refining BRD by section...")
+        if not self.current_brd:
+            return "No existing BRD to refine."
+
+        parsed = split_sections(self.current_brd, self.sections)
+        if len(parsed) == 1:
+            print("No sections recognised; refining the whole BRD instead")
+            return self.refine_brd(on_token)
+
+        response = self.client.chat.complete(
+            model=self.model,
+            messages=self._critique_messages(),
+            temperature=self.temperature,
+            response_format={"type": "json_object"},
+            cache=True,
+            call_site="critique",
+        )
+        flagged = self._plan(response.choices[0].message.content, parsed)
+        if flagged is None:
+            return self.refine_brd(on_token)
+        if not flagged:
+            return self.current_brd
+
+        def revise(section: str) -> str:
+            response = self.client.chat.complete(
+                model=self.model,
+                messages=self._revision_messages(
+                    section, flagged[section], parsed.get(section, "")
+                ),
+                temperature=self.temperature,
+                cache=True,
+                call_site="refine_section",
+            )
+            return self._section_body(section, response.choices[0].message.content)
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.section_workers, len(flagged))
+        ) as executor:
+            revised = dict(zip(flagged, executor.map(revise, flagged)))
+        return self._apply_revisions(parsed, revised)
+
+    async def arefine_sections(
+        self, on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Async variant of refine_sections; a semaphore bounds concurrent rewrites."""
+        print("Refining BRD by section (async)...")
+        if not self.current_brd:
+            return "No existing BRD to refine."
+
+        parsed = split_sections(self.current_brd, self.sections)
+        if len(parsed) == 1:
+            print("No sections recognised; refining the whole BRD instead")
+            return await self.arefine_brd(on_token)
+
+        response = await self.client.chat.complete_async(
+            model=self.model,
+            messages=self._critique_messages(),
+            temperature=self.temperature,
+            response_format={"type": "json_object"},
+            cache=True,
+            call_site="critique",
+        )
+        flagged = self._plan(response.choices[0].message.content, parsed)
+        if flagged is None:
+            return await self.arefine_brd(on_token)
+        if not flagged:
+            return self.current_brd
+
+        semaphore = asyncio.Semaphore(self.section_workers)
+
+        async def revise(section: str) -> str:
+            async with semaphore:
+                response = await self.client.chat.complete_async(
+                    model=self.model,
+                    messages=self._revision_messages(
+                        section, flagged[section], parsed.get(section, "")
+                    ),
+                    temperature=self.temperature,
+                    cache=True,
+                    call_site="refine_section",
+                )
+            return self._section_body(section, response.choices[0].message.content)
+
+        bodies = await asyncio.gather(*(revise(section) for section in flagged))
+        return self._apply_revisions(parsed, dict(zip(flagged, bodies)))
@@ -0,0 +1,98 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+import brdgen.brd_prompts as prompts
+
+# Optional markdown heading/bold markers, optional "3." numbering, then the title
+_HEADING_RE = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:\*\*)?\s*(?:\d+\.\s*)?"
+    r"(?P<title>[^*#:]+?)\s*:?\s*(?:\*\*)?\s*:?\s*$"
+)
+
+
+def section_title(section: str) -> str:
+    """Comparable title without numbering, e.g. "business requirements"."""
+    return re.sub(r"^\d+\.\s*", "", section).strip().lower()
+
+
+def match_section(line: str, sections: Sequence[str]) -> Optional[str]:
+    """The section a heading line (or bare title) refers to, if any."""
+    match = _HEADING_RE.match(line)
+    if not match:
+        return None
+    title = match.group("title").strip().lower()
+    for section in sections:
+        if section_title(section) == title:
+            return section
+    return None
+
+
+def split_sections(
+    text: str, sections: Sequence[str] = prompts.STANDARD_SECTIONS
+) -> Dict[str, str]:
+    """
+    Split BRD text on the known section headings.
+
+    Returns {section: body} in document order; text before the first recognised heading
+    is kept under the "" key so nothing is lost.
+    """
+    parts: Dict[str, List[str]] = {"": []}
+    current = ""
+    for line in text.splitlines():
+        section = match_section(line, sections)
+        if section is not None and section not in parts:
+            current = section
+            parts[current] = []
+            continue
+        parts[current].append(line)
+    return {section: "\n".join(lines).strip() for section, lines in parts.items()}
+
+
+def assemble_sections(
+    generated: Sequence[str],
+    groups: Sequence[Sequence[str]],
+    sections: Sequence[str] = prompts.STANDARD_SECTIONS,
+) -> str:
+    """
+    Stitch independently generated section groups into one BRD in outline order.
+
+    Each output is split on the headings of its group; preambles and duplicate headings
+    are dropped and headings are normalised to "## <section>". A section the model
+    skipped keeps its heading with a placeholder so the gap is visible to the
+    refinement step. Only headings are normalised here; BRDGenerator's consistency
+    pass reconciles the content across sections.
+    """
+    bodies: Dict[str, str] = {}
+    for text, group in zip(generated, groups):
+        parsed = split_sections(text, group)
+        if len(group) == 1 and group[0] not in parsed:
+            # Single-section request answered without a heading
+            parsed[group[0]] = parsed.get("", "")
+        for section in group:
+            if parsed.get(section):
+                bodies[section] = parsed[section]
+
+    return "\n\n".join(
+        f"## {section}\n\n{bodies.get(section) or '_Not generated._'}"
+        for section in sections
+        if any(section in group for group in groups)
+    )
+
+
+def missing_sections(text: str, sections: Sequence[str]) -> List[str]:
+    """The sections whose heading does not appear in text."""
+    parsed = split_sections(text, sections)
+    return [section for section in sections if section not in parsed]
+
+
+def render_sections(
+    parsed: Dict[str, str], sections: Sequence[str] = prompts.STANDARD_SECTIONS
+) -> str:
+    """Inverse of split_sections: preamble, then "## <section>" blocks in order."""
+    blocks = [parsed[""]] if parsed.get("") else []
+    blocks += [
+        f"## {section}\n\n{parsed[section]}"
+        for section in sections
+        if section in parsed
+    ]
+    return "\n\n".join(blocks)
@@ -0,0 +1,134 @@
+import re
+import zlib
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Dict, List, Type
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_MAX_COEFFICIENT = np.uint64((1 << 31) - 1)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SimilarityBackend(ABC):
+    """Computes a symmetric pairwise similarity matrix (values in [0, 1]) for texts."""
+
+    name = "base"
+
+    @abstractmethod
+    def pairwise(self, texts: List[str]) -> np.ndarray:
+        """Symmetric matrix of pairwise similarities with ones on the diagonal."""
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return float(self.pairwise([text1, text2])[0, 1])
+
+
+class DifflibSimilarity(SimilarityBackend):
+    """Character-level SequenceMatcher ratio. Quadratic; kept as the reference backend."""
+
+    name = "difflib"
+
+    def pairwise(self, texts: List[str]) -> np.ndarray:
+        n = len(texts)
+        matrix = np.eye(n)
+        for i in range(n):
+            for j in range(i + 1, n):
+                matrix[i, j] = matrix[j, i] = SequenceMatcher(
+                    None, texts[i], texts[j]
+                ).ratio()
+        return matrix
+
+
+class CosineSimilarity(SimilarityBackend):
+    """Cosine similarity of token-count vectors, computed as one matrix product."""
+
+    name = "cosine"
+
+    def pairwise(self, texts: List[str]) -> np.ndarray:
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+        counts = np.zeros((len(texts), max(len(vocabulary), 1)))
+        np.add.at(counts, (rows, cols), 1)
+        norms = np.linalg.norm(counts, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        unit = counts / norms
+        matrix = np.clip(unit @ unit.T, 0.0, 1.0)
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+
+class MinHashSimilarity(SimilarityBackend):
+    """Estimated Jaccard similarity of word shingles using MinHash signatures."""
+
+    name = "minhash"
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MAX_COEFFICIENT, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        size = min(self.shingle_size, len(tokens)) or 1
+        shingles = {
+            " ".join(tokens[i : i + size]) for i in range(max(len(tokens) - size + 1, 1))
+        }
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self._shingles(text)
+        # (a * x + b) mod p for every permutation/shingle pair; with x < 2^32,
+        # a < 2^31 and b < 2^32 the result never overflows uint64
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def pairwise(self, texts: List[str]) -> np.ndarray:
+        signatures = np.stack([self.signature(text) for text in texts])
+        matrix = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+
+SIMILARITY_BACKENDS: Dict[str, Type[SimilarityBackend]] = {
+    DifflibSimilarity.name: DifflibSimilarity,
+    CosineSimilarity.name: CosineSimilarity,
+    MinHashSimilarity.name: MinHashSimilarity,
+}
+
+
+# Score at which two samples count as agreeing, per backend. Calibrated on
+# benchmarks/fixtures.py: BRD variants with 5-15% of their words rewritten score
+# 0.2-0.74 on MinHash, while BRDs written from different content score 0.0.
+# Token-count cosine scores both above 0.97, and difflib only separates
+# near-verbatim copies, so neither is a good agreement check.
+AGREEMENT_THRESHOLDS: Dict[str, float] = {
+    MinHashSimilarity.name: 0.15,
+    DifflibSimilarity.name: 0.5,
+    CosineSimilarity.name: 0.999,
+}
+
+
+def get_similarity_backend(name: str) -> SimilarityBackend:
+    try:
+        return SIMILARITY_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown similarity backend: {name}. "
+            f"Expected one of {sorted(SIMILARITY_BACKENDS)}"
+        )
@@ -3,8 +3,14 @@ from typing import TypedDict
 
 class BRDState(TypedDict):
     assessment_text: str
+    # Condensed assessment used in prompts when the full text exceeds the token budget
+    assessment_digest: str | None
     brd_content: str | None
     iteration_count: int
+    # Set by section-level refinement when a pass changed nothing
+    refinement_converged: bool | None
     rag_result: str | None
+    # External search result, gathered in parallel with retrieval as generation context
+    tool_result: str | None
     brd_file_path: str | None
     user_feedback: str | None
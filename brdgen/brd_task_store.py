@@ -0,0 +1,347 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv  # type: ignore
+
+load_dotenv()
+
+# sqlite:///path/to/tasks.sqlite, redis://host:6379/0 or memory://
+TASK_STORE_URL = os.getenv("TASK_STORE_URL", "sqlite:///data/tasks.sqlite")
+# Finished (completed/failed) tasks are evicted after this many seconds
+TASK_TTL_SECONDS = int(os.getenv("TASK_TTL_SECONDS", str(24 * 60 * 60)))
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+def encode_task(task: Dict[str, Any]) -> bytes:
+    """Serialise a task record; BRD content compresses well, so the whole record is zlibbed."""
+    return zlib.compress(json.dumps(task).encode("utf-8"))
+
+
+def decode_task(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def is_finished(task: Dict[str, Any]) -> bool:
+    return task.get("status") in FINISHED_STATUSES
+
+
+class TaskStore(ABC):
+    """
+    Storage for BRD task status and results, shared by every API replica.
+
+    Records are plain dicts with at least a "status" key. In-progress tasks never
+    expire; finished tasks are evicted ttl_seconds after they were last written.
+    """
+
+    def __init__(self, ttl_seconds: int = TASK_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the task record, or None if unknown or expired."""
+
+    @abstractmethod
+    def set(self, task_id: str, task: Dict[str, Any]) -> None:
+        """Create or replace the task record."""
+
+    @abstractmethod
+    def delete(self, task_id: str) -> None:
+        pass
+
+    def update(self, task_id: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the existing record (or a new one) and store it."""
+        task = self.get(task_id) or {}
+        task.update(fields)
+        self.set(task_id, task)
+        return task
+
+    def evict_expired(self) -> int:
+        """Drop expired finished tasks; returns how many were removed."""
+        return 0
+
+    @abstractmethod
+    def unfinished_task_ids(self) -> List[str]:
+        """Ids of tasks that are still queued or running."""
+
+    @abstractmethod
+    def acquire_lease(self, task_id: str, owner: str, ttl_seconds: float) -> bool:
+        """
+        Take or renew the lease on a task. Fails while another owner holds an
+        unexpired lease; a worker that stops heartbeating loses it after ttl_seconds.
+        """
+
+    @abstractmethod
+    def release_lease(self, task_id: str, owner: str) -> None:
+        """Drop the lease if owner still holds it."""
+
+    def _expires_at(self, task: Dict[str, Any]) -> Optional[float]:
+        return time.time() + self.ttl_seconds if is_finished(task) else None
+
+
+class InMemoryTaskStore(TaskStore):
+    """Process-local store; only suitable for a single replica and for tests."""
+
+    def __init__(self, ttl_seconds: int = TASK_TTL_SECONDS) -> None:
+        super().__init__(ttl_seconds)
+        self._tasks: Dict[str, bytes] = {}
+        self._expiry: Dict[str, float] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            expires_at = self._expiry.get(task_id)
+            if expires_at is not None and expires_at <= time.time():
+                self._tasks.pop(task_id, None)
+                self._expiry.pop(task_id, None)
+            data = self._tasks.get(task_id)
+        return decode_task(data) if data is not None else None
+
+    def set(self, task_id: str, task: Dict[str, Any]) -> None:
+        expires_at = self._expires_at(task)
+        with self._lock:
+            self._tasks[task_id] = encode_task(task)
+            if expires_at is None:
+                self._expiry.pop(task_id, None)
+            else:
+                self._expiry[task_id] = expires_at
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self._expiry.pop(task_id, None)
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [t for t, expires_at in self._expiry.items() if expires_at <= now]
+            for task_id in expired:
+                self._tasks.pop(task_id, None)
+                self._expiry.pop(task_id, None)
+        return len(expired)
+
+    def unfinished_task_ids(self) -> List[str]:
+        # Only finished tasks carry an expiry
+        with self._lock:
+            return [t for t in self._tasks if t not in self._expiry]
+
+    def acquire_lease(self, task_id: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder, expires_at = self._leases.get(task_id, (owner, now))
+            if holder != owner and expires_at > now:
+                return False
+            self._leases[task_id] = (owner, now + ttl_seconds)
+        return True
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        with self._lock:
+            if self._leases.get(task_id, (None, 0))[0] == owner:
+                del self._leases[task_id]
+
+
+class SQLiteTaskStore(TaskStore):
+    """Single-node store backed by SQLite in WAL mode, so it survives restarts."""
+
+    def __init__(self, path: str, ttl_seconds: int = TASK_TTL_SECONDS) -> None:
+        super().__init__(ttl_seconds)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, status TEXT, data BLOB NOT NULL, "
+            "expires_at REAL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_expires_at ON tasks (expires_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "task_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM tasks WHERE task_id = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (task_id, time.time()),
+            ).fetchone()
+        return decode_task(row[0]) if row else None
+
+    def set(self, task_id: str, task: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks "
+                "(task_id, status, data, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    task_id,
+                    task.get("status"),
+                    encode_task(task),
+                    self._expires_at(task),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._conn.execute("DELETE FROM leases WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tasks WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def unfinished_task_ids(self) -> List[str]:
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id FROM tasks WHERE status IS NULL "
+                f"OR status NOT IN ({placeholders})",
+                FINISHED_STATUSES,
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def acquire_lease(self, task_id: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # The conditional upsert is atomic across processes sharing the file
+            cursor = self._conn.execute(
+                "INSERT INTO leases (task_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (task_id) DO UPDATE SET "
+                "owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (task_id, owner, now + ttl_seconds, now),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM leases WHERE task_id = ? AND owner = ?", (task_id, owner)
+            )
+            self._conn.commit()
+
+
+class RedisTaskStore(TaskStore):
+    """
+    Multi-replica store for any Redis-protocol server. Finished tasks use native key
+    expiry, so eviction needs no sweeper.
+    """
+
+    KEY_PREFIX = "brd:task:"
+    LEASE_PREFIX = "brd:lease:"
+
+    def __init__(
+        self, url: str = "", ttl_seconds: int = TASK_TTL_SECONDS, client=None
+    ) -> None:
+        super().__init__(ttl_seconds)
+        if client is None:
+            import redis  # type: ignore
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}{task_id}"
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(self._key(task_id))
+        return decode_task(data) if data is not None else None
+
+    def set(self, task_id: str, task: Dict[str, Any]) -> None:
+        ttl = self.ttl_seconds if is_finished(task) else None
+        self.client.set(self._key(task_id), encode_task(task), ex=ttl)
+
+    def delete(self, task_id: str) -> None:
+        self.client.delete(self._key(task_id), self._lease_key(task_id))
+
+    def _lease_key(self, task_id: str) -> str:
+        return f"{self.LEASE_PREFIX}{task_id}"
+
+    def unfinished_task_ids(self) -> List[str]:
+        # Finished tasks are the ones with a native expiry
+        keys = list(self.client.scan_iter(match=f"{self.KEY_PREFIX}*", count=500))
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        return [
+            self._task_id(key)
+            for key, ttl in zip(keys, pipe.execute())
+            if ttl == -1
+        ]
+
+    def _task_id(self, key) -> str:
+        return self._decode(key)[len(self.KEY_PREFIX) :]
+
+    def acquire_lease(self, task_id: str, owner: str, ttl_seconds: float) -> bool:
+        import redis  # type: ignore
+
+        key, ttl_ms = self._lease_key(task_id), int(ttl_seconds * 1000)
+        if self.client.set(key, owner, nx=True, px=ttl_ms):
+            return True
+        # Renewal: only the current holder may extend the lease
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                holder = pipe.get(key)
+                if holder is not None and self._decode(holder) != owner:
+                    return False
+                pipe.multi()
+                pipe.set(key, owner, px=ttl_ms)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        import redis  # type: ignore
+
+        key = self._lease_key(task_id)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if self._decode(pipe.get(key)) == owner:
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+            except redis.WatchError:
+                pass
+
+    @staticmethod
+    def _decode(value) -> Optional[str]:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def create_task_store(
+    url: str = TASK_STORE_URL, ttl_seconds: int = TASK_TTL_SECONDS
+) -> TaskStore:
+    """Build a task store from a URL: memory://, sqlite:///path or redis://host:port/db."""
+    if url.startswith("memory://"):
+        return InMemoryTaskStore(ttl_seconds)
+    if url.startswith("sqlite:///"):
+        return SQLiteTaskStore(url[len("sqlite:///") :], ttl_seconds)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTaskStore(url, ttl_seconds)
+    raise ValueError(f"Unsupported task store URL: {url}")
@@ -1,20 +1,199 @@
 # Sample tool to interact with Tavily API
 # TODO - Implement an actual tool as needed
 
-import json
+import asyncio
 import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import requests
 from dotenv import load_dotenv  # type: ignore
+from requests.adapters import HTTPAdapter
 from tavily import TavilyClient  # type: ignore
 
 load_dotenv()
 
+DEFAULT_QUERY = "What is the Background of SAP in 50 words?"
+QUERY_TEMPLATE = "What is the Background of {topic} in 50 words?"
+# Per-request timeout and the wall-clock budget for a whole batch of queries
+TOOL_TIMEOUT_SECONDS = float(os.getenv("BRD_TOOL_TIMEOUT_SECONDS", "8"))
+TOOL_BUDGET_SECONDS = float(os.getenv("BRD_TOOL_BUDGET_SECONDS", "12"))
+TOOL_CACHE_TTL_SECONDS = int(os.getenv("BRD_TOOL_CACHE_TTL_SECONDS", "3600"))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("BRD_TOOL_CACHE_MAX_ENTRIES", "256"))
+TOOL_MAX_CONCURRENCY = int(os.getenv("BRD_TOOL_MAX_CONCURRENCY", "4"))
+TOOL_MAX_QUERIES = int(os.getenv("BRD_TOOL_MAX_QUERIES", "3"))
+# Alternative Tavily endpoint, e.g. the local mock in loadtest/
+TAVILY_API_BASE_URL = os.getenv("TAVILY_API_BASE_URL") or None
+
+# Capitalised words / acronyms; candidates for assessment-derived queries
+_TOPIC_RE = re.compile(
+    r"\b(?:[A-Z]{2,}[A-Za-z0-9/]*|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b"
+)
+_TOPIC_STOPWORDS = {"THE", "AND", "FOR", "BRD", "PDF", "NA", "TBD", "OK"}
+
+
+def normalise_query(query: str) -> str:
+    """Cache key for a query: case, whitespace and trailing punctuation don't matter."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").strip().lower()
+
+
+def assessment_queries(
+    assessment_text: str, max_queries: int = TOOL_MAX_QUERIES
+) -> List[str]:
+    """
+    Queries derived from the assessment: the most frequent system names / acronyms /
+    multi-word proper nouns, falling back to DEFAULT_QUERY when none are found.
+    """
+    counts = Counter(
+        match
+        for match in _TOPIC_RE.findall(assessment_text or "")
+        if match.upper() not in _TOPIC_STOPWORDS
+    )
+    topics = [topic for topic, _ in counts.most_common(max_queries)]
+    return [QUERY_TEMPLATE.format(topic=t) for t in topics] or [DEFAULT_QUERY]
+
+
+class TTLCache:
+    """Small thread-safe in-memory cache with per-entry expiry and LRU bounding."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = TOOL_CACHE_TTL_SECONDS,
+        max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class BRDExternalTool:
-    def __init__(self):
-        self.client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    """
+    Web search tool backed by Tavily.
+
+    One instance is meant to be shared (see get_external_tool): it keeps a pooled HTTP
+    session, caches results by normalised query for ttl_seconds, bounds each request by
+    `timeout` and a whole batch by `budget` seconds. Queries that fail or miss the
+    budget come back as None so a slow tool never stalls the workflow.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        timeout: float = TOOL_TIMEOUT_SECONDS,
+        budget: float = TOOL_BUDGET_SECONDS,
+        ttl_seconds: float = TOOL_CACHE_TTL_SECONDS,
+        max_concurrency: int = TOOL_MAX_CONCURRENCY,
+    ):
+        if client is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=max_concurrency, pool_maxsize=max_concurrency
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            client = TavilyClient(
+                api_key=os.getenv("TAVILY_API_KEY"),
+                api_base_url=TAVILY_API_BASE_URL,
+                session=session,
+            )
+        self.client = client
+        self.timeout = timeout
+        self.budget = budget
+        self.cache = TTLCache(ttl_seconds)
+        # Long-lived so a batch can return at its budget without joining slow threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="brd-tool"
+        )
+
+    def search(self, query: str = DEFAULT_QUERY) -> str:
+        key = normalise_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
-    def search(self, query="What is the Background of SAP in 50 words?") -> str:
         print("Searching for:", query)
-        result = self.client.search(query, limit=1)
-        return result["results"][0]["content"]
+        result = self.client.search(query, max_results=1, timeout=self.timeout)
+        content = result["results"][0]["content"]
+        self.cache.set(key, content)
+        return content
+
+    def _safe_search(self, query: str) -> Optional[str]:
+        try:
+            return self.search(query)
+        except Exception as e:
+            print(f"Tool search failed for {query!r}: {e}")
+            return None
+
+    def search_many(self, queries: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Run queries concurrently; results not ready within the budget are None."""
+        futures = {
+            query: self._executor.submit(self._safe_search, query)
+            for query in dict.fromkeys(queries)
+        }
+        done, pending = wait(futures.values(), timeout=self.budget)
+        if pending:
+            print(f"Tool budget of {self.budget}s exceeded for {len(pending)} queries")
+        return {
+            query: future.result() if future in done else None
+            for query, future in futures.items()
+        }
+
+    async def asearch_many(self, queries: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Async variant of search_many; waits on the event loop instead of a thread."""
+        futures = {
+            query: asyncio.wrap_future(self._executor.submit(self._safe_search, query))
+            for query in dict.fromkeys(queries)
+        }
+        done, pending = await asyncio.wait(futures.values(), timeout=self.budget)
+        if pending:
+            print(f"Tool budget of {self.budget}s exceeded for {len(pending)} queries")
+        return {
+            query: future.result() if future in done else None
+            for query, future in futures.items()
+        }
+
+
+_external_tool: Optional[BRDExternalTool] = None
+_external_tool_lock = threading.Lock()
+
+
+def get_external_tool() -> BRDExternalTool:
+    """Process-wide tool instance, so the session pool and cache are reused."""
+    global _external_tool
+    with _external_tool_lock:
+        if _external_tool is None:
+            _external_tool = BRDExternalTool()
+        return _external_tool
+
+
+def format_tool_results(results: Dict[str, Optional[str]]) -> Optional[str]:
+    """Join successful results for use as generation context."""
+    parts = [f"{query}\n{content}" for query, content in results.items() if content]
+    return "\n\n".join(parts) or None
@@ -1,10 +1,99 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
 import os
 import re
+import threading
+import time
 import unicodedata
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import docx  # type: ignore
+import pypdf  # type: ignore
+from brdgen.brd_cache import CACHE_DIR, DiskLRUCache, content_hash
+from brdgen.brd_metrics import observe_extraction
 from pypdf import PdfReader  # type: ignore
 
+# Processes used by aextract_text; 0 means the event loop's default thread pool
+EXTRACTION_PROCESSES = int(os.getenv("BRD_EXTRACTION_PROCESSES", "0"))
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (the container's share, not the host's count)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# PDFs with at least this many pages are split across processes page-range by
+# page-range. Sequential by default: the only measurement so far (bench_pdf_extraction)
+# showed a 0.5-0.8x slowdown, so enable it only where it is measured to help.
+PARALLEL_PDF_MIN_PAGES = int(os.getenv("BRD_PARALLEL_PDF_MIN_PAGES", "50"))
+PDF_PAGE_WORKERS = min(int(os.getenv("BRD_PDF_PAGE_WORKERS", "1")), available_cpus())
+
+# Bump whenever extract_text/clean_text change output, so cached text is not reused
+EXTRACTOR_VERSION = f"1-pypdf{pypdf.__version__}"
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("BRD_EXTRACTION_CACHE_MAX_MB", "256"))
+
+_extraction_executor: Optional[Executor] = None
+_pdf_page_executors: Dict[int, Executor] = {}
+_extraction_cache: Optional[DiskLRUCache] = None
+_extraction_lock = threading.Lock()
+
+
+def get_extraction_executor() -> Optional[Executor]:
+    """Shared process pool for document parsing, created on first use."""
+    global _extraction_executor
+    if EXTRACTION_PROCESSES <= 0:
+        return None
+    with _extraction_lock:
+        if _extraction_executor is None:
+            _extraction_executor = ProcessPoolExecutor(max_workers=EXTRACTION_PROCESSES)
+        return _extraction_executor
+
+
+def get_pdf_page_executor(workers: int) -> Executor:
+    """
+    Shared process pool for page-range extraction, one per worker count. Workers are
+    spawned rather than forked, as the API process runs many threads.
+    """
+    with _extraction_lock:
+        if workers not in _pdf_page_executors:
+            _pdf_page_executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_page_executors[workers]
+
+
+def get_extraction_cache() -> DiskLRUCache:
+    """On-disk cache of cleaned text keyed by file content, created on first use."""
+    global _extraction_cache
+    with _extraction_lock:
+        if _extraction_cache is None:
+            _extraction_cache = DiskLRUCache(
+                os.path.join(CACHE_DIR, "extracted_text.sqlite"),
+                max_bytes=EXTRACTION_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _extraction_cache
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    # Runs in a worker process: each worker opens its own reader
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
 
 class Utility:
 
@@ -19,15 +108,47 @@ class Utility:
         return text.strip()
 
     @staticmethod
-    def extract_text(file_path: str) -> str:
-        """Extract text from PDF or DOCX files."""
+    def extract_text(file_path: str, use_cache: bool = True) -> str:
+        """
+        Extract text from PDF or DOCX files.
+
+        Cleaned text is cached by SHA-256 of the file content (and EXTRACTOR_VERSION),
+        so re-uploads of the same document skip parsing entirely.
+        """
+        text, stats = Utility.extract_text_with_stats(file_path, use_cache)
+        observe_extraction(**stats)
+        return text
+
+    @staticmethod
+    def extract_text_with_stats(
+        file_path: str, use_cache: bool = True
+    ) -> Tuple[str, Dict[str, Any]]:
+        """extract_text plus file type, page count, seconds and whether it was cached."""
+        started = time.perf_counter()
         _, ext = os.path.splitext(file_path)
+        stats = {"file_type": ext.lower().lstrip(".") or "unknown", "pages": None}
+
+        cache_key = None
+        if use_cache:
+            try:
+                cache_key = content_hash(
+                    EXTRACTOR_VERSION, ext.lower(), file_sha256(file_path)
+                )
+                cached = get_extraction_cache().get(cache_key)
+                if cached is not None:
+                    print(f"Using cached text for {file_path}")
+                    text = zlib.decompress(cached).decode("utf-8")
+                    stats["seconds"] = time.perf_counter() - started
+                    return text, {**stats, "cached": True}
+            except Exception as e:
+                print(f"Extraction cache unavailable: {e}")
+                cache_key = None
 
         try:
             if ext.lower() == ".pdf":
-                with open(file_path, "rb") as file:
-                    reader = PdfReader(file)
-                    text = " ".join([page.extract_text() for page in reader.pages])
+                pages = list(Utility.iter_pdf_pages(file_path))
+                stats["pages"] = len(pages)
+                text = " ".join(pages)
             elif ext.lower() in [".docx", ".doc"]:
                 doc = docx.Document(file_path)
                 text = "\n".join([para.text for para in doc.paragraphs])
@@ -35,18 +156,91 @@ class Utility:
             else:
                 raise ValueError(f"Unsupported file type: {ext}")
 
-            return Utility.clean_text(text)
-
+            text = Utility.clean_text(text)
         except Exception as e:
             raise RuntimeError(f"Error extracting text from {file_path}: {str(e)}")
 
+        if cache_key is not None:
+            try:
+                get_extraction_cache().set(cache_key, zlib.compress(text.encode("utf-8")))
+            except Exception as e:
+                print(f"Failed to cache extracted text: {e}")
+        stats["seconds"] = time.perf_counter() - started
+        return text, {**stats, "cached": False}
+
     @staticmethod
-    def save_brd(brd_content: str, filename: str = "generated_brd.docx") -> str:
+    def iter_pdf_pages(
+        file_path: str,
+        workers: int = PDF_PAGE_WORKERS,
+        min_pages_for_parallel: int = PARALLEL_PDF_MIN_PAGES,
+    ) -> Iterator[str]:
+        """
+        Yield the text of each PDF page in order.
+
+        Large PDFs are split into page ranges extracted by a process pool; results are
+        still yielded in page order as soon as each range is done. Small files, or a
+        single worker, use the sequential path.
+        """
+        reader = PdfReader(file_path)
+        page_count = len(reader.pages)
+
+        if workers <= 1 or page_count < min_pages_for_parallel:
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+
+        # A few ranges per worker keeps the pool busy when pages differ in cost
+        range_size = max(1, -(-page_count // (workers * 4)))
+        ranges = [
+            (start, min(start + range_size, page_count))
+            for start in range(0, page_count, range_size)
+        ]
+        print(f"Extracting {page_count} pages with {workers} processes")
+        executor = get_pdf_page_executor(workers)
+        futures = [
+            executor.submit(_extract_pdf_page_range, file_path, start, stop)
+            for start, stop in ranges
+        ]
+        for future in futures:
+            yield from future.result()
+
+    @staticmethod
+    async def aextract_text(file_path: str) -> str:
+        """Run extract_text in a worker (process pool if configured) off the event loop."""
+        loop = asyncio.get_running_loop()
+        text, stats = await loop.run_in_executor(
+            get_extraction_executor(), Utility.extract_text_with_stats, file_path
+        )
+        # Observed here, not in the worker, so a process pool doesn't lose the metrics
+        observe_extraction(**stats)
+        return text
+
+    @staticmethod
+    async def aextract_texts(file_paths: List[str]) -> List[str]:
+        """Extract several documents concurrently, in input order."""
+        return list(
+            await asyncio.gather(*(Utility.aextract_text(p) for p in file_paths))
+        )
+
+    @staticmethod
+    def brd_document(brd_content: str) -> "docx.document.Document":
         # TODO: Add markdown to the brd_content
-        print("Saving generated BRD")
         doc = docx.Document()
         doc.add_heading("Generated Business Requirements Document", level=1)
         doc.add_paragraph(brd_content)
+        return doc
+
+    @staticmethod
+    def brd_docx_bytes(brd_content: str) -> bytes:
+        """The BRD as .docx bytes, for bundling without touching generated_brds/."""
+        buffer = io.BytesIO()
+        Utility.brd_document(brd_content).save(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def save_brd(brd_content: str, filename: str = "generated_brd.docx") -> str:
+        print("Saving generated BRD")
+        doc = Utility.brd_document(brd_content)
 
         # Ensure directory exists
         os.makedirs("generated_brds", exist_ok=True)
@@ -1,39 +1,115 @@
-import os
+import argparse
+import asyncio
 import io
-from typing import Optional
-from brdgen.brd_gen_agent import BRDGenerator
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+from brdgen.brd_checkpoint import (
+    CHECKPOINT_DURABILITY,
+    aclose_checkpointer,
+    acompact_thread,
+    compact_thread,
+    create_checkpointer,
+    thread_config,
+)
+from brdgen.brd_dedup import merge_documents
+from brdgen.brd_gen_agent import BRDGenerator, ConsistencyMetrics
+from brdgen.brd_metrics import observe_dedup, timed_node
 
 from brdgen.brd_rag_agent_chroma import BRDRAG
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 from brdgen.brd_reflexion_agent import BRDRevisor
 from brdgen.brd_state import BRDState
-from brdgen.brd_tool_executor import BRDExternalTool
+from brdgen.brd_tool_executor import (
+    assessment_queries,
+    format_tool_results,
+    get_external_tool,
+)
 from brdgen.brd_utility import Utility
 from dotenv import load_dotenv
-from langgraph.graph import END, StateGraph
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
 from PIL import Image
 
 load_dotenv()
 MODEL = "mistral-large-latest"
 MAX_ITERATIONS = 1  # For self critic.. increase if needed
+# Stop self-consistency sampling early once two samples agree
+ADAPTIVE_SAMPLING = os.getenv("BRD_ADAPTIVE_SAMPLING", "false").lower() == "true"
+MAX_SAMPLES = int(os.getenv("BRD_MAX_SAMPLES", "4"))
+# Write sections as concurrent requests instead of sampling whole BRDs
+SECTION_PARALLEL = os.getenv("BRD_SECTION_PARALLEL", "false").lower() == "true"
+# Reconcile terminology, IDs and contradictions across the parallel sections
+SECTION_CONSISTENCY = os.getenv("BRD_SECTION_CONSISTENCY", "true").lower() == "true"
+# Refine only the sections the critic flags, stopping once nothing changes
+SECTION_REFINEMENT = os.getenv("BRD_SECTION_REFINEMENT", "false").lower() == "true"
+
+
+def get_event_callback(
+    config: Optional[RunnableConfig],
+) -> Optional[Callable[[Dict[str, Any]], None]]:
+    """Progress callback passed by streaming callers through config["configurable"]."""
+    return ((config or {}).get("configurable") or {}).get("on_event")
+
+
+def _generate_token_callback(config: Optional[RunnableConfig]):
+    on_event = get_event_callback(config)
+    if on_event is None:
+        return None
+    return lambda sample, token: on_event(
+        {"event": "token", "stage": "generate", "sample": sample, "content": token}
+    )
+
+
+def _refine_token_callback(config: Optional[RunnableConfig], iteration: int):
+    on_event = get_event_callback(config)
+    if on_event is None:
+        return None
+    return lambda token: on_event(
+        {"event": "token", "stage": "refine", "iteration": iteration, "content": token}
+    )
+
+
+def _prompt_assessment(state: BRDState) -> str:
+    return state.get("assessment_digest") or state["assessment_text"]
+
+
+def _generation_context(state: BRDState) -> Optional[str]:
+    """Retrieved context plus the external tool result, whichever are available."""
+    parts = [state.get("rag_result")]
+    if state.get("tool_result"):
+        parts.append(f"External research:\n{state['tool_result']}")
+    return "\n\n".join(p for p in parts if p) or None
+
+
+def _log_generation(result: ConsistencyMetrics) -> None:
+    if result.section_requests:
+        print(f"brd assembled from {result.section_requests} section requests")
+    else:
+        print(f"brd generated from {result.samples_used} samples")
 
 
 class BRDGraphNode:
-    def __init__(self, brd_generator: BRDGenerator):
+    def __init__(self, brd_generator: BRDGenerator, section_refinement: bool = False):
         self.brd_generator = brd_generator
+        self.section_refinement = section_refinement
+        self.brdrag = BRDRAG()
 
-    def generate_brd(self, state: BRDState) -> BRDState:
+    def generate_brd(
+        self, state: BRDState, config: Optional[RunnableConfig] = None
+    ) -> BRDState:
         print("Enter into generate_brd")
         try:
             brd_initial_content = self.brd_generator.generate_brd(
-                assessment_text=state["assessment_text"],
-                rag_results=state["rag_result"],
+                assessment_text=_prompt_assessment(state),
+                rag_results=_generation_context(state),
                 save_prompt=False,
+                on_token=_generate_token_callback(config),
             )
 
             state["brd_content"] = brd_initial_content.selected_brd
-            print("brd generated")
+            _log_generation(brd_initial_content)
             return {
                 "assessment_text": state["assessment_text"],
                 "brd_content": brd_initial_content.selected_brd,
@@ -49,13 +125,24 @@ class BRDGraphNode:
                 "rag_result": state["rag_result"],
             }
 
-    def refine_brd(self, state: BRDState) -> BRDState:
+    def refine_brd(
+        self, state: BRDState, config: Optional[RunnableConfig] = None
+    ) -> BRDState:
         print("Enter into refine_brd")
         try:
             brd_revisor = BRDRevisor(
-                self.brd_generator, state["brd_content"], state["assessment_text"]
+                self.brd_generator, state["brd_content"], _prompt_assessment(state)
             )
-            brd_revised_content = brd_revisor.refine_brd()
+            on_token = _refine_token_callback(config, state["iteration_count"])
+            if state.get("user_feedback"):
+                # A feedback round is a single whole-document revision
+                brd_revised_content = brd_revisor.refine_brd(
+                    on_token, feedback=state["user_feedback"]
+                )
+            elif self.section_refinement:
+                brd_revised_content = brd_revisor.refine_sections(on_token)
+            else:
+                brd_revised_content = brd_revisor.refine_brd(on_token)
             state["brd_content"] = brd_revised_content
             print("BRD refined")
             return {
@@ -63,6 +150,7 @@ class BRDGraphNode:
                 "brd_content": brd_revised_content,
                 "iteration_count": state["iteration_count"] + 1,
                 "rag_result": state["rag_result"],
+                "refinement_converged": brd_revisor.converged,
             }
         except Exception as e:
             print(e)
@@ -73,6 +161,19 @@ class BRDGraphNode:
                 "rag_result": state["rag_result"],
             }
 
+    def condense_assessment(self, state: BRDState) -> BRDState:
+        print("Enter into condense_assessment")
+        try:
+            digest = self.brd_generator.fit_assessment(
+                state["assessment_text"], _generation_context(state)
+            )
+        except Exception as e:
+            print(e)
+            digest = None
+        if digest == state["assessment_text"]:
+            digest = None
+        return {"assessment_digest": digest}
+
     def save_brd(self, state: BRDState) -> BRDState:
         print("Enter into save_brd")
         try:
@@ -87,72 +188,198 @@ class BRDGraphNode:
             print(e)
             return state
 
+    # Retrieval and tool search run as parallel branches, so each returns only the key
+    # it owns; writing any shared key from both branches in one step is an error.
+
     def exec_tool_brd(self, state: BRDState) -> BRDState:
         print("Enter into exec_tool_brd")
         try:
-            brdtool = BRDExternalTool()  # TODO Sample Tool. Replace with actual tool
-            brd_content_tool = brdtool.search()
-            updated_brd = state["brd_content"] + brd_content_tool
-            print("BRD updated with external tool")
-            return {
-                "assessment_text": state["assessment_text"],
-                "brd_content": updated_brd,
-                "iteration_count": state["iteration_count"],
-                "rag_result": state["rag_result"],
-            }
-            return state
+            results = get_external_tool().search_many(
+                assessment_queries(state["assessment_text"])
+            )
+            print("Fetched external tool results")
+            return {"tool_result": format_tool_results(results)}
         except Exception as e:
             print(e)
-            return state
+            return {"tool_result": None}
 
     def retrieve_vector(self, state: BRDState) -> BRDState:
         print("Enter into retrieve_vector")
 
         try:
-            brdrag = BRDRAG()
-            result = brdrag.getResponse(
+            result = self.brdrag.getResponse(
                 state["assessment_text"], "What is the purpose of the assessment?"
             )
-            state["rag_result"] = result
             print("Retrieved vector from RAG")
+            return {"rag_result": result}
+        except Exception as e:
+            print(e)
+            return {"rag_result": None}
+
+    # Async variants used by the API: LLM calls are awaited on the event loop and the
+    # blocking local work (vector search, tool lookup, docx writing) runs in a thread.
+
+    async def agenerate_brd(
+        self, state: BRDState, config: Optional[RunnableConfig] = None
+    ) -> BRDState:
+        print("Enter into agenerate_brd")
+        try:
+            brd_initial_content = await self.brd_generator.agenerate_brd(
+                assessment_text=_prompt_assessment(state),
+                rag_results=_generation_context(state),
+                save_prompt=False,
+                on_token=_generate_token_callback(config),
+            )
+            _log_generation(brd_initial_content)
             return {
                 "assessment_text": state["assessment_text"],
-                "brd_content": state["brd_content"],
+                "brd_content": brd_initial_content.selected_brd,
+                "iteration_count": 0,
+                "rag_result": state["rag_result"],
+            }
+        except Exception as e:
+            print(e)
+            return {
+                "assessment_text": state["assessment_text"],
+                "brd_content": None,
+                "iteration_count": 0,
+                "rag_result": state["rag_result"],
+            }
+
+    async def arefine_brd(
+        self, state: BRDState, config: Optional[RunnableConfig] = None
+    ) -> BRDState:
+        print("Enter into arefine_brd")
+        try:
+            brd_revisor = BRDRevisor(
+                self.brd_generator, state["brd_content"], _prompt_assessment(state)
+            )
+            on_token = _refine_token_callback(config, state["iteration_count"])
+            if state.get("user_feedback"):
+                brd_revised_content = await brd_revisor.arefine_brd(
+                    on_token, feedback=state["user_feedback"]
+                )
+            elif self.section_refinement:
+                brd_revised_content = await brd_revisor.arefine_sections(on_token)
+            else:
+                brd_revised_content = await brd_revisor.arefine_brd(on_token)
+            print("BRD refined")
+            return {
+                "assessment_text": state["assessment_text"],
+                "brd_content": brd_revised_content,
+                "iteration_count": state["iteration_count"] + 1,
+                "rag_result": state["rag_result"],
+                "refinement_converged": brd_revisor.converged,
+            }
+        except Exception as e:
+            print(e)
+            return {
+                "assessment_text": state["assessment_text"],
+                "brd_content": None,
                 "iteration_count": state["iteration_count"],
-                "rag_result": result,
+                "rag_result": state["rag_result"],
             }
-            return state
+
+    async def acondense_assessment(self, state: BRDState) -> BRDState:
+        print("Enter into acondense_assessment")
+        try:
+            digest = await self.brd_generator.afit_assessment(
+                state["assessment_text"], _generation_context(state)
+            )
         except Exception as e:
             print(e)
-            return state
+            digest = None
+        if digest == state["assessment_text"]:
+            digest = None
+        return {"assessment_digest": digest}
 
+    async def asave_brd(self, state: BRDState) -> BRDState:
+        return await asyncio.to_thread(self.save_brd, state)
 
-def create_brd_workflow() -> StateGraph:
+    async def aexec_tool_brd(self, state: BRDState) -> BRDState:
+        print("Enter into aexec_tool_brd")
+        try:
+            results = await get_external_tool().asearch_many(
+                assessment_queries(state["assessment_text"])
+            )
+            return {"tool_result": format_tool_results(results)}
+        except Exception as e:
+            print(e)
+            return {"tool_result": None}
+
+    async def aretrieve_vector(self, state: BRDState) -> BRDState:
+        return await asyncio.to_thread(self.retrieve_vector, state)
+
+
+def create_brd_workflow(
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+    use_async: bool = False,
+    parallel_context: bool = True,
+) -> StateGraph:
+    """
+    Build the BRD graph. With parallel_context (the default) retrieval and the external
+    tool lookup fan out from the entry point and fan back in before generation; without
+    it they run one after the other, which is kept for benchmarking the two topologies.
+    """
     # Initialize components
-    brd_generator = BRDGenerator(api_key=os.getenv("MISTRAL_API"), model=MODEL)
-    node = BRDGraphNode(brd_generator)
+    brd_generator = BRDGenerator(
+        api_key=os.getenv("MISTRAL_API"),
+        model=model,
+        adaptive_sampling=ADAPTIVE_SAMPLING,
+        max_samples=MAX_SAMPLES,
+        section_parallel=SECTION_PARALLEL,
+        section_consistency=SECTION_CONSISTENCY,
+    )
+    node = BRDGraphNode(brd_generator, section_refinement=SECTION_REFINEMENT)
 
     # Create workflow
     workflow = StateGraph(BRDState)
 
-    # Add nodes
-    workflow.add_node("retrieve_vector", node.retrieve_vector)
-    workflow.add_node("initial_brd_with_self_consistency", node.generate_brd)
-    workflow.add_node("execute_tools", node.exec_tool_brd)
-    workflow.add_node("self_reflect_brd", node.refine_brd)
-    workflow.add_node("save_final_brd", node.save_brd)
-
-    # Set entry point
-    workflow.set_entry_point("retrieve_vector")
+    # Add nodes, each timed for /metrics and the task's own metrics
+    if use_async:
+        nodes = {
+            "retrieve_vector": node.aretrieve_vector,
+            "condense_assessment": node.acondense_assessment,
+            "initial_brd_with_self_consistency": node.agenerate_brd,
+            "execute_tools": node.aexec_tool_brd,
+            "self_reflect_brd": node.arefine_brd,
+            "save_final_brd": node.asave_brd,
+        }
+    else:
+        nodes = {
+            "retrieve_vector": node.retrieve_vector,
+            "condense_assessment": node.condense_assessment,
+            "initial_brd_with_self_consistency": node.generate_brd,
+            "execute_tools": node.exec_tool_brd,
+            "self_reflect_brd": node.refine_brd,
+            "save_final_brd": node.save_brd,
+        }
+    for name, fn in nodes.items():
+        workflow.add_node(name, timed_node(name, fn))
+
+    # Gather context: retrieval and tool search are independent I/O
+    if parallel_context:
+        workflow.add_edge(START, "retrieve_vector")
+        workflow.add_edge(START, "execute_tools")
+        workflow.add_edge(["retrieve_vector", "execute_tools"], "condense_assessment")
+    else:
+        workflow.set_entry_point("retrieve_vector")
+        workflow.add_edge("retrieve_vector", "execute_tools")
+        workflow.add_edge("execute_tools", "condense_assessment")
 
     # Add edges
-    workflow.add_edge("retrieve_vector", "initial_brd_with_self_consistency")
-    workflow.add_edge("initial_brd_with_self_consistency", "execute_tools")
-    workflow.add_edge("execute_tools", "self_reflect_brd")
+    workflow.add_edge("condense_assessment", "initial_brd_with_self_consistency")
+    workflow.add_edge("initial_brd_with_self_consistency", "self_reflect_brd")
 
     # Define conditional edges for refine_brd
     def route_refinement(state: BRDState) -> str:
-        if state["iteration_count"] < MAX_ITERATIONS:
+        if state.get("user_feedback"):
+            return "refinement_complete"
+        if state.get("refinement_converged"):
+            print("Refinement converged, skipping remaining iterations")
+            return "refinement_complete"
+        if state["iteration_count"] < max_iterations:
             return "continue_refinement"
         return "refinement_complete"
 
@@ -170,55 +397,382 @@ def create_brd_workflow() -> StateGraph:
     return workflow
 
 
-def initiate_workflow(
-    assessment_text,  # This may be a list of strings if multiple assessment contents are provided
-    user_feedback: Optional[str] = None,  # This will be needed for human in the loop
-    brd_content: Optional[str] = None,
-):
-    print("Initiating BRD workflow")
-    workflow = create_brd_workflow()
-    app = workflow.compile()
+class BRDWorkflowRegistry:
+    """
+    Process-wide cache of compiled BRD workflows.
 
-    # Generate workflow diagram
-    image_bytes = app.get_graph().draw_mermaid_png()
-    image = Image.open(io.BytesIO(image_bytes))
-    image.save("brd_workflow.png")
+    Building a workflow creates a BRDGenerator (and its Mistral client) and compiles the
+    LangGraph, so each (model, max_iterations, use_async, checkpointed) combination is
+    compiled once and shared by every request. Access is guarded by a lock so concurrent
+    requests never compile twice. Checkpointed workflows persist their state per thread
+    ID; the async saver is tied to an event loop, so those are rebuilt if it changes.
+    """
 
-    # assessment_text = Utility.extract_text(assessment_file.name)
+    def __init__(self) -> None:
+        self._workflows = {}
+        self._lock = threading.Lock()
 
-    initial_state = {
-        "assessment_text": assessment_text,
+    @staticmethod
+    def _usable(app, use_async: bool) -> bool:
+        # Only the async SQLite saver is bound to the event loop it was created on
+        loop = getattr(getattr(app, "checkpointer", None), "loop", None)
+        if not use_async or loop is None:
+            return True
+        try:
+            return loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+
+    def get(
+        self,
+        model: str = MODEL,
+        max_iterations: int = MAX_ITERATIONS,
+        use_async: bool = False,
+        checkpointed: bool = False,
+    ):
+        """
+        Return the compiled workflow for the given config, compiling it on first use.
+        Async checkpointed workflows are fetched with aget, which replaces a saver
+        bound to an earlier event loop.
+        """
+        key = (model, max_iterations, use_async, checkpointed)
+        app = self._workflows.get(key)
+        if app is None:
+            with self._lock:
+                app = self._workflows.get(key)
+                if app is None:
+                    print(f"Compiling BRD workflow for {key}")
+                    checkpointer = (
+                        create_checkpointer(use_async) if checkpointed else None
+                    )
+                    app = create_brd_workflow(model, max_iterations, use_async).compile(
+                        checkpointer=checkpointer
+                    )
+                    self._workflows[key] = app
+        return app
+
+    async def aget(
+        self,
+        model: str = MODEL,
+        max_iterations: int = MAX_ITERATIONS,
+        checkpointed: bool = False,
+    ):
+        """Async-graph variant of get, for use on the event loop that runs the graph."""
+        key = (model, max_iterations, True, checkpointed)
+        app = self._workflows.get(key)
+        if app is not None and not self._usable(app, True):
+            with self._lock:
+                stale = self._workflows.get(key)
+                if stale is app:
+                    del self._workflows[key]
+            if stale is app:
+                # Closed on this loop: the saver's own loop may be gone already
+                await aclose_checkpointer(app.checkpointer)
+        return self.get(model, max_iterations, True, checkpointed)
+
+    def warm(
+        self,
+        model: str = MODEL,
+        max_iterations: int = MAX_ITERATIONS,
+        use_async: bool = False,
+        checkpointed: bool = False,
+    ) -> None:
+        """Compile the workflow ahead of the first request (called at startup)."""
+        self.get(model, max_iterations, use_async, checkpointed)
+
+    async def aclear(self) -> None:
+        """Drop the compiled workflows and close their checkpoint connections."""
+        with self._lock:
+            apps = list(self._workflows.values())
+            self._workflows.clear()
+        for app in apps:
+            await aclose_checkpointer(getattr(app, "checkpointer", None))
+
+    def clear(self) -> None:
+        """Sync variant of aclear, for callers outside an event loop."""
+        asyncio.run(self.aclear())
+
+
+workflow_registry = BRDWorkflowRegistry()
+
+
+def export_workflow_diagram(
+    output_path: str = "brd_workflow.png",
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+) -> str:
+    """Render the compiled workflow as a Mermaid PNG. Admin/CLI use only."""
+    app = workflow_registry.get(model, max_iterations)
+    image_bytes = app.get_graph().draw_mermaid_png()
+    image = Image.open(io.BytesIO(image_bytes))
+    image.save(output_path)
+    return output_path
+
+
+def prepare_assessment(
+    assessment_text: Union[str, Sequence[str]],
+    document_names: Optional[Sequence[str]] = None,
+) -> str:
+    """Merge several documents into one text, dropping cross-document duplicates."""
+    if isinstance(assessment_text, str):
+        return assessment_text
+    texts = list(assessment_text)
+    if len(texts) == 1:
+        return texts[0]
+    merged, stats = merge_documents(texts, document_names)
+    observe_dedup(stats.as_dict())
+    return merged
+
+
+def initial_state(
+    assessment_text: Union[str, Sequence[str]],
+    user_feedback: Optional[str] = None,
+    brd_content: Optional[str] = None,
+    document_names: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    return {
+        "assessment_text": prepare_assessment(assessment_text, document_names),
         "brd_content": brd_content,
         "iteration_count": 0,
         "user_feedback": user_feedback,
     }
 
-    result = app.invoke(initial_state)
+
+def _progress_event(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    # "tasks" stream chunks carry "result" once the node has finished
+    event = "node_completed" if "result" in chunk else "node_started"
+    return {"event": event, "node": chunk["name"]}
+
+
+def _completed_event(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "event": "completed",
+        "brd_content": result.get("brd_content"),
+        "brd_file_path": result.get("brd_file_path"),
+    }
+
+
+def initiate_workflow(
+    assessment_text,  # A list of strings when several assessment documents are provided
+    user_feedback: Optional[str] = None,  # This will be needed for human in the loop
+    brd_content: Optional[str] = None,
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+    document_names: Optional[Sequence[str]] = None,
+    thread_id: Optional[str] = None,
+):
+    """
+    Run the workflow. With a thread_id the final state is checkpointed so that
+    refine_with_feedback can resume from it later; the per-node checkpoints written
+    on the way are dropped once the run finishes.
+    """
+    print("Initiating BRD workflow")
+    app = workflow_registry.get(model, max_iterations, checkpointed=bool(thread_id))
+
+    state = initial_state(assessment_text, user_feedback, brd_content, document_names)
+    if thread_id:
+        result = app.invoke(
+            state, thread_config(thread_id), durability=CHECKPOINT_DURABILITY
+        )
+        compact_thread(app.checkpointer, thread_id)
+    else:
+        result = app.invoke(state)
     print("BRD workflow completed")
     return result["brd_content"], result["brd_file_path"]
 
 
-"""
-# Example usage
-if __name__ == "__main__":
-    workflow = create_brd_workflow()
-    app = workflow.compile()
+async def ainitiate_workflow(
+    assessment_text,
+    user_feedback: Optional[str] = None,
+    brd_content: Optional[str] = None,
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+    document_names: Optional[Sequence[str]] = None,
+    thread_id: Optional[str] = None,
+):
+    """Async variant of initiate_workflow, running the async graph nodes via ainvoke."""
+    print("Initiating BRD workflow (async)")
+    app = await workflow_registry.aget(
+        model, max_iterations, checkpointed=bool(thread_id)
+    )
 
-    # Generate workflow diagram
-    image_bytes = app.get_graph().draw_mermaid_png()
-    image = Image.open(io.BytesIO(image_bytes))
-    image.save("brd_workflow.png")
+    state = initial_state(assessment_text, user_feedback, brd_content, document_names)
+    if thread_id:
+        result = await app.ainvoke(
+            state, thread_config(thread_id), durability=CHECKPOINT_DURABILITY
+        )
+        await acompact_thread(app.checkpointer, thread_id)
+    else:
+        result = await app.ainvoke(state)
+    print("BRD workflow completed")
+    return result["brd_content"], result["brd_file_path"]
 
-    assessment_text = Utility.extract_text(
-        "new_assessment.pdf"
-    )  # Sample assessment file
 
-    initial_state = {
-        "assessment_text": assessment_text,
-        "brd_content": None,
-        "iteration_count": 0,
-    }
+class CheckpointNotFoundError(Exception):
+    """Raised when there is no stored workflow state to resume for a thread ID."""
+
+
+def _feedback_update(feedback: str) -> Dict[str, Any]:
+    return {"user_feedback": feedback, "refinement_converged": False}
+
+
+# Resuming "after" the generation node makes self_reflect_brd the next step; with
+# user_feedback set it runs once and the graph goes straight to save_final_brd.
+_RESUME_AFTER = "initial_brd_with_self_consistency"
+
+
+def refine_with_feedback(
+    thread_id: str,
+    feedback: str,
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+):
+    """
+    Apply reviewer feedback to a checkpointed BRD: resumes the stored state at the
+    refinement node, so retrieval, generation and sampling are not repeated.
+    """
+    print("Refining BRD with feedback")
+    app = workflow_registry.get(model, max_iterations, checkpointed=True)
+    config = thread_config(thread_id)
+    previous = app.get_state(config).values.get("brd_content")
+    if not previous:
+        raise CheckpointNotFoundError(f"No stored BRD for {thread_id}")
+
+    app.update_state(config, _feedback_update(feedback), as_node=_RESUME_AFTER)
+    result = app.invoke(None, config, durability=CHECKPOINT_DURABILITY)
+    if not result.get("brd_content"):
+        # Keep the last good BRD so the next round can still resume from it
+        app.update_state(config, {"brd_content": previous}, as_node="save_final_brd")
+        raise RuntimeError("BRD refinement with feedback failed")
+    compact_thread(app.checkpointer, thread_id)
+    print("BRD feedback round completed")
+    return result["brd_content"], result["brd_file_path"]
+
+
+async def arefine_with_feedback(
+    thread_id: str,
+    feedback: str,
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+):
+    """Async variant of refine_with_feedback."""
+    print("Refining BRD with feedback (async)")
+    app = await workflow_registry.aget(model, max_iterations, checkpointed=True)
+    config = thread_config(thread_id)
+    previous = (await app.aget_state(config)).values.get("brd_content")
+    if not previous:
+        raise CheckpointNotFoundError(f"No stored BRD for {thread_id}")
+
+    await app.aupdate_state(config, _feedback_update(feedback), as_node=_RESUME_AFTER)
+    result = await app.ainvoke(None, config, durability=CHECKPOINT_DURABILITY)
+    if not result.get("brd_content"):
+        await app.aupdate_state(
+            config, {"brd_content": previous}, as_node="save_final_brd"
+        )
+        raise RuntimeError("BRD refinement with feedback failed")
+    await acompact_thread(app.checkpointer, thread_id)
+    print("BRD feedback round completed")
+    return result["brd_content"], result["brd_file_path"]
+
+
+async def aresume_workflow(
+    thread_id: str,
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+):
+    """
+    Continue an interrupted run (initial or feedback round) from its last checkpointed
+    node; nodes that already finished, such as the self-consistency samples, are not
+    executed again.
+    """
+    app = await workflow_registry.aget(model, max_iterations, checkpointed=True)
+    config = thread_config(thread_id)
+    snapshot = await app.aget_state(config)
+    if not snapshot.values:
+        raise CheckpointNotFoundError(f"No stored workflow state for {thread_id}")
+
+    if snapshot.next:
+        print(f"Resuming BRD workflow at {', '.join(snapshot.next)}")
+        result = await app.ainvoke(None, config, durability=CHECKPOINT_DURABILITY)
+    else:
+        # The run finished, but the worker died before recording the result
+        result = snapshot.values
+    if not result.get("brd_content"):
+        raise RuntimeError("Resumed BRD workflow produced no content")
+    await acompact_thread(app.checkpointer, thread_id)
+    print("BRD workflow resumed and completed")
+    return result["brd_content"], result.get("brd_file_path")
+
+
+def stream_workflow(
+    assessment_text,
+    on_event: Callable[[Dict[str, Any]], None],
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+):
+    """
+    Run the workflow, reporting progress to on_event as it happens.
+
+    Emits node_started/node_completed events for every graph node, token events while
+    the BRD is generated and refined, and a final completed event with the result.
+    on_event may be called from worker threads.
+    """
+    print("Initiating streaming BRD workflow")
+    app = workflow_registry.get(model, max_iterations)
+
+    result = initial_state(assessment_text)
+    for mode, chunk in app.stream(
+        result,
+        {"configurable": {"on_event": on_event}},
+        stream_mode=["tasks", "values"],
+    ):
+        if mode == "values":
+            result = chunk
+        else:
+            on_event(_progress_event(chunk))
+
+    print("BRD workflow completed")
+    on_event(_completed_event(result))
+    return result.get("brd_content"), result.get("brd_file_path")
+
+
+async def astream_workflow(
+    assessment_text,
+    on_event: Callable[[Dict[str, Any]], None],
+    model: str = MODEL,
+    max_iterations: int = MAX_ITERATIONS,
+):
+    """Async variant of stream_workflow, running the async graph nodes via astream."""
+    print("Initiating streaming BRD workflow (async)")
+    app = workflow_registry.get(model, max_iterations, use_async=True)
+
+    result = initial_state(assessment_text)
+    async for mode, chunk in app.astream(
+        result,
+        {"configurable": {"on_event": on_event}},
+        stream_mode=["tasks", "values"],
+    ):
+        if mode == "values":
+            result = chunk
+        else:
+            on_event(_progress_event(chunk))
 
-    result = app.invoke(initial_state)
     print("BRD workflow completed")
-"""
+    on_event(_completed_event(result))
+    return result.get("brd_content"), result.get("brd_file_path")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BRD workflow utilities")
+    parser.add_argument(
+        "--diagram",
+        metavar="PATH",
+        default="brd_workflow.png",
+        help="Export the workflow diagram as a PNG (default: brd_workflow.png)",
+    )
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    args = parser.parse_args()
+
+    path = export_workflow_diagram(args.diagram, args.model, args.max_iterations)
+    print(f"Workflow diagram saved at: {path}")
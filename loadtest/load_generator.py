@@ -0,0 +1,231 @@
+"""
+Drive /api/v1/generateBRD + /checkTaskStatus at a target arrival rate and report
+throughput, job completion-time percentiles and memory per pod.
+
+Usage:
+    python -m loadtest.load_generator --target http://localhost:8001 --rate 0.5 \
+        --duration 120 [--pod http://pod-a:8001 --pod http://pod-b:8001] [--json out.json]
+
+Memory is read from process_resident_memory_bytes on each pod's /metrics endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from benchmarks.fixtures import write_synthetic_pdf
+
+_RSS_RE = re.compile(r"^process_resident_memory_bytes\s+(\S+)$", re.MULTILINE)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class JobResult:
+    status: str  # completed, failed, rejected, error, timeout
+    submitted_at: float
+    finished_at: Optional[float] = None
+    wait_seconds: Optional[float] = None
+
+    @property
+    def completion_seconds(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+
+@dataclass
+class MemorySamples:
+    samples: Dict[str, List[float]] = field(default_factory=dict)
+
+    def add(self, pod: str, rss_bytes: float) -> None:
+        self.samples.setdefault(pod, []).append(rss_bytes)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            pod: {
+                "max_mb": max(values) / 2**20,
+                "mean_mb": sum(values) / len(values) / 2**20,
+                "samples": len(values),
+            }
+            for pod, values in self.samples.items()
+        }
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        target: str,
+        upload: bytes,
+        rate: float,
+        duration: float,
+        arrival: str = "poisson",
+        poll_interval: float = 1.0,
+        job_timeout: float = 900.0,
+        pods: Optional[List[str]] = None,
+        seed: int = 0,
+    ) -> None:
+        self.target = target.rstrip("/")
+        self.upload = upload
+        self.rate = rate
+        self.duration = duration
+        self.arrival = arrival
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.pods = [p.rstrip("/") for p in (pods or [target])]
+        self._rng = random.Random(seed)
+        self.results: List[JobResult] = []
+        self.memory = MemorySamples()
+
+    def _interarrival(self) -> float:
+        if self.arrival == "constant":
+            return 1 / self.rate
+        return self._rng.expovariate(self.rate)
+
+    async def _job(self, client: httpx.AsyncClient) -> None:
+        submitted_at = time.monotonic()
+        result = JobResult(status="error", submitted_at=submitted_at)
+        self.results.append(result)
+        try:
+            response = await client.post(
+                f"{self.target}/api/v1/generateBRD",
+                files={"assessment_file": ("assessment.pdf", self.upload)},
+            )
+            if response.status_code == 429:
+                result.status = "rejected"
+                return
+            response.raise_for_status()
+            task_id = response.json()["task_id"]
+
+            while time.monotonic() - submitted_at < self.job_timeout:
+                await asyncio.sleep(self.poll_interval)
+                task = (
+                    await client.get(f"{self.target}/api/v1/checkTaskStatus/{task_id}")
+                ).json()
+                if task.get("status") in ("completed", "failed"):
+                    result.status = task["status"]
+                    result.finished_at = time.monotonic()
+                    result.wait_seconds = task.get("wait_seconds")
+                    return
+            result.status = "timeout"
+        except Exception as e:
+            print(f"Job error: {e}", file=sys.stderr)
+
+    async def _sample_memory(self, client: httpx.AsyncClient, stop: asyncio.Event):
+        while not stop.is_set():
+            for pod in self.pods:
+                try:
+                    text = (await client.get(f"{pod}/metrics")).text
+                    match = _RSS_RE.search(text)
+                    if match:
+                        self.memory.add(pod, float(match.group(1)))
+                except Exception as e:
+                    print(f"Metrics scrape failed for {pod}: {e}", file=sys.stderr)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> Dict[str, Any]:
+        stop = asyncio.Event()
+        async with httpx.AsyncClient(timeout=60) as client:
+            sampler = asyncio.create_task(self._sample_memory(client, stop))
+            started = time.monotonic()
+            jobs = []
+            while time.monotonic() - started < self.duration:
+                jobs.append(asyncio.create_task(self._job(client)))
+                await asyncio.sleep(self._interarrival())
+            await asyncio.gather(*jobs)
+            elapsed = time.monotonic() - started
+            stop.set()
+            await sampler
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        completion = [
+            r.completion_seconds for r in self.results if r.status == "completed"
+        ]
+        waits = [r.wait_seconds for r in self.results if r.wait_seconds is not None]
+        return {
+            "target": self.target,
+            "rate": self.rate,
+            "arrival": self.arrival,
+            "duration_seconds": self.duration,
+            "elapsed_seconds": elapsed,
+            "submitted": len(self.results),
+            "counts": counts,
+            "throughput_jobs_per_second": len(completion) / elapsed if elapsed else 0.0,
+            "completion_seconds": {
+                "p50": percentile(completion, 50),
+                "p95": percentile(completion, 95),
+                "p99": percentile(completion, 99),
+                "max": max(completion) if completion else None,
+            },
+            "queue_wait_seconds": {
+                "p50": percentile(waits, 50),
+                "p95": percentile(waits, 95),
+            },
+            "memory_per_pod": self.memory.summary(),
+        }
+
+
+def synthetic_upload(pages: int) -> bytes:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pdf(os.path.join(tmp, "assessment.pdf"), pages)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="http://localhost:8001")
+    parser.add_argument("--rate", type=float, default=0.2, help="jobs per second")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of arrivals")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--pages", type=int, default=10, help="pages in the upload")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--job-timeout", type=float, default=900.0)
+    parser.add_argument("--pod", action="append", help="pod base URL for /metrics")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(
+        args.target,
+        synthetic_upload(args.pages),
+        rate=args.rate,
+        duration=args.duration,
+        arrival=args.arrival,
+        poll_interval=args.poll_interval,
+        job_timeout=args.job_timeout,
+        pods=args.pod,
+        seed=args.seed,
+    )
+    report = asyncio.run(generator.run())
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
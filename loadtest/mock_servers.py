@@ -0,0 +1,250 @@
+"""
+Local stand-ins for the Mistral chat API and the Tavily search API.
+
+Both servers answer with realistically shaped payloads after a configurable delay and
+can inject failures, so the full BRD flow can be load tested without live APIs.
+
+Usage:
+    python -m loadtest.mock_servers mistral --port 9001 --latency lognormal:0.8:0.4 \
+        --tokens-per-second 60 --completion-tokens 900 --rate-limit-rate 0.02
+    python -m loadtest.mock_servers tavily --port 9002 --latency uniform:0.2:1.5
+
+Then start the API with MISTRAL_SERVER_URL=http://localhost:9001 and
+TAVILY_API_BASE_URL=http://localhost:9002.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request  # type: ignore
+from fastapi.responses import JSONResponse, StreamingResponse  # type: ignore
+
+_WORDS = (
+    "The system shall support requirement process integration data approval "
+    "workflow invoice customer vendor report security audit migration"
+).split()
+
+
+class LatencyDistribution:
+    """
+    Delay sampler parsed from "fixed:S", "uniform:LOW:HIGH", "normal:MEAN:STD" or
+    "lognormal:MEDIAN:SIGMA" (all in seconds; negative samples are clamped to 0).
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "fixed:0", seed: Optional[int] = None) -> None:
+        kind, *params = spec.split(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = self._rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = self._rng.gauss(p[0], p[1])
+        else:
+            value = self._rng.lognormvariate(0, p[1]) * p[0]
+        return max(value, 0.0)
+
+    def __repr__(self) -> str:
+        return ":".join([self.kind, *(f"{p:g}" for p in self.params)])
+
+
+@dataclass
+class MockConfig:
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    # LLM only: output length and generation speed
+    completion_tokens: int = 800
+    tokens_per_second: float = 0.0  # 0 = instant
+    seed: Optional[int] = None
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def _injected_failure(config: MockConfig, rng: random.Random, counters: _Counters):
+    roll = rng.random()
+    if roll < config.rate_limit_rate:
+        counters.rate_limited += 1
+        return JSONResponse(
+            status_code=429,
+            content={"message": "Requests rate limit exceeded"},
+            headers={"Retry-After": str(config.retry_after)},
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        counters.errors += 1
+        return JSONResponse(status_code=500, content={"message": "Injected error"})
+    return None
+
+
+def _prompt_tokens(body: Dict[str, Any]) -> int:
+    text = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    return max(len(text) // 4, 1)
+
+
+def create_mistral_app(config: MockConfig) -> FastAPI:
+    """Mock of POST /v1/chat/completions, streaming and non-streaming."""
+    app = FastAPI(title="Mock Mistral")
+    rng = random.Random(config.seed)
+    counters = _Counters()
+
+    def words(count: int):
+        return [rng.choice(_WORDS) for _ in range(count)]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        counters.requests += 1
+        body = await request.json()
+        failure = _injected_failure(config, rng, counters)
+        if failure is not None:
+            return failure
+
+        usage = {
+            "prompt_tokens": _prompt_tokens(body),
+            "completion_tokens": config.completion_tokens,
+            "total_tokens": _prompt_tokens(body) + config.completion_tokens,
+        }
+        base = {
+            "id": uuid.uuid4().hex,
+            "model": body.get("model", "mock"),
+            "created": int(time.time()),
+        }
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second else 0
+        await asyncio.sleep(config.latency.sample())
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * config.completion_tokens)
+            content = " ".join(words(config.completion_tokens))
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        async def events():
+            # Emit in small batches of tokens to keep the event count reasonable
+            batch = 8
+            for start in range(0, config.completion_tokens, batch):
+                count = min(batch, config.completion_tokens - start)
+                await asyncio.sleep(token_delay * count)
+                last = start + count >= config.completion_tokens
+                chunk = {
+                    **base,
+                    "object": "chat.completion.chunk",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {
+                                "role": "assistant",
+                                "content": " ".join(words(count)) + " ",
+                            },
+                            "finish_reason": "stop" if last else None,
+                        }
+                    ],
+                }
+                if last:
+                    chunk["usage"] = usage
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    def stats():
+        return counters.as_dict()
+
+    return app
+
+
+def create_tavily_app(config: MockConfig) -> FastAPI:
+    """Mock of POST /search."""
+    app = FastAPI(title="Mock Tavily")
+    rng = random.Random(config.seed)
+    counters = _Counters()
+
+    @app.post("/search")
+    async def search(request: Request):
+        counters.requests += 1
+        body = await request.json()
+        failure = _injected_failure(config, rng, counters)
+        if failure is not None:
+            return failure
+
+        delay = config.latency.sample()
+        await asyncio.sleep(delay)
+        query = body.get("query", "")
+        results = [
+            {
+                "title": f"Result {i + 1} for {query}",
+                "url": f"https://example.com/{i + 1}",
+                "content": f"{query}: " + " ".join(rng.choice(_WORDS) for _ in range(50)),
+                "score": round(1 - i * 0.1, 2),
+            }
+            for i in range(body.get("max_results") or 5)
+        ]
+        return {"query": query, "results": results, "response_time": round(delay, 3)}
+
+    @app.get("/stats")
+    def stats():
+        return counters.as_dict()
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn  # type: ignore
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("service", choices=["mistral", "tavily"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. lognormal:0.8:0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--completion-tokens", type=int, default=800)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=LatencyDistribution(args.latency, args.seed),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        completion_tokens=args.completion_tokens,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    )
+    factory = create_mistral_app if args.service == "mistral" else create_tavily_app
+    uvicorn.run(factory(config), host=args.host, port=args.port, log_level="warning")
@@ -5,17 +5,46 @@ file = Path(__file__).resolve()
 parent, root = file.parent, file.parents[1]
 sys.path.append(str(root))
 
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import APIRouter, FastAPI, Request  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
-from fastapi.responses import HTMLResponse  # type: ignore
+from fastapi.responses import HTMLResponse, JSONResponse, Response  # type: ignore
 
-from api import api_router
+from api import api_router, job_queue, lease_keeper, task_recovery
+from brdgen.brd_embedding import embedding_provider
+from brdgen.brd_metrics import render_metrics
+from brdgen.brd_workflow import workflow_registry
 from config import settings
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the BRD workflow once per process instead of once per request
+    try:
+        workflow_registry.warm(use_async=True)
+        workflow_registry.warm(use_async=True, checkpointed=True)
+    except Exception as e:
+        print(f"Failed to warm BRD workflow: {e}")
+    # Load the embedding model off the event loop; /ready fails until it is warm
+    embedding_provider.preload_in_background()
+    job_queue.start()
+    # Heartbeat this worker's task leases and resume tasks orphaned by dead workers
+    lease_keeper.start()
+    task_recovery.start()
+    yield
+    await task_recovery.stop()
+    await job_queue.stop()
+    # Interrupted jobs are handed back at once instead of after the lease times out
+    await lease_keeper.stop()
+    await workflow_registry.aclear()
+
+
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 root_router = APIRouter()
@@ -38,6 +67,27 @@ def index(request: Request) -> Any:
     return HTMLResponse(content=body)
 
 
+@root_router.get("/health")
+def health() -> Any:
+    """Liveness probe."""
+    return {"status": "ok"}
+
+
+@root_router.get("/ready")
+def ready() -> Any:
+    """Readiness probe: only passes once the embedding model is warm."""
+    if not embedding_provider.is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
+
+
+@root_router.get("/metrics")
+def metrics() -> Any:
+    """Prometheus scrape endpoint."""
+    data, content_type = render_metrics()
+    return Response(content=data, media_type=content_type)
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(root_router)
 
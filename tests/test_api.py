@@ -0,0 +1,350 @@
+import asyncio
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import api
+import brdgen.brd_workflow as brd_workflow
+from brdgen.brd_metrics import observe_llm_call
+from fastapi import FastAPI  # type: ignore
+from fastapi.testclient import TestClient  # type: ignore
+
+app = FastAPI()
+app.include_router(api.api_router, prefix="/api/v1")
+
+
+def test_generate_brd_stream_emits_progress_events(monkeypatch):
+    async def fake_stream_workflow(assessment_text, on_event):
+        on_event({"event": "node_started", "node": "retrieve_vector"})
+        on_event({"event": "token", "stage": "generate", "sample": 0, "content": "BRD"})
+        on_event({"event": "completed", "brd_content": "BRD", "brd_file_path": None})
+
+    monkeypatch.setattr(
+        api.Utility,
+        "extract_text_with_stats",
+        lambda path: ("assessment", {"file_type": "pdf", "pages": 1, "seconds": 0.0}),
+    )
+    monkeypatch.setattr(api, "astream_workflow", fake_stream_workflow)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD/stream",
+            files={"assessment_file": ("assessment.pdf", b"%PDF-1.4")},
+        )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.splitlines() if line.startswith("event:")]
+    assert events == ["event: node_started", "event: token", "event: completed"]
+
+
+def test_generate_brd_returns_429_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(api, "job_queue", api.BRDJobQueue(workers=1, max_depth=0))
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD",
+            files={"assessment_file": ("assessment.pdf", b"%PDF-1.4")},
+        )
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_generate_brd_rejects_oversized_upload(monkeypatch):
+    monkeypatch.setattr(api, "MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(api, "UPLOAD_CHUNK_BYTES", 256)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD",
+            files={"assessment_file": ("assessment.pdf", b"x" * 4096)},
+        )
+
+    assert response.status_code == 413
+
+
+def test_background_job_attaches_metrics_to_task_record(monkeypatch, tmp_path):
+    upload = tmp_path / "assessment.pdf"
+    upload.write_bytes(b"%PDF-1.4")
+
+    monkeypatch.setattr(
+        api.Utility,
+        "extract_text_with_stats",
+        lambda path: ("assessment", {"file_type": "pdf", "pages": 3, "seconds": 0.2}),
+    )
+
+    async def fake_workflow(assessment_text, thread_id=None):
+        usage = {"prompt_tokens": 10, "completion_tokens": 4}
+        observe_llm_call("generate", "test", 1.5, usage)
+        return "BRD", "brd.docx"
+
+    monkeypatch.setattr(api, "ainitiate_workflow", fake_workflow)
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+
+    asyncio.run(api.initiate_workflow_background(str(upload), "task-1", 0.0))
+
+    with TestClient(app) as client:
+        task = client.get("/api/v1/checkTaskStatus/task-1").json()
+
+    assert task["status"] == "completed"
+    assert task["metrics"]["extraction"] == {
+        "file_type": "pdf",
+        "pages": 3,
+        "seconds": 0.2,
+        "cached": False,
+    }
+    assert task["metrics"]["llm"]["generate"]["prompt_tokens"] == 10
+
+
+def test_batch_endpoint_reports_items_and_serves_zip(monkeypatch, tmp_path):
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+    monkeypatch.setattr(api, "job_queue", api.BRDJobQueue(workers=1, max_depth=5))
+    monkeypatch.setattr(
+        api, "batch_zip_path", lambda batch_id: str(tmp_path / f"{batch_id}.zip")
+    )
+
+    async def fake_run(self, items):
+        for item in items:
+            item.status, item.brd_content = "completed", f"BRD {item.filename}"
+        return items
+
+    monkeypatch.setattr(api.BRDBatchRunner, "run", fake_run)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD/batch",
+            files=[
+                ("assessment_files", ("a.pdf", b"%PDF-1.4")),
+                ("assessment_files", ("b.pdf", b"%PDF-1.4")),
+            ],
+        )
+        batch_id = response.json()["batch_id"]
+        assert [i["filename"] for i in response.json()["items"]] == ["a.pdf", "b.pdf"]
+
+        for _ in range(50):
+            batch = client.get(f"/api/v1/checkBatchStatus/{batch_id}").json()
+            if batch["status"] == "completed":
+                break
+            time.sleep(0.05)
+
+        result = client.get(f"/api/v1/batchResult/{batch_id}")
+
+    assert batch["counts"] == {"completed": 2}
+    assert result.headers["content-type"] == "application/zip"
+    assert result.content[:2] == b"PK"
+
+
+def test_batch_endpoint_limits_total_upload_size(monkeypatch):
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+    monkeypatch.setattr(api, "BATCH_MAX_BYTES", 1024)
+    saved = []
+    save_upload = api.save_upload
+
+    async def tracking_save_upload(upload, max_bytes=None):
+        saved.append(await save_upload(upload, max_bytes))
+        return saved[-1]
+
+    monkeypatch.setattr(api, "save_upload", tracking_save_upload)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD/batch",
+            files=[
+                ("assessment_files", ("a.pdf", b"x" * 700)),
+                ("assessment_files", ("b.pdf", b"x" * 700)),
+            ],
+        )
+
+    assert response.status_code == 413
+    assert "per request" in response.json()["detail"]
+    assert len(saved) == 1 and not os.path.exists(saved[0])
+
+
+def test_background_job_merges_multiple_documents(monkeypatch, tmp_path):
+    paths = []
+    for name in ("a.pdf", "b.pdf"):
+        upload = tmp_path / name
+        upload.write_bytes(b"%PDF-1.4")
+        paths.append(str(upload))
+
+    shared = "The legacy SAP system exports invoices nightly to the data warehouse."
+    texts = {paths[0]: f"{shared} Approvals take two days.", paths[1]: shared}
+    monkeypatch.setattr(
+        api.Utility,
+        "extract_text_with_stats",
+        lambda path: (texts[path], {"file_type": "pdf", "pages": 2, "seconds": 0.1}),
+    )
+
+    async def fake_workflow(assessment_text, document_names=None, thread_id=None):
+        merged = brd_workflow.initial_state(assessment_text, document_names=document_names)
+        return merged["assessment_text"], "brd.docx"
+
+    monkeypatch.setattr(api, "ainitiate_workflow", fake_workflow)
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+
+    asyncio.run(
+        api.initiate_workflow_background(paths, "task-2", 0.0, ["a.pdf", "b.pdf"])
+    )
+    task = api.task_store.get("task-2")
+
+    assert task["status"] == "completed"
+    assert task["brd_content"].count("legacy SAP system") == 1
+    assert task["metrics"]["extraction"]["documents"] == 2
+    assert task["metrics"]["extraction"]["pages"] == 4
+    assert task["metrics"]["dedup"]["passages_removed"] == 1
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_refine_brd_resumes_finished_task(monkeypatch):
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+    monkeypatch.setattr(api, "job_queue", api.BRDJobQueue(workers=1, max_depth=5))
+    api.task_store.set("task-3", {"status": "completed", "brd_content": "BRD v1"})
+    api.task_store.set("task-4", {"status": api.IN_PROGRESS_STATUS})
+    seen = []
+
+    async def fake_refine(task_id, feedback):
+        seen.append((task_id, feedback))
+        return "BRD v2", "brd.docx"
+
+    monkeypatch.setattr(api, "arefine_with_feedback", fake_refine)
+
+    with TestClient(app) as client:
+        busy = client.post("/api/v1/refineBRD/task-4", json={"feedback": "more"})
+        response = client.post("/api/v1/refineBRD/task-3", json={"feedback": "add KPIs"})
+        for _ in range(50):
+            task = client.get("/api/v1/checkTaskStatus/task-3").json()
+            if task["status"] == "completed":
+                break
+            time.sleep(0.05)
+
+    assert busy.status_code == 409
+    assert response.status_code == 200
+    assert seen == [("task-3", "add KPIs")]
+    assert task["brd_content"] == "BRD v2"
+    assert task["feedback_rounds"] == 1
+
+
+def test_successful_rerun_clears_an_earlier_error(monkeypatch):
+    monkeypatch.setattr(api, "task_store", api.create_task_store("memory://"))
+    failed = {"status": "failed", "brd_content": "BRD v1", "error": "boom"}
+    api.task_store.set("refined", failed)
+    api.task_store.set("resumed", failed)
+
+    async def fake_refine(task_id, feedback):
+        return "BRD v2", "brd.docx"
+
+    async def fake_resume(task_id):
+        return "BRD v2", "brd.docx"
+
+    monkeypatch.setattr(api, "arefine_with_feedback", fake_refine)
+    monkeypatch.setattr(api, "aresume_workflow", fake_resume)
+
+    asyncio.run(api.refine_workflow_background("refined", "add KPIs", time.time()))
+    asyncio.run(api.resume_workflow_background("resumed", time.time()))
+
+    for task_id in ("refined", "resumed"):
+        task = api.task_store.get(task_id)
+        assert task["status"] == "completed"
+        assert "error" not in task
+
+
+def test_recovery_resumes_tasks_of_dead_workers(monkeypatch):
+    store = api.create_task_store("memory://")
+    leases = api.LeaseKeeper(store, owner="worker-b")
+    monkeypatch.setattr(api, "task_store", store)
+    monkeypatch.setattr(api, "lease_keeper", leases)
+    monkeypatch.setattr(api, "job_queue", api.BRDJobQueue(workers=1, max_depth=5))
+    store.set("running", {"status": api.IN_PROGRESS_STATUS, "wait_seconds": 1.0})
+    store.set("queued", {"status": api.QUEUED_STATUS})
+    store.set("alive", {"status": api.IN_PROGRESS_STATUS})
+    store.acquire_lease("running", "worker-a", -1)  # lapsed: worker-a died
+    store.acquire_lease("alive", "worker-a", 60)
+    resumed = []
+
+    async def fake_resume(task_id):
+        resumed.append(task_id)
+        return "BRD", "brd.docx"
+
+    monkeypatch.setattr(api, "aresume_workflow", fake_resume)
+
+    async def run():
+        recovery = api.TaskRecovery(store, leases, api.recover_task)
+        recovered = await recovery.recover_once()
+        for _ in range(50):
+            if store.get("running")["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        await api.job_queue.stop()
+        return recovered
+
+    recovered = asyncio.run(run())
+
+    assert sorted(recovered) == ["queued", "running"]
+    assert resumed == ["running"]
+    assert store.get("running")["brd_content"] == "BRD"
+    assert store.get("running")["resumed"] == 1
+    # The uploads of a job that never started died with its worker
+    assert store.get("queued")["status"] == "failed"
+    assert store.get("queued")["error"] == api.INTERRUPTED_ERROR
+    assert store.get("alive")["status"] == api.IN_PROGRESS_STATUS
+    assert not leases.owns("running") and not leases.owns("queued")
+
+
+def test_generate_brd_stream_cancels_workflow_on_disconnect(monkeypatch, tmp_path):
+    upload = tmp_path / "assessment.pdf"
+    upload.write_bytes(b"%PDF-1.4")
+    cancelled = []
+
+    async def fake_save_upload(assessment_file):
+        return str(upload)
+
+    async def fake_extract(path):
+        return "assessment"
+
+    async def fake_stream_workflow(assessment_text, on_event):
+        on_event({"event": "node_started", "node": "retrieve_vector"})
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(api, "save_upload", fake_save_upload)
+    monkeypatch.setattr(api.Utility, "aextract_text", fake_extract)
+    monkeypatch.setattr(api, "astream_workflow", fake_stream_workflow)
+
+    queue = api.BRDJobQueue(workers=1, max_depth=1)
+    monkeypatch.setattr(api, "job_queue", queue)
+
+    async def run():
+        response = await api.generate_BRD_stream(None)
+        events = response.body_iterator
+        first = await events.__anext__()
+        await events.aclose()  # what Starlette does when the client goes away
+        await asyncio.sleep(0.01)
+        stats = queue.stats()
+        await queue.stop()
+        return first, stats
+
+    first, stats = asyncio.run(run())
+
+    assert first.startswith("event: node_started")
+    assert cancelled == [True]
+    # The slot is freed and the queue worker itself keeps running
+    assert stats["active"] == 0 and stats["completed"] == 1
+
+
+def test_generate_brd_stream_returns_429_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(api, "job_queue", api.BRDJobQueue(workers=1, max_depth=0))
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/generateBRD/stream",
+            files={"assessment_file": ("assessment.pdf", b"%PDF-1.4")},
+        )
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
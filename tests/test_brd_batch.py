@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import sys
+import zipfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen import brd_batch
+from brdgen.brd_batch import BatchItem, BRDBatchRunner, write_batch_zip
+
+
+def _items(tmp_path, names):
+    items = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b"%PDF-1.4")
+        items.append(BatchItem(name, str(path)))
+    return items
+
+
+def test_runner_caps_concurrency_and_embeds_once(monkeypatch, tmp_path):
+    async def fake_extract(path):
+        return f"assessment {os.path.basename(path)}"
+
+    monkeypatch.setattr(brd_batch.Utility, "aextract_text", fake_extract)
+
+    running, peak = 0, 0
+
+    async def fake_workflow(assessment_text):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"BRD for {assessment_text}", "brd.docx"
+
+    prewarm_calls = []
+    items = _items(tmp_path, [f"a{i}.pdf" for i in range(6)])
+    runner = BRDBatchRunner(
+        workflow=fake_workflow,
+        concurrency=2,
+        prewarm=lambda texts: prewarm_calls.append(texts) or len(texts),
+    )
+    asyncio.run(runner.run(items))
+
+    assert peak == 2
+    assert len(prewarm_calls) == 1 and len(prewarm_calls[0]) == 6
+    assert [item.status for item in items] == ["completed"] * 6
+    assert items[0].brd_content == "BRD for assessment a0.pdf"
+
+
+def test_runner_isolates_failures(monkeypatch, tmp_path):
+    async def fake_extract(path):
+        if path.endswith("broken.pdf"):
+            raise RuntimeError("unreadable")
+        return "assessment"
+
+    async def fake_workflow(assessment_text):
+        return "BRD", "brd.docx"
+
+    monkeypatch.setattr(brd_batch.Utility, "aextract_text", fake_extract)
+    items = _items(tmp_path, ["ok.pdf", "broken.pdf"])
+    updates = []
+    runner = BRDBatchRunner(
+        workflow=fake_workflow,
+        on_update=lambda items: updates.append([i.status for i in items]),
+        prewarm=lambda texts: 0,
+    )
+    asyncio.run(runner.run(items))
+
+    assert [item.status for item in items] == ["completed", "failed"]
+    assert items[1].error == "unreadable"
+    assert updates[-1] == ["completed", "failed"]
+
+
+def test_write_batch_zip_includes_manifest(tmp_path):
+    items = [
+        BatchItem("report.pdf", "", status="completed", brd_content="BRD one"),
+        BatchItem("report.docx", "", status="completed", brd_content="BRD two"),
+        BatchItem("other.pdf", "", status="failed", error="boom"),
+    ]
+    zip_path = write_batch_zip(str(tmp_path / "out" / "batch.zip"), items)
+
+    with zipfile.ZipFile(zip_path) as archive:
+        names = set(archive.namelist())
+        manifest = json.loads(archive.read("manifest.json"))
+
+    assert names == {"report_brd.docx", "report_2_brd.docx", "manifest.json"}
+    assert [entry.get("brd_file") for entry in manifest] == [
+        "report_brd.docx",
+        "report_2_brd.docx",
+        None,
+    ]
+    assert manifest[2]["error"] == "boom"
+
+
+def test_sweep_batch_zips_removes_only_expired_zips(tmp_path):
+    old, fresh = tmp_path / "old.zip", tmp_path / "fresh.zip"
+    for path in (old, fresh, tmp_path / "notes.txt"):
+        path.write_bytes(b"PK")
+    os.utime(old, (0, 0))
+
+    assert brd_batch.sweep_batch_zips(str(tmp_path), max_age_seconds=60) == 1
+    assert sorted(os.listdir(tmp_path)) == ["fresh.zip", "notes.txt"]
+    assert brd_batch.sweep_batch_zips(str(tmp_path / "missing")) == 0
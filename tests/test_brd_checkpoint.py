@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import fakeredis  # type: ignore
+import pytest
+from typing import TypedDict
+from brdgen.brd_checkpoint import (
+    RedisCheckpointSaver,
+    _default_checkpoint_url,
+    aclose_checkpointer,
+    acompact_thread,
+    checkpoint_id_at,
+    close_checkpointer,
+    compact_thread,
+    create_checkpointer,
+    prune_checkpoints,
+    thread_config,
+)
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+
+class CounterState(TypedDict):
+    count: int
+    log: str
+
+
+def _graph(saver):
+    graph = StateGraph(CounterState)
+    graph.add_node("first", lambda state: {"count": state["count"] + 1, "log": "a"})
+    graph.add_node("second", lambda state: {"count": state["count"] + 1, "log": "b"})
+    graph.add_edge(START, "first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=saver)
+
+
+def _keys(saver):
+    return list(saver.client.scan_iter(match=f"{saver.KEY_PREFIX}*"))
+
+
+def test_checkpoint_url_follows_the_task_store():
+    assert _default_checkpoint_url("redis://redis:6379/0") == "redis://redis:6379/0"
+    assert _default_checkpoint_url("memory://") == "memory://"
+    assert (
+        _default_checkpoint_url("sqlite:///data/tasks.sqlite")
+        == "sqlite:///data/checkpoints.sqlite"
+    )
+
+
+def test_redis_saver_is_shared_between_instances():
+    server = fakeredis.FakeServer()
+    saver = RedisCheckpointSaver(client=fakeredis.FakeRedis(server=server))
+    config = thread_config("task-1")
+
+    assert _graph(saver).invoke({"count": 0, "log": ""}, config) == {
+        "count": 2,
+        "log": "b",
+    }
+
+    # Another replica sees the same thread, history included
+    other = RedisCheckpointSaver(client=fakeredis.FakeRedis(server=server))
+    state = _graph(other).get_state(config)
+    assert state.values == {"count": 2, "log": "b"}
+    history = list(_graph(other).get_state_history(config))
+    assert [h.values.get("count") for h in history] == [2, 1, 0, None]
+    assert len(list(other.list(None))) == len(history)
+
+    async def arun():
+        return await _graph(other).ainvoke({"count": 10, "log": ""}, config)
+
+    assert asyncio.run(arun())["count"] == 12
+
+    other.delete_thread("task-1")
+    assert saver.get_tuple(config) is None
+    assert not _keys(saver)
+
+
+def test_redis_checkpoints_expire_with_their_thread():
+    saver = RedisCheckpointSaver(ttl_seconds=120, client=fakeredis.FakeRedis())
+    _graph(saver).invoke({"count": 0, "log": ""}, thread_config("task-1"))
+
+    keys = _keys(saver)
+    assert keys
+    assert all(0 < saver.client.ttl(key) <= 120 for key in keys)
+
+
+def test_checkpoint_ids_sort_after_their_timestamp():
+    now = time.time()
+    checkpoint_id = str(uuid6(clock_seq=0))
+
+    assert checkpoint_id_at(now - 1) < checkpoint_id < checkpoint_id_at(now + 1)
+
+
+def test_prune_removes_threads_past_the_ttl(tmp_path):
+    url = f"sqlite:///{tmp_path / 'cp.sqlite'}"
+    assert prune_checkpoints(url, ttl_seconds=60) == 0  # nothing written yet
+
+    saver = create_checkpointer(False, url)
+    try:
+        _graph(saver).invoke({"count": 0, "log": ""}, thread_config("old"))
+        _graph(saver).invoke({"count": 0, "log": ""}, thread_config("new"))
+        # The newer thread was last written just now, the older one long ago
+        old_ids = [
+            saved.config["configurable"]["checkpoint_id"]
+            for saved in saver.list(thread_config("old"))
+        ]
+        stale = checkpoint_id_at(time.time() - 3600)
+        with saver.conn:
+            for checkpoint_id in old_ids:
+                saver.conn.execute(
+                    "UPDATE checkpoints SET checkpoint_id = ? WHERE checkpoint_id = ?",
+                    (stale[:-12] + uuid.uuid4().hex[:12], checkpoint_id),
+                )
+
+        assert prune_checkpoints(url, ttl_seconds=60) == 1  # one thread
+        assert saver.get_tuple(thread_config("old")) is None
+        assert saver.get_tuple(thread_config("new")) is not None
+    finally:
+        close_checkpointer(saver)
+
+
+def test_compaction_keeps_only_the_newest_checkpoint(tmp_path):
+    savers = [
+        InMemorySaver(),
+        create_checkpointer(False, f"sqlite:///{tmp_path / 'cp.sqlite'}"),
+        RedisCheckpointSaver(client=fakeredis.FakeRedis()),
+    ]
+    config = thread_config("task-1")
+    for saver in savers:
+        _graph(saver).invoke({"count": 0, "log": ""}, config)
+        assert len(list(saver.list(config))) == 4
+
+        compact_thread(saver, "task-1")
+        assert len(list(saver.list(config))) == 1
+        assert _graph(saver).get_state(config).values == {"count": 2, "log": "b"}
+
+        # The thread carries on from the kept checkpoint
+        assert _graph(saver).invoke({"count": 10, "log": ""}, config)["count"] == 12
+        close_checkpointer(saver)
+
+
+def test_async_sqlite_compaction(tmp_path):
+    url = f"sqlite:///{tmp_path / 'cp.sqlite'}"
+
+    saver = None
+
+    async def run():
+        nonlocal saver
+        saver = create_checkpointer(True, url)
+        try:
+            config = thread_config("task-1")
+            await _graph(saver).ainvoke({"count": 0, "log": ""}, config)
+            await acompact_thread(saver, "task-1")
+            return [saved async for saved in saver.alist(config)]
+        finally:
+            await aclose_checkpointer(saver)
+
+    kept = asyncio.run(run())
+    assert [saved.checkpoint["channel_values"]["count"] for saved in kept] == [2]
+    # Closed on its own loop, so no connection thread outlives the test
+    saver.conn._thread.join(timeout=5)
+    assert not saver.conn._thread.is_alive()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import brdgen.brd_condenser as brd_condenser
+from brdgen.brd_condenser import (
+    AssessmentCondenser,
+    estimate_tokens,
+    parse_budget_overrides,
+    prompt_token_budget,
+)
+from brdgen.brd_gen_agent import BRDGenerator
+from brdgen.brd_llm_client import CachedMistralClient
+
+PARAGRAPH = "The warehouse team scans every pallet into the legacy system twice. " * 20
+
+
+class SummarisingChat:
+    """Returns the first line of each chunk so every chunk shrinks to a fixed size."""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _reply(self, messages):
+        self.calls += 1
+        part = messages[-1]["content"].split("Condense part ")[1].split(" ")[0]
+        message = SimpleNamespace(content=f"- notes for part {part}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def complete(self, model, messages, temperature):
+        return self._reply(messages)
+
+    async def complete_async(self, model, messages, temperature):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self._reply(messages)
+
+
+def _condenser(chat, **kwargs):
+    client = CachedMistralClient(SimpleNamespace(chat=chat), mode="off")
+    return AssessmentCondenser(client, "test", chunk_tokens=500, **kwargs)
+
+
+def test_budget_is_per_model_with_overrides(monkeypatch):
+    assert prompt_token_budget("mistral-large-latest") == 96_000
+    assert prompt_token_budget("unknown-model") == brd_condenser.DEFAULT_PROMPT_TOKEN_BUDGET
+    assert parse_budget_overrides("a=10, b=20") == {"a": 10, "b": 20}
+
+    monkeypatch.setattr(brd_condenser, "_BUDGET_OVERRIDES", "mistral-large-latest=1000")
+    assert prompt_token_budget("mistral-large-latest") == 1000
+
+
+def test_text_within_target_is_not_condensed():
+    chat = SummarisingChat()
+    assert _condenser(chat).condense("short text", target_tokens=100) == "short text"
+    assert chat.calls == 0
+
+
+def test_condense_maps_chunks_in_order():
+    chat = SummarisingChat()
+    text = "\n\n".join([PARAGRAPH] * 10)
+
+    digest = _condenser(chat).condense(text, target_tokens=200)
+
+    parts = digest.split("\n\n")
+    assert chat.calls == len(parts) > 1
+    assert parts == [f"- notes for part {i}" for i in range(1, len(parts) + 1)]
+    assert estimate_tokens(digest) <= 200
+
+
+def test_acondense_bounds_concurrency():
+    chat = SummarisingChat()
+    text = "\n\n".join([PARAGRAPH] * 10)
+
+    digest = asyncio.run(_condenser(chat, workers=2).acondense(text, target_tokens=200))
+
+    assert chat.max_in_flight == 2
+    assert digest.startswith("- notes for part 1")
+
+
+def test_fit_assessment_only_condenses_over_budget():
+    generator = BRDGenerator(api_key="test-key", model="test")
+    chat = SummarisingChat()
+    generator.condenser = _condenser(chat, budget=2000)
+
+    assert generator.fit_assessment("A small assessment") == "A small assessment"
+    assert chat.calls == 0
+
+    large = "\n\n".join([PARAGRAPH] * 20)
+    digest = generator.fit_assessment(large)
+    assert chat.calls > 0
+    assert estimate_tokens(generator.get_final_prompt(digest)) <= 2000
@@ -0,0 +1,46 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_dedup import merge_documents, split_passages
+
+BOILERPLATE = (
+    "This assessment was prepared by the SAP migration team for internal review. "
+    "All figures are estimates based on interviews held with the finance department."
+)
+
+
+def test_split_passages_packs_sentences():
+    text = " ".join(f"Sentence number {i} is here." for i in range(30))
+    passages = split_passages(text, max_words=20)
+
+    assert len(passages) == 8
+    assert " ".join(passages) == text
+
+
+def test_merge_drops_near_duplicates_across_documents():
+    first = f"{BOILERPLATE} The invoice approval workflow needs three levels of sign-off."
+    # Same boilerplate with small edits, then new content
+    second = (
+        BOILERPLATE.replace("internal review", "internal  Review")
+        + " Vendor onboarding must be completed within five business days."
+    )
+
+    text, stats = merge_documents([first, second], ["a.pdf", "b.pdf"], passage_words=20)
+
+    assert text.count("prepared by the SAP migration team") == 1
+    assert "Vendor onboarding" in text and "invoice approval" in text
+    assert text.startswith("Document 1: a.pdf")
+    assert stats.passages_removed == 1
+    assert stats.tokens_saved > 0
+    assert stats.as_dict()["tokens_saved"] == stats.tokens_saved
+
+
+def test_merge_keeps_repetition_within_a_document():
+    text, stats = merge_documents([f"{BOILERPLATE}\n\n{BOILERPLATE}", "Other notes."])
+
+    assert text.count("prepared by the SAP migration team") == 2
+    assert stats.passages_removed == 0
+    assert stats.tokens_saved == 0
@@ -0,0 +1,37 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import brdgen.brd_embedding as brd_embedding
+from brdgen.brd_embedding import EmbeddingProvider
+
+
+class FakeEmbeddings:
+    instances = 0
+
+    def __init__(self, **kwargs):
+        FakeEmbeddings.instances += 1
+        self.kwargs = kwargs
+
+    def embed_query(self, text):
+        return [0.0]
+
+
+def test_embedding_provider_is_shared_and_ready_after_preload(monkeypatch):
+    monkeypatch.setattr(brd_embedding, "FastEmbedEmbeddings", FakeEmbeddings)
+    FakeEmbeddings.instances = 0
+    provider = EmbeddingProvider(model_name="test-model", threads=2, batch_size=8)
+
+    assert not provider.is_ready()
+    assert provider.get() is provider.get()
+    assert provider.get().kwargs == {
+        "model_name": "test-model",
+        "threads": 2,
+        "batch_size": 8,
+    }
+
+    provider.preload()
+    assert provider.is_ready()
+    assert FakeEmbeddings.instances == 1
@@ -0,0 +1,246 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from benchmarks.fixtures import synthetic_brd, synthetic_generations
+from brdgen.brd_gen_agent import BRDGenerator, StreamInterruptedError
+from brdgen.brd_llm_client import CachedMistralClient, LLMCacheMiss
+import brdgen.brd_prompts as prompts
+
+TEXTS = [
+    "The system shall export invoices to the finance module every night.",
+    "The system shall export invoices to the finance module every hour.",
+    "Users must approve purchase orders above the configured budget limit.",
+]
+
+
+def _scripted_generator(outputs, **kwargs):
+    generator = BRDGenerator(
+        api_key="test-key", model="test", adaptive_sampling=True, **kwargs
+    )
+    calls = []
+
+    def fake_generate_single_brd(prompt, temperature, on_token=None):
+        calls.append(temperature)
+        return outputs[len(calls) - 1]
+
+    generator.generate_single_brd = fake_generate_single_brd
+    return generator, calls
+
+
+def test_adaptive_sampling_stops_when_first_pair_agrees():
+    generator, calls = _scripted_generator([TEXTS[0], TEXTS[0], TEXTS[2]])
+
+    result = generator.generate_brd("Assessment text")
+
+    assert len(calls) == 2
+    assert result.samples_used == 2
+    assert result.converged
+
+
+def test_adaptive_sampling_adds_samples_until_cap():
+    outputs = [TEXTS[0], TEXTS[2], "Completely unrelated text", "Another one"]
+    generator, calls = _scripted_generator(
+        outputs, similarity_threshold=0.99, max_samples=4
+    )
+
+    result = generator.generate_brd("Assessment text")
+
+    assert len(calls) == 4
+    assert result.samples_used == 4
+    assert not result.converged
+
+
+def test_adaptive_sampling_requests_more_when_samples_disagree():
+    # Two BRDs written from different content, then a close variant of the first
+    agreeing = synthetic_generations(2, words=600)
+    outputs = [agreeing[0], synthetic_brd(600, seed=1), agreeing[1]]
+    generator, calls = _scripted_generator(outputs)
+
+    result = generator.generate_brd("Assessment text")
+
+    assert len(calls) == 3
+    assert result.samples_used == 3
+    assert result.converged
+
+
+def test_agreement_threshold_separates_fixture_samples():
+    generator = BRDGenerator(api_key="test-key", model="test")
+    for words in (600, 3000):
+        for edit_rate in (0.05, 0.15):
+            variants = synthetic_generations(2, words=words, edit_rate=edit_rate)
+            assert generator._check_agreement(variants)
+        different = [synthetic_brd(words, seed=0), synthetic_brd(words, seed=1)]
+        assert not generator._check_agreement(different)
+
+
+class FakeAsyncChat:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def complete_async(self, model, messages, temperature):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        message = SimpleNamespace(content=f"BRD at temperature {temperature:.1f}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_agenerate_brd_awaits_samples_concurrently():
+    generator = BRDGenerator(api_key="test-key", model="test", num_samples=3)
+    chat = FakeAsyncChat()
+    generator.client = CachedMistralClient(SimpleNamespace(chat=chat), mode="off")
+
+    result = asyncio.run(generator.agenerate_brd("Assessment text"))
+
+    assert chat.max_in_flight == 3
+    assert result.samples_used == 3
+    assert result.selected_brd in result.all_generations
+
+
+def _section_reply(prompt):
+    sections = prompt.split("Sections to write:\n")[1].split("\n\nAssessment:")[0]
+    title = sections.splitlines()[0]
+    return f"Here is the section.\n**{title}**\nContent for {title}."
+
+
+def test_section_parallel_assembles_sections_in_outline_order():
+    generator = BRDGenerator(
+        api_key="test-key",
+        model="test",
+        section_parallel=True,
+        section_workers=4,
+        section_consistency=False,
+    )
+    lock = threading.Lock()
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    def fake_generate(prompt, temperature, on_token=None):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.02)
+        with lock:
+            state["in_flight"] -= 1
+        return _section_reply(prompt)
+
+    generator.generate_single_brd = fake_generate
+
+    result = generator.generate_brd("Assessment text")
+
+    headings = [
+        line[3:] for line in result.selected_brd.splitlines() if line.startswith("## ")
+    ]
+    assert headings == prompts.STANDARD_SECTIONS
+    assert "Here is the section." not in result.selected_brd
+    assert "Content for 9. Risk Analysis." in result.selected_brd
+    assert result.samples_used == 1
+    assert result.section_requests == len(prompts.STANDARD_SECTIONS)
+    assert 1 < state["max_in_flight"] <= 4
+
+
+def test_agenerate_sections_supports_grouped_sections():
+    groups = [prompts.STANDARD_SECTIONS[:5], prompts.STANDARD_SECTIONS[5:]]
+    generator = BRDGenerator(
+        api_key="test-key", model="test", section_parallel=True, section_groups=groups
+    )
+    reviewed = []
+
+    async def fake_generate(prompt, temperature, on_token=None):
+        sections = prompt.split("Sections to write:\n")[1].split("\n\nAssessment:")[0]
+        return "\n".join(f"## {s}\nBody of {s}" for s in sections.splitlines())
+
+    async def fake_consistency_pass(**kwargs):
+        assert kwargs["call_site"] == "section_consistency"
+        brd = kwargs["messages"][1]["content"].split("BRD:\n")[1]
+        reviewed.append(brd)
+        return _reply(brd.replace("Body of", "Reconciled body of"))
+
+    generator.agenerate_single_brd = fake_generate
+    generator.client = SimpleNamespace(
+        chat=SimpleNamespace(complete_async=fake_consistency_pass)
+    )
+
+    result = asyncio.run(generator.agenerate_brd("Assessment text"))
+
+    assert result.samples_used == 1
+    assert result.section_requests == 3  # two groups and the consistency pass
+    assert len(reviewed) == 1 and "## 10. Acceptance Criteria" in reviewed[0]
+    assert result.selected_brd.count("## ") == len(prompts.STANDARD_SECTIONS)
+    assert "Reconciled body of 1. Executive Summary" in result.selected_brd
+    assert "_Not generated._" not in result.selected_brd
+
+
+def _reply(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_consistency_pass_that_drops_a_section_keeps_the_assembly():
+    generator = BRDGenerator(api_key="test-key", model="test", section_parallel=True)
+    generator.generate_single_brd = lambda prompt, temperature, on_token=None: (
+        _section_reply(prompt)
+    )
+    truncated = _reply("## 1. Executive Summary")
+    generator.client = SimpleNamespace(
+        chat=SimpleNamespace(complete=lambda **kwargs: truncated)
+    )
+
+    result = generator.generate_brd("Assessment text")
+
+    assert "Content for 10. Acceptance Criteria." in result.selected_brd
+    assert result.section_requests == len(prompts.STANDARD_SECTIONS) + 1
+
+
+def test_stream_failing_after_tokens_is_not_replayed():
+    generator = BRDGenerator(api_key="test-key", model="test")
+    attempts = []
+
+    def broken_stream(**kwargs):
+        attempts.append(kwargs["temperature"])
+        choice = SimpleNamespace(delta=SimpleNamespace(content="Partial BRD"))
+        yield SimpleNamespace(data=SimpleNamespace(choices=[choice]))
+        raise ConnectionError("connection reset")
+
+    generator.client = SimpleNamespace(chat=SimpleNamespace(stream=broken_stream))
+    tokens = []
+
+    with pytest.raises(StreamInterruptedError):
+        generator.generate_single_brd("prompt", 0.3, tokens.append)
+
+    assert attempts == [0.3]
+    assert tokens == ["Partial BRD"]
+
+
+def test_replay_miss_is_raised_without_retrying():
+    generator = BRDGenerator(api_key="test-key", model="test")
+    attempts = []
+
+    def miss(**kwargs):
+        attempts.append("sync")
+        raise LLMCacheMiss("No recorded LLM response")
+
+    async def amiss(**kwargs):
+        attempts.append("async")
+        raise LLMCacheMiss("No recorded LLM response")
+
+    generator.client = SimpleNamespace(
+        chat=SimpleNamespace(complete=miss, complete_async=amiss)
+    )
+
+    with pytest.raises(LLMCacheMiss):
+        generator.generate_single_brd("prompt", 0.3)
+    with pytest.raises(LLMCacheMiss):
+        asyncio.run(generator.agenerate_single_brd("prompt", 0.3))
+
+    assert attempts == ["sync", "async"]
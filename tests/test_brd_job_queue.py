@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import pytest
+from brdgen.brd_job_queue import BRDJobQueue, QueueFullError
+
+
+def test_queue_bounds_concurrency_and_depth():
+    async def scenario():
+        queue = BRDJobQueue(workers=1, max_depth=2)
+        release = asyncio.Event()
+        finished = []
+
+        async def job(name):
+            await release.wait()
+            finished.append(name)
+
+        queue.submit("a", job, "a")
+        await asyncio.sleep(0)  # let the worker pick up "a"
+        assert queue.active == 1
+
+        assert queue.submit("b", job, "b") == 1
+        assert queue.submit("c", job, "c") == 2
+        assert queue.position("c") == 2
+        with pytest.raises(QueueFullError) as excinfo:
+            queue.submit("d", job, "d")
+        assert excinfo.value.retry_after > 0
+
+        release.set()
+        while len(finished) < 3:
+            await asyncio.sleep(0)
+        stats = queue.stats()
+        await queue.stop()
+        return finished, stats
+
+    finished, stats = asyncio.run(scenario())
+
+    assert finished == ["a", "b", "c"]
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 1
+    assert stats["wait_seconds"]["count"] == 3
+
+
+def test_discarded_jobs_never_run():
+    async def scenario():
+        queue = BRDJobQueue(workers=1, max_depth=2)
+        release = asyncio.Event()
+        finished = []
+
+        async def job(name):
+            await release.wait()
+            finished.append(name)
+
+        queue.submit("a", job, "a")
+        queue.submit("b", job, "b")
+        await asyncio.sleep(0)
+
+        assert queue.discard("b")
+        assert not queue.discard("a")  # already running
+        release.set()
+        queue.submit("c", job, "c")
+        while len(finished) < 2:
+            await asyncio.sleep(0)
+        await queue.stop()
+        return finished
+
+    assert asyncio.run(scenario()) == ["a", "c"]
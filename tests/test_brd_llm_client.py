@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_cache import DiskLRUCache
+from brdgen.brd_llm_client import (
+    CachedMistralClient,
+    LLMCacheMiss,
+    LLMResponseCache,
+    request_key,
+)
+
+MESSAGES = [{"role": "user", "content": "Write a BRD"}]
+
+
+class FakeChat:
+    def __init__(self):
+        self.calls = 0
+
+    def _text(self, temperature):
+        self.calls += 1
+        return f"BRD #{self.calls} at {temperature}"
+
+    def complete(self, model, messages, temperature):
+        message = SimpleNamespace(content=self._text(temperature))
+        usage = SimpleNamespace(prompt_tokens=3, completion_tokens=5, total_tokens=8)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def complete_async(self, model, messages, temperature):
+        return self.complete(model, messages, temperature)
+
+    def stream(self, model, messages, temperature):
+        for word in self._text(temperature).split(" "):
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(
+                data=SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+            )
+
+
+def _client(tmp_path, mode):
+    chat = FakeChat()
+    store = LLMResponseCache(DiskLRUCache(str(tmp_path / "llm.sqlite")))
+    client = CachedMistralClient(
+        SimpleNamespace(chat=chat), mode=mode, cache=store, recordings=store
+    )
+    return client, chat
+
+
+def _complete(client, temperature=0.3, cache=True):
+    response = client.chat.complete(
+        model="m", messages=MESSAGES, temperature=temperature, cache=cache
+    )
+    return response.choices[0].message.content
+
+
+def test_request_key_covers_model_messages_and_temperature():
+    base = request_key("m", MESSAGES, 0.3)
+    assert base == request_key("m", [dict(MESSAGES[0])], 0.3)
+    assert base != request_key("other", MESSAGES, 0.3)
+    assert base != request_key("m", MESSAGES, 0.4)
+    assert base != request_key("m", [{"role": "user", "content": "x"}], 0.3)
+
+
+def test_cache_mode_only_serves_opted_in_call_sites(tmp_path):
+    client, chat = _client(tmp_path, "cache")
+
+    first = _complete(client)
+    assert _complete(client) == first
+    assert chat.calls == 1
+
+    _complete(client, cache=False)
+    _complete(client, cache=False)
+    assert chat.calls == 3
+
+
+def test_cache_survives_restart_via_disk_tier(tmp_path):
+    client, _ = _client(tmp_path, "cache")
+    first = _complete(client, temperature=0.5)
+
+    reopened, chat = _client(tmp_path, "cache")
+    assert _complete(reopened, temperature=0.5) == first
+    assert chat.calls == 0
+
+
+def test_memory_tier_is_bounded():
+    store = LLMResponseCache(memory_entries=2)
+    for key in ("a", "b", "c"):
+        store.set(key, {"content": key})
+    assert store.get("a") is None
+    assert store.get("c") == {"content": "c"}
+
+
+def test_record_then_replay_runs_offline(tmp_path):
+    recorder, chat = _client(tmp_path, "record")
+    recorded = _complete(recorder, cache=False)
+    _complete(recorder, cache=False)
+    assert chat.calls == 2  # record mode never serves from the store
+
+    replayer, offline_chat = _client(tmp_path, "replay")
+    replayed = asyncio.run(
+        replayer.chat.complete_async(model="m", messages=MESSAGES, temperature=0.3)
+    )
+    assert replayed.choices[0].message.content != recorded  # last recording wins
+    assert replayed.usage.total_tokens == 8
+    assert offline_chat.calls == 0
+
+    with pytest.raises(LLMCacheMiss):
+        _complete(replayer, temperature=0.9)
+
+
+def test_stream_is_recorded_and_replayed(tmp_path):
+    client, chat = _client(tmp_path, "cache")
+    streamed = "".join(
+        event.data.choices[0].delta.content
+        for event in client.chat.stream(
+            model="m", messages=MESSAGES, temperature=0.3, cache=True
+        )
+    )
+
+    replay = list(
+        client.chat.stream(model="m", messages=MESSAGES, temperature=0.3, cache=True)
+    )
+    assert len(replay) == 1
+    assert replay[0].data.choices[0].delta.content == streamed
+    assert _complete(client) == streamed
+    assert chat.calls == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        CachedMistralClient(SimpleNamespace(chat=FakeChat()), mode="sometimes")
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_job_queue import BRDJobQueue
+from brdgen.brd_llm_client import CachedMistralClient, LLMResponseCache
+from brdgen.brd_metrics import (
+    bind_job_queue,
+    page_bucket,
+    render_metrics,
+    timed_node,
+    track_task,
+)
+
+
+class FakeChat:
+    def complete(self, model, messages, temperature):
+        message = SimpleNamespace(content="BRD")
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=30, total_tokens=42)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def test_llm_calls_are_counted_per_call_site_and_task():
+    client = CachedMistralClient(
+        SimpleNamespace(chat=FakeChat()), mode="cache", cache=LLMResponseCache()
+    )
+    kwargs = dict(model="m-test", messages=[{"role": "user", "content": "x"}], temperature=0)
+
+    with track_task() as metrics:
+        client.chat.complete(cache=True, call_site="generate", **kwargs)
+        client.chat.complete(cache=True, call_site="generate", **kwargs)
+
+    llm = metrics.as_dict()["llm"]["generate"]
+    assert llm["calls"] == 2
+    assert llm["cached_calls"] == 1
+    assert llm["prompt_tokens"] == 24
+    assert llm["completion_tokens"] == 60
+
+    text = render_metrics()[0].decode()
+    assert 'brd_llm_tokens_total{call_site="generate",kind="prompt",model="m-test"}' in text
+    assert 'brd_llm_call_duration_seconds_count{cached="true",call_site="generate"' in text
+
+
+def test_timed_node_records_sync_and_async_nodes():
+    def sync_node(state, config=None):
+        return {"value": 1}
+
+    async def async_node(state):
+        return {"value": 2}
+
+    with track_task() as metrics:
+        assert timed_node("sync", sync_node)({}) == {"value": 1}
+        assert asyncio.run(timed_node("async", async_node)({})) == {"value": 2}
+
+    assert set(metrics.as_dict()["nodes"]) == {"sync", "async"}
+    assert 'brd_node_duration_seconds_count{node="async"}' in render_metrics()[0].decode()
+
+
+def test_queue_gauges_read_the_bound_queue():
+    queue = BRDJobQueue(workers=1, max_depth=5)
+    queue._pending["job"] = (None, (), 0.0)
+    bind_job_queue(queue)
+
+    text = render_metrics()[0].decode()
+
+    assert "brd_job_queue_depth 1.0" in text
+    assert "brd_jobs_active 0.0" in text
+
+
+def test_page_bucket_bounds_label_values():
+    assert page_bucket(None) == "n/a"
+    assert page_bucket(7) == "1-10"
+    assert page_bucket(120) == "51-200"
+    assert page_bucket(900) == "201+"
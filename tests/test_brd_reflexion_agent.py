@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_gen_agent import BRDGenerator
+from brdgen.brd_llm_client import CachedMistralClient
+from brdgen.brd_reflexion_agent import BRDRevisor, parse_critique
+from brdgen.brd_sections import split_sections
+import brdgen.brd_prompts as prompts
+
+SECTIONS = prompts.STANDARD_SECTIONS[:3]
+DRAFT = "\n\n".join(f"## {section}\n\nDraft of {section}." for section in SECTIONS)
+
+
+def _reply(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeChat:
+    """Answers the critic with `flagged` and rewrites each section it is asked for."""
+
+    def __init__(self, flagged):
+        self.flagged = flagged
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _answer(self, messages):
+        prompt = messages[-1]["content"]
+        if "Answer with JSON only" in prompt:
+            self.calls.append("critique")
+            sections = [{"section": s, "issues": "Too vague."} for s in self.flagged]
+            return _reply(json.dumps({"sections": sections}))
+        section = prompt.split("Section: ")[1].splitlines()[0]
+        self.calls.append(section)
+        return _reply(f"## {section}\n\nRevised {section}.")
+
+    def complete(self, model, messages, temperature, response_format=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        return self._answer(messages)
+
+    async def complete_async(self, model, messages, temperature, response_format=None):
+        return self._answer(messages)
+
+
+def _revisor(chat):
+    generator = BRDGenerator(api_key="test-key", model="test")
+    generator.client = CachedMistralClient(SimpleNamespace(chat=chat), mode="off")
+    return BRDRevisor(generator, DRAFT, "Assessment text", sections=SECTIONS)
+
+
+def test_parse_critique_matches_known_sections():
+    text = (
+        'Sure: {"sections": [{"section": "Project Scope", "issues": "Missing dates"}, '
+        '{"section": "Glossary", "issues": "Unknown"}]}'
+    )
+
+    assert parse_critique(text, SECTIONS) == {"2. Project Scope": "Missing dates"}
+
+
+def test_refine_sections_rewrites_only_flagged_sections_concurrently():
+    chat = FakeChat(flagged=[SECTIONS[0], SECTIONS[2]])
+    revisor = _revisor(chat)
+
+    brd = revisor.refine_sections()
+
+    parsed = split_sections(brd, SECTIONS)
+    assert parsed[SECTIONS[0]] == f"Revised {SECTIONS[0]}."
+    assert parsed[SECTIONS[1]] == f"Draft of {SECTIONS[1]}."
+    assert parsed[SECTIONS[2]] == f"Revised {SECTIONS[2]}."
+    assert sorted(chat.calls[1:]) == [SECTIONS[0], SECTIONS[2]]
+    assert chat.max_in_flight == 2
+    assert revisor.changed_sections == [SECTIONS[0], SECTIONS[2]]
+    assert revisor.converged is False
+
+
+def test_refine_sections_converges_when_nothing_is_flagged():
+    chat = FakeChat(flagged=[])
+    revisor = _revisor(chat)
+
+    brd = asyncio.run(revisor.arefine_sections())
+
+    assert brd == DRAFT
+    assert chat.calls == ["critique"]
+    assert revisor.converged is True
+
+
+def test_refine_sections_falls_back_to_full_refine_on_bad_critique():
+    chat = FakeChat(flagged=[])
+    chat._answer = lambda messages: _reply(
+        "not json" if "Answer with JSON only" in messages[-1]["content"] else "Full BRD"
+    )
+    revisor = _revisor(chat)
+
+    assert revisor.refine_sections() == "Full BRD"
+    assert revisor.converged is False
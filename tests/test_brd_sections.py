@@ -0,0 +1,37 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_sections import assemble_sections, split_sections
+
+OUTLINE = ["1. Executive Summary", "2. Project Scope", "3. Business Requirements"]
+
+
+def test_split_sections_recognises_heading_styles():
+    text = (
+        "Preamble\n"
+        "# 1. Executive Summary\nSummary\n"
+        "**Project Scope:**\nScope\n### Details\nMore scope\n"
+        "3. Business Requirements\nReq"
+    )
+
+    parts = split_sections(text, OUTLINE)
+
+    assert list(parts) == ["", *OUTLINE]
+    assert parts[""] == "Preamble"
+    assert parts["2. Project Scope"] == "Scope\n### Details\nMore scope"
+
+
+def test_assemble_sections_orders_and_flags_missing():
+    generated = ["## 2. Project Scope\nScope", "Just the summary text", "Off-topic reply"]
+    groups = [[OUTLINE[1]], [OUTLINE[0]], [OUTLINE[2], "4. Functional Requirements"]]
+
+    brd = assemble_sections(generated, groups, OUTLINE + ["4. Functional Requirements"])
+
+    assert brd.index("## 1. Executive Summary\n\nJust the summary text") < brd.index(
+        "## 2. Project Scope\n\nScope"
+    )
+    assert "## 3. Business Requirements\n\n_Not generated._" in brd
+    assert "Off-topic reply" not in brd
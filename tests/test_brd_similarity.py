@@ -0,0 +1,50 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import numpy as np
+import pytest
+from brdgen.brd_gen_agent import BRDGenerator
+from brdgen.brd_similarity import SIMILARITY_BACKENDS, get_similarity_backend
+
+TEXTS = [
+    "The system shall export invoices to the finance module every night.",
+    "The system shall export invoices to the finance module every hour.",
+    "Users must approve purchase orders above the configured budget limit.",
+]
+
+
+@pytest.mark.parametrize("name", sorted(SIMILARITY_BACKENDS))
+def test_backend_matrix_is_symmetric_and_bounded(name):
+    matrix = get_similarity_backend(name).pairwise(TEXTS)
+
+    assert matrix.shape == (3, 3)
+    assert np.allclose(matrix, matrix.T)
+    assert np.allclose(matrix.diagonal(), 1.0)
+    assert ((matrix >= 0) & (matrix <= 1)).all()
+    assert matrix[0, 1] > matrix[0, 2]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_similarity_backend("levenshtein")
+
+
+@pytest.mark.parametrize("name", sorted(SIMILARITY_BACKENDS))
+def test_analyze_consistency_selects_most_representative(name):
+    generator = BRDGenerator(api_key="test-key", model="test", similarity_backend=name)
+
+    result = generator.analyze_consistency(TEXTS)
+
+    assert result.selected_brd in TEXTS[:2]
+    assert 0 <= result.average_similarity <= 1
+    assert result.all_generations == TEXTS
+
+
+
+def test_generator_defaults_to_difflib_selection():
+    generator = BRDGenerator(api_key="test-key", model="test")
+
+    assert generator.similarity.name == "difflib"
@@ -0,0 +1,99 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import fakeredis  # type: ignore
+import pytest
+import brdgen.brd_task_store as brd_task_store
+from brdgen.brd_task_store import (
+    InMemoryTaskStore,
+    RedisTaskStore,
+    SQLiteTaskStore,
+    create_task_store,
+    decode_task,
+    encode_task,
+)
+
+
+def _stores(tmp_path):
+    return [
+        InMemoryTaskStore(ttl_seconds=60),
+        SQLiteTaskStore(str(tmp_path / "tasks.sqlite"), ttl_seconds=60),
+        RedisTaskStore(ttl_seconds=60, client=fakeredis.FakeRedis()),
+    ]
+
+
+def test_task_records_round_trip_compressed():
+    task = {"status": "completed", "brd_content": "Requirement. " * 1000}
+    data = encode_task(task)
+
+    assert len(data) < len(task["brd_content"]) / 10
+    assert decode_task(data) == task
+
+
+def test_stores_share_the_same_contract(tmp_path):
+    for store in _stores(tmp_path):
+        assert store.get("missing") is None
+
+        store.set("t1", {"status": "BRD generation In-progress"})
+        store.update("t1", status="completed", brd_content="BRD")
+        assert store.get("t1") == {"status": "completed", "brd_content": "BRD"}
+
+        store.delete("t1")
+        assert store.get("t1") is None
+
+
+def test_finished_tasks_expire_but_in_progress_tasks_do_not(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(brd_task_store.time, "time", lambda: now[0])
+
+    for store in _stores(tmp_path)[:2]:
+        store.set("running", {"status": "BRD generation In-progress"})
+        store.set("done", {"status": "completed", "brd_content": "BRD"})
+
+        now[0] += 61
+        assert store.get("done") is None
+        assert store.get("running") is not None
+        store.evict_expired()
+        now[0] = 1000.0
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    url = f"sqlite:///{tmp_path / 'tasks.sqlite'}"
+    create_task_store(url).set("t1", {"status": "completed", "brd_content": "BRD"})
+
+    assert create_task_store(url).get("t1")["brd_content"] == "BRD"
+
+
+def test_leases_exclude_other_owners_until_they_lapse(tmp_path, monkeypatch):
+    for store in _stores(tmp_path):
+        assert store.acquire_lease("t1", "worker-a", 60)
+        assert store.acquire_lease("t1", "worker-a", 60)  # renewal
+        assert not store.acquire_lease("t1", "worker-b", 60)
+
+        store.release_lease("t1", "worker-b")  # not the holder: no effect
+        assert not store.acquire_lease("t1", "worker-b", 60)
+        store.release_lease("t1", "worker-a")
+        assert store.acquire_lease("t1", "worker-b", 60)
+
+    # A holder that stops heartbeating loses the lease once it lapses
+    now = [1000.0]
+    monkeypatch.setattr(brd_task_store.time, "time", lambda: now[0])
+    for store in _stores(tmp_path)[:2]:
+        assert store.acquire_lease("t2", "worker-a", 60)
+        now[0] += 61
+        assert store.acquire_lease("t2", "worker-b", 60)
+        assert not store.acquire_lease("t2", "worker-a", 60)
+        now[0] = 1000.0
+
+
+def test_unfinished_task_ids(tmp_path):
+    for store in _stores(tmp_path):
+        store.set("queued", {"status": "BRD generation queued"})
+        store.set("running", {"status": "BRD generation In-progress"})
+        store.set("done", {"status": "completed", "brd_content": "BRD"})
+        store.set("broken", {"status": "failed", "error": "boom"})
+
+        assert sorted(store.unfinished_task_ids()) == ["queued", "running"]
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from brdgen.brd_tool_executor import (
+    DEFAULT_QUERY,
+    BRDExternalTool,
+    assessment_queries,
+    format_tool_results,
+    normalise_query,
+)
+
+
+class FakeTavily:
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results, timeout):
+        with self._lock:
+            self.calls.append(query)
+            self.timeouts.append(timeout)
+        time.sleep(self.delays.get(query, 0))
+        if query == "broken":
+            raise RuntimeError("upstream error")
+        return {"results": [{"content": f"about {query}"}]}
+
+
+def test_results_are_cached_by_normalised_query():
+    client = FakeTavily()
+    tool = BRDExternalTool(client=client, timeout=3)
+
+    assert tool.search("What is SAP?") == "about What is SAP?"
+    assert tool.search("  what is   sap ") == "about What is SAP?"
+    assert client.calls == ["What is SAP?"]
+    assert client.timeouts == [3]
+    assert normalise_query("Hello  World?") == "hello world"
+
+
+def test_expired_entries_are_fetched_again():
+    client = FakeTavily()
+    tool = BRDExternalTool(client=client, ttl_seconds=0)
+
+    tool.search("query")
+    tool.search("query")
+
+    assert len(client.calls) == 2
+
+
+def test_search_many_runs_concurrently_and_degrades_within_budget():
+    client = FakeTavily(delays={"a": 0.1, "b": 0.1, "slow": 2})
+    tool = BRDExternalTool(client=client, budget=0.5, max_concurrency=4)
+
+    start = time.perf_counter()
+    results = tool.search_many(["a", "b", "slow", "broken", "a"])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1
+    assert results == {"a": "about a", "b": "about b", "slow": None, "broken": None}
+    assert format_tool_results(results) == "a\nabout a\n\nb\nabout b"
+
+
+def test_asearch_many_respects_budget():
+    client = FakeTavily(delays={"slow": 2})
+    tool = BRDExternalTool(client=client, budget=0.2)
+
+    results = asyncio.run(tool.asearch_many(["fast", "slow"]))
+
+    assert results == {"fast": "about fast", "slow": None}
+
+
+def test_assessment_queries_use_frequent_topics():
+    text = "The ERP rollout replaces SAP ECC. SAP ECC hosts Order Management. SAP ECC."
+
+    queries = assessment_queries(text, max_queries=2)
+
+    assert queries == [
+        "What is the Background of SAP in 50 words?",
+        "What is the Background of ECC in 50 words?",
+    ]
+    assert assessment_queries("no proper nouns here") == [DEFAULT_QUERY]
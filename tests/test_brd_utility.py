@@ -0,0 +1,62 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import brdgen.brd_utility as brd_utility
+from benchmarks.fixtures import write_synthetic_pdf
+from brdgen.brd_cache import DiskLRUCache
+from brdgen.brd_utility import Utility
+
+
+def test_parallel_pdf_pages_match_sequential_order(tmp_path):
+    path = write_synthetic_pdf(str(tmp_path / "assessment.pdf"), pages=6)
+
+    sequential = list(Utility.iter_pdf_pages(path, workers=1))
+    parallel = list(Utility.iter_pdf_pages(path, workers=2, min_pages_for_parallel=0))
+
+    assert len(sequential) == 6
+    assert parallel == sequential
+    # The pool is shared across documents instead of built per file
+    assert brd_utility.get_pdf_page_executor(2) is brd_utility.get_pdf_page_executor(2)
+
+
+def test_pdf_pages_are_extracted_sequentially_by_default():
+    assert brd_utility.PDF_PAGE_WORKERS <= brd_utility.available_cpus()
+    if "BRD_PDF_PAGE_WORKERS" not in os.environ:
+        assert brd_utility.PDF_PAGE_WORKERS == 1
+
+
+def test_extract_text_joins_and_cleans_pdf_pages(tmp_path):
+    path = write_synthetic_pdf(str(tmp_path / "assessment.pdf"), pages=2)
+
+    text = Utility.extract_text(path)
+
+    assert text
+    assert "\n" not in text
+
+
+def test_extract_text_is_cached_by_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        brd_utility, "_extraction_cache", DiskLRUCache(str(tmp_path / "text.sqlite"))
+    )
+    first = write_synthetic_pdf(str(tmp_path / "first.pdf"), pages=2)
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes((tmp_path / "first.pdf").read_bytes())
+
+    parsed = []
+    iter_pdf_pages = Utility.iter_pdf_pages
+    monkeypatch.setattr(
+        Utility,
+        "iter_pdf_pages",
+        staticmethod(lambda path: parsed.append(path) or iter_pdf_pages(path)),
+    )
+
+    text = Utility.extract_text(first)
+    assert Utility.extract_text(str(copy)) == text
+    assert parsed == [first]
+
+    monkeypatch.setattr(brd_utility, "EXTRACTOR_VERSION", "next")
+    Utility.extract_text(str(copy))
+    assert parsed == [first, str(copy)]
@@ -0,0 +1,76 @@
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import brdgen.brd_embedding as brd_embedding
+import brdgen.brd_rag_agent_chroma as brd_rag_agent_chroma
+from brdgen.brd_cache import DiskLRUCache
+from brdgen.brd_embedding import CachedEmbeddings, EmbeddingProvider
+from brdgen.brd_rag_agent_chroma import BRDRAG, get_chroma_client
+
+
+class FakeEmbeddings:
+    embedded = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def _vector(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts):
+        FakeEmbeddings.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def _fake_provider(monkeypatch):
+    monkeypatch.setattr(brd_embedding, "FastEmbedEmbeddings", FakeEmbeddings)
+    FakeEmbeddings.embedded = []
+    return EmbeddingProvider(model_name="test-model")
+
+
+def test_disk_lru_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+
+    assert cache.set("c", b"3") == ["b"]
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_cached_embeddings_only_embed_changed_chunks(tmp_path, monkeypatch):
+    provider = _fake_provider(monkeypatch)
+    embeddings = CachedEmbeddings(
+        provider, DiskLRUCache(str(tmp_path / "chunks.sqlite"))
+    )
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    assert FakeEmbeddings.embedded == ["alpha", "beta"]
+    assert first[0] == first[2]
+
+    embeddings.embed_documents(["alpha", "beta", "gamma"])
+    assert FakeEmbeddings.embedded == ["alpha", "beta", "gamma"]
+
+
+def test_collections_are_content_addressed_and_bounded(tmp_path, monkeypatch):
+    provider = _fake_provider(monkeypatch)
+    monkeypatch.setattr(brd_rag_agent_chroma, "embedding_provider", provider)
+    persist_directory = str(tmp_path / "chroma")
+    brdrag = BRDRAG(
+        persist_directory=persist_directory, max_collections=2, cache_dir=str(tmp_path)
+    )
+    brdrag.embeddings.provider = provider
+
+    assessments = [f"Assessment number {i}. " * 40 for i in range(3)]
+    for text in assessments:
+        assert brdrag.getResponse(text, "What is the purpose?")
+
+    names = {c.name for c in get_chroma_client(persist_directory).list_collections()}
+    assert brdrag.collection_name(assessments[0]) not in names
+    assert names == {brdrag.collection_name(text) for text in assessments[1:]}
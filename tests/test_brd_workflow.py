@@ -0,0 +1,409 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis  # type: ignore
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import brdgen.brd_workflow as brd_workflow
+from brdgen.brd_checkpoint import RedisCheckpointSaver, thread_config
+from brdgen.brd_workflow import BRDGraphNode, BRDWorkflowRegistry
+
+
+def test_registry_compiles_once(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    registry = BRDWorkflowRegistry()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        apps = list(executor.map(lambda _: registry.get(), range(16)))
+
+    assert all(app is apps[0] for app in apps)
+    assert registry.get(max_iterations=2) is not apps[0]
+
+
+def test_stream_workflow_reports_nodes_and_tokens(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+
+    def fake_generate(self, state, config=None):
+        brd_workflow.get_event_callback(config)(
+            {"event": "token", "stage": "generate", "sample": 0, "content": "BRD"}
+        )
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    monkeypatch.setattr(BRDGraphNode, "retrieve_vector", lambda self, s: {"rag_result": ""})
+    monkeypatch.setattr(
+        BRDGraphNode, "condense_assessment", lambda self, s: {"assessment_digest": None}
+    )
+    monkeypatch.setattr(BRDGraphNode, "generate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "exec_tool_brd", lambda self, s: {})
+    monkeypatch.setattr(
+        BRDGraphNode,
+        "refine_brd",
+        lambda self, s, config=None: {"iteration_count": s["iteration_count"] + 1},
+    )
+    monkeypatch.setattr(
+        BRDGraphNode, "save_brd", lambda self, s: {"brd_file_path": "brd.docx"}
+    )
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    events = []
+    result = brd_workflow.stream_workflow("assessment", events.append)
+
+    started = [e["node"] for e in events if e["event"] == "node_started"]
+    assert set(started[:2]) == {"retrieve_vector", "execute_tools"}
+    assert started[2:] == [
+        "condense_assessment",
+        "initial_brd_with_self_consistency",
+        "self_reflect_brd",
+        "save_final_brd",
+    ]
+    assert {"event": "token", "stage": "generate", "sample": 0, "content": "BRD"} in events
+    assert events[-1]["event"] == "completed"
+    assert result == ("BRD", "brd.docx")
+
+
+def test_ainitiate_workflow_runs_async_nodes(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+
+    async def fake_generate(self, state, config=None):
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        return {"iteration_count": state["iteration_count"] + 1}
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    result = asyncio.run(brd_workflow.ainitiate_workflow("assessment"))
+
+    assert result == ("BRD", "brd.docx")
+
+
+def test_retrieval_and_tools_run_in_parallel_and_feed_generation(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    overlap = {"active": 0, "max_active": 0}
+    seen = {}
+
+    async def branch(key, value):
+        overlap["active"] += 1
+        overlap["max_active"] = max(overlap["max_active"], overlap["active"])
+        await asyncio.sleep(0.05)
+        overlap["active"] -= 1
+        return {key: value}
+
+    async def fake_retrieve(self, state):
+        return await branch("rag_result", "similar projects")
+
+    async def fake_tools(self, state):
+        return await branch("tool_result", "web facts")
+
+    async def fake_generate(self, state, config=None):
+        seen["context"] = brd_workflow._generation_context(state)
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        return {"iteration_count": state["iteration_count"] + 1}
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", fake_retrieve)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", fake_tools)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    result = asyncio.run(brd_workflow.ainitiate_workflow("assessment"))
+
+    assert result == ("BRD", "brd.docx")
+    assert overlap["max_active"] == 2
+    assert seen["context"] == "similar projects\n\nExternal research:\nweb facts"
+
+
+def test_refinement_loop_stops_when_converged(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    refinements = []
+
+    async def fake_generate(self, state, config=None):
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        refinements.append(state["iteration_count"])
+        return {
+            "iteration_count": state["iteration_count"] + 1,
+            "refinement_converged": len(refinements) == 2,
+        }
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    asyncio.run(brd_workflow.ainitiate_workflow("assessment", max_iterations=5))
+
+    assert refinements == [0, 1]
+
+
+def test_feedback_round_resumes_from_checkpoint(monkeypatch, tmp_path):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    create_checkpointer = brd_workflow.create_checkpointer
+    monkeypatch.setattr(
+        brd_workflow,
+        "create_checkpointer",
+        lambda use_async: create_checkpointer(
+            use_async, f"sqlite:///{tmp_path / 'cp.sqlite'}"
+        ),
+    )
+    calls = []
+
+    async def fake_generate(self, state, config=None):
+        calls.append("generate")
+        return {"brd_content": "BRD v1", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        calls.append(("refine", state.get("user_feedback")))
+        feedback = state.get("user_feedback")
+        content = state["brd_content"] + (f" + {feedback}" if feedback else "")
+        return {"brd_content": content, "iteration_count": state["iteration_count"] + 1}
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    async def run():
+        try:
+            await brd_workflow.ainitiate_workflow("assessment", thread_id="task-1")
+            first = await brd_workflow.arefine_with_feedback("task-1", "add KPIs")
+            second = await brd_workflow.arefine_with_feedback("task-1", "shorter")
+            return first, second
+        finally:
+            await brd_workflow.workflow_registry.aclear()
+
+    first, second = asyncio.run(run())
+
+    assert first == ("BRD v1 + add KPIs", "brd.docx")
+    assert second == ("BRD v1 + add KPIs + shorter", "brd.docx")
+    assert calls == [
+        "generate",
+        ("refine", None),
+        ("refine", "add KPIs"),
+        ("refine", "shorter"),
+    ]
+
+
+def test_feedback_without_checkpoint_is_rejected(monkeypatch, tmp_path):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    create_checkpointer = brd_workflow.create_checkpointer
+    monkeypatch.setattr(
+        brd_workflow,
+        "create_checkpointer",
+        lambda use_async: create_checkpointer(
+            use_async, f"sqlite:///{tmp_path / 'cp.sqlite'}"
+        ),
+    )
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    try:
+        with pytest.raises(brd_workflow.CheckpointNotFoundError):
+            brd_workflow.refine_with_feedback("unknown-task", "feedback")
+    finally:
+        brd_workflow.workflow_registry.clear()
+
+
+def test_interrupted_run_resumes_after_last_finished_node(monkeypatch, tmp_path):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    create_checkpointer = brd_workflow.create_checkpointer
+    monkeypatch.setattr(
+        brd_workflow,
+        "create_checkpointer",
+        lambda use_async: create_checkpointer(
+            use_async, f"sqlite:///{tmp_path / 'cp.sqlite'}"
+        ),
+    )
+    monkeypatch.setattr(brd_workflow, "CHECKPOINT_DURABILITY", "sync")
+    calls = []
+
+    async def fake_generate(self, state, config=None):
+        calls.append("generate")
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        calls.append("refine")
+        if calls.count("refine") == 1:
+            raise RuntimeError("worker killed")
+        return {"brd_content": "BRD refined", "iteration_count": 1}
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+    monkeypatch.setattr(brd_workflow, "workflow_registry", BRDWorkflowRegistry())
+
+    async def run():
+        try:
+            with pytest.raises(RuntimeError):
+                await brd_workflow.ainitiate_workflow("assessment", thread_id="task-1")
+            resumed = await brd_workflow.aresume_workflow("task-1")
+            # A finished run is returned from its checkpoint without running any node
+            again = await brd_workflow.aresume_workflow("task-1")
+            with pytest.raises(brd_workflow.CheckpointNotFoundError):
+                await brd_workflow.aresume_workflow("unknown-task")
+            return resumed, again
+        finally:
+            await brd_workflow.workflow_registry.aclear()
+
+    resumed, again = asyncio.run(run())
+
+    assert resumed == again == ("BRD refined", "brd.docx")
+    assert calls == ["generate", "refine", "refine"]
+
+
+@pytest.mark.parametrize("backend", ["redis", "sqlite"])
+def test_another_worker_resumes_through_the_shared_checkpointer(
+    backend, monkeypatch, tmp_path
+):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    if backend == "redis":
+        server = fakeredis.FakeServer()
+
+        def shared_checkpointer(use_async):
+            return RedisCheckpointSaver(client=fakeredis.FakeRedis(server=server))
+
+    else:
+        create_checkpointer = brd_workflow.create_checkpointer
+
+        def shared_checkpointer(use_async):
+            return create_checkpointer(use_async, f"sqlite:///{tmp_path / 'cp.sqlite'}")
+
+    monkeypatch.setattr(brd_workflow, "create_checkpointer", shared_checkpointer)
+    monkeypatch.setattr(brd_workflow, "CHECKPOINT_DURABILITY", "sync")
+    calls = []
+
+    async def fake_generate(self, state, config=None):
+        calls.append("generate")
+        return {"brd_content": "BRD", "iteration_count": 0}
+
+    async def fake_refine(self, state, config=None):
+        calls.append("refine")
+        if calls.count("refine") == 1:
+            raise RuntimeError("worker killed")
+        return {"brd_content": "BRD refined", "iteration_count": 1}
+
+    async def fake_save(self, state):
+        return {"brd_file_path": "brd.docx"}
+
+    async def passthrough(self, state):
+        return {}
+
+    monkeypatch.setattr(BRDGraphNode, "aretrieve_vector", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "acondense_assessment", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "agenerate_brd", fake_generate)
+    monkeypatch.setattr(BRDGraphNode, "aexec_tool_brd", passthrough)
+    monkeypatch.setattr(BRDGraphNode, "arefine_brd", fake_refine)
+    monkeypatch.setattr(BRDGraphNode, "asave_brd", fake_save)
+
+    crashed, recovering = BRDWorkflowRegistry(), BRDWorkflowRegistry()
+
+    async def run():
+        monkeypatch.setattr(brd_workflow, "workflow_registry", crashed)
+        with pytest.raises(RuntimeError):
+            await brd_workflow.ainitiate_workflow("assessment", thread_id="task-1")
+        await crashed.aclear()
+
+        # A second worker, with its own registry and saver, picks the task up
+        monkeypatch.setattr(brd_workflow, "workflow_registry", recovering)
+        try:
+            resumed = await brd_workflow.aresume_workflow("task-1")
+            app = await recovering.aget(checkpointed=True)
+            config = thread_config("task-1")
+            kept = [saved async for saved in app.checkpointer.alist(config)]
+            return resumed, kept
+        finally:
+            await recovering.aclear()
+
+    resumed, kept = asyncio.run(run())
+
+    assert resumed == ("BRD refined", "brd.docx")
+    assert calls == ["generate", "refine", "refine"]
+    # The finished run keeps only its final checkpoint
+    assert len(kept) == 1
+
+
+def test_registry_replaces_a_saver_from_a_finished_event_loop(monkeypatch, tmp_path):
+    monkeypatch.setenv("MISTRAL_API", "test-key")
+    create_checkpointer = brd_workflow.create_checkpointer
+    monkeypatch.setattr(
+        brd_workflow,
+        "create_checkpointer",
+        lambda use_async: create_checkpointer(
+            use_async, f"sqlite:///{tmp_path / 'cp.sqlite'}"
+        ),
+    )
+    registry = BRDWorkflowRegistry()
+
+    async def get():
+        app = await registry.aget(checkpointed=True)
+        # Opens the connection on this loop
+        await app.aget_state(thread_config("task-1"))
+        return app
+
+    first = asyncio.run(get())
+
+    async def replace():
+        try:
+            return await get()
+        finally:
+            await registry.aclear()
+
+    second = asyncio.run(replace())
+
+    assert second is not first
+    # The stale saver was closed on the second loop, not left to a closed one
+    assert first.checkpointer.conn._connection is None
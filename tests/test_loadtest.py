@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from fastapi.testclient import TestClient  # type: ignore
+from mistralai import Mistral
+
+from loadtest.load_generator import JobResult, LoadGenerator, percentile
+from loadtest.mock_servers import (
+    LatencyDistribution,
+    MockConfig,
+    create_mistral_app,
+    create_tavily_app,
+)
+
+MESSAGES = [{"role": "user", "content": "Write a BRD"}]
+
+
+def _mistral(config):
+    # TestClient is an httpx.Client, so the real SDK talks to the mock in-process
+    http = TestClient(create_mistral_app(config))
+    return Mistral(api_key="mock", server_url="http://testserver", client=http)
+
+
+def test_mistral_sdk_parses_mock_completion():
+    client = _mistral(MockConfig(completion_tokens=20, seed=1))
+
+    response = client.chat.complete(model="mock-large", messages=MESSAGES)
+
+    assert len(response.choices[0].message.content.split()) == 20
+    assert response.usage.completion_tokens == 20
+
+
+def test_mistral_sdk_parses_mock_stream():
+    client = _mistral(MockConfig(completion_tokens=20, seed=1))
+
+    events = list(client.chat.stream(model="mock-large", messages=MESSAGES))
+
+    text = "".join(e.data.choices[0].delta.content for e in events)
+    assert len(text.split()) == 20
+    assert events[-1].data.usage.completion_tokens == 20
+
+
+def test_mock_injects_rate_limits():
+    http = TestClient(create_mistral_app(MockConfig(rate_limit_rate=1.0, retry_after=7)))
+
+    response = http.post("/v1/chat/completions", json={"messages": MESSAGES})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert http.get("/stats").json()["rate_limited"] == 1
+
+
+def test_mock_tavily_returns_requested_results():
+    http = TestClient(create_tavily_app(MockConfig(seed=1)))
+
+    body = http.post("/search", json={"query": "SAP", "max_results": 2}).json()
+
+    assert [r["url"] for r in body["results"]] == [
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+
+
+def test_latency_distributions():
+    assert LatencyDistribution("fixed:0.5").sample() == 0.5
+    assert 1 <= LatencyDistribution("uniform:1:2", seed=1).sample() <= 2
+    assert LatencyDistribution("normal:-5:0.1", seed=1).sample() == 0
+    with pytest.raises(ValueError):
+        LatencyDistribution("pareto:1")
+
+
+def test_report_percentiles_and_counts():
+    generator = LoadGenerator("http://api", b"", rate=1, duration=10)
+    generator.results = [
+        JobResult("completed", submitted_at=0, finished_at=float(i)) for i in range(1, 101)
+    ] + [JobResult("rejected", submitted_at=0)]
+
+    report = generator.report(elapsed=50)
+
+    assert report["counts"] == {"completed": 100, "rejected": 1}
+    assert report["completion_seconds"]["p50"] == 50
+    assert report["completion_seconds"]["p99"] == 99
+    assert report["throughput_jobs_per_second"] == 2
+    assert percentile([], 50) is None